@@ -6,18 +6,20 @@ from core.axis_convention import AxisConvention
 from core.camera_config import PinholeCameraConfig
 from core.localization_metrics import LocalizationMetrics
 from core.transform import Float3, Float4, Transform
+from datamodels.public_tables import LocalizationSession
 from litestar import Router, post
 from litestar.datastructures import UploadFile
 from litestar.di import Provide
 from litestar.enums import RequestEncodingType
 from litestar.exceptions import HTTPException
 from litestar.params import Body
-from litestar.status_codes import HTTP_422_UNPROCESSABLE_ENTITY, HTTP_502_BAD_GATEWAY
+from litestar.status_codes import HTTP_409_CONFLICT, HTTP_422_UNPROCESSABLE_ENTITY, HTTP_502_BAD_GATEWAY
 from placeframe_localizer_client import ApiClient, ApiException, Configuration
 from placeframe_localizer_client.api.default_api import DefaultApi
 from placeframe_localizer_client.models.axis_convention import AxisConvention as LocalizerAxisConvention
 from placeframe_localizer_client.models.pinhole_camera_config import PinholeCameraConfig as LocalizerPinholeCameraConfig
 from pydantic import BaseModel
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..database import get_session
@@ -34,6 +36,9 @@ class LocalizationRequest(MultipartRequestModel):
     retrieval_top_k: int
     ransac_threshold: float
     image: UploadFile
+    # Frames of one tracking session share an id (chosen by the client), so the localizer can use the previous
+    # frame's pose as a prior
+    session_id: UUID | None = None
 
 
 class MapLocalization(BaseModel):
@@ -51,7 +56,12 @@ async def localize_image(
         map.reconstruction_id: map for map in await fetch_localization_maps(session, data.map_ids)
     }
 
-    async with ApiClient(Configuration(host=str(settings.localizer_container_url))) as api_client:
+    # Session priors live in the localizer that served the session's first frame, so later frames go to it too
+    container_url = str(settings.localizer_container_url)
+    if data.session_id is not None:
+        container_url = (await get_or_create_localization_session(session, data.session_id)).container_url
+
+    async with ApiClient(Configuration(host=container_url)) as api_client:
         try:
             localizations = await DefaultApi(api_client).localize_image(
                 list(reconstruction_id_to_map_id.keys()),
@@ -60,6 +70,7 @@ async def localize_image(
                 data.retrieval_top_k,
                 data.ransac_threshold,
                 await data.image.read(),
+                session_id=data.session_id,
             )
 
             return [
@@ -91,6 +102,29 @@ async def localize_image(
             raise HTTPException(status_code=HTTP_502_BAD_GATEWAY, detail="Localization session backend error") from e
 
 
+async def get_or_create_localization_session(session: AsyncSession, id: UUID) -> LocalizationSession:
+    row = await session.get(LocalizationSession, id)
+    if row:
+        return row
+
+    row = LocalizationSession(
+        id=id,
+        container_id=str(settings.localizer_container_url.host),
+        container_url=str(settings.localizer_container_url),
+    )
+    session.add(row)
+
+    # Another tenant's session with this id is hidden from us, but still takes the id
+    try:
+        await session.flush()
+    except IntegrityError as e:
+        raise HTTPException(
+            status_code=HTTP_409_CONFLICT, detail=f"Localization session with id {id} already exists"
+        ) from e
+
+    return row
+
+
 router = Router(
     "/localize", tags=["Localization"], dependencies={"session": Provide(get_session)}, route_handlers=[localize_image]
 )
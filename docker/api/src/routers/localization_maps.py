@@ -1,3 +1,5 @@
+from asyncio import gather
+from logging import getLogger
 from typing import Annotated
 from uuid import UUID
 
@@ -12,11 +14,15 @@ from datamodels.public_dtos import (
     localization_map_to_dto,
 )
 from datamodels.public_tables import LocalizationMap, OrchestrationStatus
-from litestar import Router, delete, get, patch, post
+from httpx import HTTPError
+from litestar import Response, Router, delete, get, patch, post
+from litestar.background_tasks import BackgroundTask
 from litestar.di import Provide
 from litestar.exceptions import ClientException, HTTPException, NotFoundException
 from litestar.params import Parameter
 from litestar.status_codes import HTTP_409_CONFLICT
+from placeframe_localizer_client import ApiClient, ApiException, Configuration
+from placeframe_localizer_client.api.default_api import DefaultApi
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -25,10 +31,13 @@ from ..settings import get_settings
 from .reconstructions import fetch_reconstruction_status
 
 settings = get_settings()
+logger = getLogger("uvicorn.error")
+
+LOCALIZER_PRELOAD_TIMEOUT_SECONDS = 5.0
 
 
 @post("")
-async def create_localization_map(session: AsyncSession, data: LocalizationMapCreate) -> LocalizationMapRead:
+async def create_localization_map(session: AsyncSession, data: LocalizationMapCreate) -> Response[LocalizationMapRead]:
     reconstruction_status = await fetch_reconstruction_status(session, data.reconstruction_id)
 
     if reconstruction_status != OrchestrationStatus.SUCCEEDED:
@@ -42,7 +51,8 @@ async def create_localization_map(session: AsyncSession, data: LocalizationMapCr
 
     await session.flush()
     await session.refresh(row)
-    return localization_map_to_dto(row)
+
+    return preload_after_response(localization_map_to_dto(row), [row.reconstruction_id] if row.active else [])
 
 
 @delete("/{id:uuid}")
@@ -119,7 +129,9 @@ async def get_localization_map(session: AsyncSession, id: UUID) -> LocalizationM
 
 
 @patch("/{id:uuid}")
-async def update_localization_map(session: AsyncSession, id: UUID, data: LocalizationMapUpdate) -> LocalizationMapRead:
+async def update_localization_map(
+    session: AsyncSession, id: UUID, data: LocalizationMapUpdate
+) -> Response[LocalizationMapRead]:
     row = await session.get(LocalizationMap, id)
 
     if not row:
@@ -129,13 +141,14 @@ async def update_localization_map(session: AsyncSession, id: UUID, data: Localiz
 
     await session.flush()
     await session.refresh(row)
-    return localization_map_to_dto(row)
+
+    return preload_after_response(localization_map_to_dto(row), [row.reconstruction_id] if data.active else [])
 
 
 @patch("")
 async def update_localization_maps(
     session: AsyncSession, data: list[LocalizationMapBatchUpdate], allow_missing: bool = False
-) -> list[LocalizationMapRead]:
+) -> Response[list[LocalizationMapRead]]:
     rows: list[LocalizationMap] = []
     for localization_map in data:
         row = await session.get(LocalizationMap, localization_map.id)
@@ -150,7 +163,33 @@ async def update_localization_maps(
     await session.flush()
     for row in rows:
         await session.refresh(row)
-    return [localization_map_to_dto(r) for r in rows]
+
+    activated_ids = {localization_map.id for localization_map in data if localization_map.active}
+    return preload_after_response(
+        [localization_map_to_dto(r) for r in rows], [row.reconstruction_id for row in rows if row.id in activated_ids]
+    )
+
+
+def preload_after_response[T](content: T, reconstruction_ids: list[UUID]) -> Response[T]:
+    # Background tasks run after the response is sent, and so after the session dependency has committed, which
+    # keeps localizer round trips off the request path and guarantees the localizer sees the activated maps
+    if not reconstruction_ids:
+        return Response(content)
+
+    return Response(content, background=BackgroundTask(preload_localization_maps, reconstruction_ids))
+
+
+async def preload_localization_maps(reconstruction_ids: list[UUID]) -> None:
+    async with ApiClient(Configuration(host=str(settings.localizer_container_url))) as api_client:
+        await gather(*(request_map_load(DefaultApi(api_client), id) for id in reconstruction_ids))
+
+
+async def request_map_load(api: DefaultApi, reconstruction_id: UUID) -> None:
+    # Preloading only hides cold-start latency, so failing to reach the localizer is logged and otherwise ignored
+    try:
+        await api.request_map_load(reconstruction_id, _request_timeout=LOCALIZER_PRELOAD_TIMEOUT_SECONDS)
+    except (ApiException, HTTPError) as e:
+        logger.warning("Failed to request preload of reconstruction %s: %r", reconstruction_id, e)
 
 
 router = Router(
@@ -1,10 +1,11 @@
 from typing import Any
 
 from core.localization_metrics import LocalizationMetrics
-from numpy import asarray, float64, median, ndarray
+from numpy import asarray, concatenate, float64, median, ndarray
 from numpy.linalg import norm
 from numpy.typing import NDArray
 from pycolmap import Camera as ColmapCamera
+from pycolmap import Rigid3d
 
 
 def build_localization_metrics(
@@ -32,3 +33,30 @@ def build_localization_metrics(
     reprojection_error_median = float(median(residuals))
 
     return LocalizationMetrics(inlier_ratio=inlier_ratio, reprojection_error_median=reprojection_error_median)
+
+
+# Like build_localization_metrics, for a rig pose: each inlier is reprojected into the camera that observed it
+def build_rig_localization_metrics(
+    pose_result: dict[str, Any],
+    points2d: ndarray,
+    points3d: ndarray,
+    camera_indices: ndarray,
+    pycolmap_cameras: list[ColmapCamera],
+    cams_from_rig: list[Rigid3d],
+):
+    inlier_ratio = float(int(pose_result["num_inliers"])) / float(int(points2d.shape[0]))
+
+    inlier_mask = asarray(pose_result["inlier_mask"], dtype=bool)
+    rig_from_world = pose_result["rig_from_world"]
+    residuals: list[NDArray[float64]] = []
+    for camera_index, (pycolmap_camera, cam_from_rig) in enumerate(zip(pycolmap_cameras, cams_from_rig)):
+        camera_inliers = inlier_mask & (camera_indices == camera_index)
+        cam_from_world = cam_from_rig * rig_from_world
+        camera_frame_points = (cam_from_world.rotation.matrix() @ points3d[camera_inliers].T).T + asarray(
+            cam_from_world.translation, dtype=float64
+        )[None, :]
+        projected_pixel_coordinates = pycolmap_camera.img_from_cam(camera_frame_points)
+        residuals.append(norm(projected_pixel_coordinates - points2d[camera_inliers], axis=1).astype(float64))
+
+    reprojection_error_median = float(median(concatenate(residuals)))
+    return LocalizationMetrics(inlier_ratio=inlier_ratio, reprojection_error_median=reprojection_error_median)
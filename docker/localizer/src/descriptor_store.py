@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from threading import Lock
+
+from core.opq import decode_descriptors
+from faiss import OPQMatrix, ProductQuantizer  # type: ignore
+from numpy import uint8
+from numpy.typing import NDArray
+from torch import Tensor, float16, float32, from_numpy  # type: ignore
+
+from .device import DEVICE
+from .schemas import DescriptorStorage
+
+# Number of images decoded per faiss call when decoding a whole map, bounding the temporary float32 buffers
+DECODE_CHUNK_IMAGES = 256
+
+
+# Local feature descriptors of a map's database images. Depending on the storage mode, they are either decoded once at
+# load and kept resident on the device ("float32"/"float16"), or decoded from their PQ codes on demand, with the most
+# recently used images kept in a bounded LRU ("pq").
+class DescriptorStore:
+    def __init__(
+        self,
+        opq_matrix: OPQMatrix,
+        product_quantizer: ProductQuantizer,
+        pq_codes: dict[int, NDArray[uint8]],
+        storage: DescriptorStorage,
+        cache_images: int,
+    ):
+        self.storage: DescriptorStorage = storage
+        self.cache_images = cache_images
+
+        self._opq_matrix = opq_matrix
+        self._product_quantizer = product_quantizer
+        self._pq_codes: dict[int, NDArray[uint8]] = {}
+        self._resident: dict[int, Tensor] = {}
+        self._lock = Lock()
+        # Ordered from least to most recently used
+        self._cache: OrderedDict[int, Tensor] = OrderedDict()
+
+        if storage == "pq":
+            self._pq_codes = pq_codes
+            return
+
+        dtype = float16 if storage == "float16" else float32
+        image_ids = list(pq_codes.keys())
+        for start in range(0, len(image_ids), DECODE_CHUNK_IMAGES):
+            chunk = {image_id: pq_codes[image_id] for image_id in image_ids[start : start + DECODE_CHUNK_IMAGES]}
+            for image_id, descriptors in decode_descriptors(opq_matrix, product_quantizer, chunk).items():
+                self._resident[image_id] = from_numpy(descriptors).to(device=DEVICE, dtype=dtype).contiguous()
+
+    # Returns float32 descriptors on the device, ready for matching
+    def get(self, image_ids: list[int]) -> dict[int, Tensor]:
+        if self.storage != "pq":
+            return {image_id: self._resident[image_id].to(dtype=float32) for image_id in image_ids}
+
+        descriptors: dict[int, Tensor] = {}
+        with self._lock:
+            for image_id in image_ids:
+                cached = self._cache.get(image_id)
+                if cached is not None:
+                    self._cache.move_to_end(image_id)
+                    descriptors[image_id] = cached
+
+        missing = {image_id: self._pq_codes[image_id] for image_id in image_ids if image_id not in descriptors}
+        if not missing:
+            return descriptors
+
+        decoded = decode_descriptors(self._opq_matrix, self._product_quantizer, missing)
+        with self._lock:
+            for image_id, image_descriptors in decoded.items():
+                descriptors[image_id] = from_numpy(image_descriptors).to(DEVICE)
+                if self.cache_images > 0:
+                    self._cache[image_id] = descriptors[image_id]
+                    self._cache.move_to_end(image_id)
+
+            while len(self._cache) > self.cache_images:
+                self._cache.popitem(last=False)
+
+        return descriptors
+
+    # Upper bound of the memory held by the store (the LRU is counted at capacity, since it fills up under load)
+    def size_bytes(self):
+        size = self._opq_matrix.d_in * self._opq_matrix.d_out * 4  # float32 rotation matrix
+        size += self._product_quantizer.M * self._product_quantizer.ksub * self._product_quantizer.dsub * 4  # centroids
+
+        if self.storage != "pq":
+            return size + sum(tensor.nbytes for tensor in self._resident.values())
+
+        codes_bytes = sum(codes.nbytes for codes in self._pq_codes.values())
+        size += codes_bytes
+        if self._pq_codes:
+            # Every byte of PQ code (8 bits per subvector) decodes to dsub float32 values
+            decoded_image_bytes = codes_bytes / len(self._pq_codes) * self._product_quantizer.dsub * 4
+            size += int(min(self.cache_images, len(self._pq_codes)) * decoded_image_bytes)
+
+        return size
@@ -0,0 +1,3 @@
+from torch import cuda
+
+DEVICE = "cuda" if cuda.is_available() else "cpu"
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from time import perf_counter
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MAP_LOAD_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+COUNT_BUCKETS = (0, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 25000)
+
+# Per label value: observations per bucket (the last one above every bound), sum and count
+HistogramSnapshot = dict[str, tuple[list[int], float, int]]
+
+
+# A Prometheus histogram with one label. Snapshots are plain data, so they can be sent between processes and merged.
+class Histogram:
+    def __init__(self, name: str, help: str, label: str, buckets: tuple[float, ...]):
+        self.name = name
+        self.help = help
+        self.label = label
+        self.buckets = buckets
+
+        self._lock = Lock()
+        self._values: HistogramSnapshot = {}
+
+    def observe(self, label_value: str, value: float):
+        with self._lock:
+            bucket_counts, total, count = self._values.get(label_value, ([0] * (len(self.buckets) + 1), 0.0, 0))
+            bucket_counts[bisect_left(self.buckets, value)] += 1
+            self._values[label_value] = (bucket_counts, total + value, count + 1)
+
+    def snapshot(self) -> HistogramSnapshot:
+        with self._lock:
+            return {
+                label_value: (list(counts), total, count)
+                for label_value, (counts, total, count) in self._values.items()
+            }
+
+    # In the Prometheus text exposition format, with cumulative buckets
+    def render(self, snapshots: list[HistogramSnapshot]):
+        merged: HistogramSnapshot = {}
+        for snapshot in snapshots:
+            for label_value, (counts, total, count) in snapshot.items():
+                merged_counts, merged_total, merged_count = merged.get(label_value, ([0] * len(counts), 0.0, 0))
+                merged[label_value] = (
+                    [a + b for a, b in zip(merged_counts, counts)],
+                    merged_total + total,
+                    merged_count + count,
+                )
+
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for label_value, (counts, total, count) in sorted(merged.items()):
+            label = f'{self.label}="{label_value}"'
+            cumulative = 0
+            for bound, bucket_count in zip([*self.buckets, "+Inf"], counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.extend((f"{self.name}_sum{{{label}}} {total}", f"{self.name}_count{{{label}}} {count}"))
+        return "\n".join(lines)
+
+
+STAGE_SECONDS = Histogram(
+    "localizer_stage_seconds", "Time spent in each localization stage, per request or map", "stage", LATENCY_BUCKETS
+)
+STAGE_ITEMS = Histogram(
+    "localizer_stage_items",
+    "Keypoints, matches, correspondences and inliers, per request or map",
+    "item",
+    COUNT_BUCKETS,
+)
+MAP_LOAD_SECONDS = Histogram(
+    "localizer_map_load_seconds", "Time spent in each map load stage", "stage", MAP_LOAD_BUCKETS
+)
+HISTOGRAMS = (STAGE_SECONDS, STAGE_ITEMS, MAP_LOAD_SECONDS)
+
+
+def snapshot_histograms():
+    return [histogram.snapshot() for histogram in HISTOGRAMS]
+
+
+# Renders snapshots taken by snapshot_histograms (one per process)
+def render_histograms(snapshots: list[list[HistogramSnapshot]]):
+    return (
+        "\n".join(
+            histogram.render([snapshot[index] for snapshot in snapshots]) for index, histogram in enumerate(HISTOGRAMS)
+        )
+        + "\n"
+    )
+
+
+_current_timings: ContextVar[Timings | None] = ContextVar("current_timings", default=None)
+
+
+# Stage durations and item counts collected by timed() and count() while active in the current thread (or task)
+class Timings:
+    def __init__(self):
+        self.seconds: dict[str, float] = {}
+        self.items: dict[str, int] = {}
+
+    @contextmanager
+    def activate(self):
+        token = _current_timings.set(self)
+        try:
+            yield self
+        finally:
+            _current_timings.reset(token)
+
+    def add_seconds(self, stage: str, seconds: float):
+        self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+
+    def add_items(self, item: str, count: int):
+        self.items[item] = self.items.get(item, 0) + count
+
+    def observe(self, seconds_histogram: Histogram = STAGE_SECONDS):
+        for stage, seconds in self.seconds.items():
+            seconds_histogram.observe(stage, seconds)
+        for item, count in self.items.items():
+            STAGE_ITEMS.observe(item, count)
+
+
+@contextmanager
+def timed(stage: str):
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        add_seconds(stage, perf_counter() - start)
+
+
+def add_seconds(stage: str, seconds: float):
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.add_seconds(stage, seconds)
+
+
+def count(item: str, value: int):
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.add_items(item, value)
@@ -1,37 +1,82 @@
 from __future__ import annotations
 
+from dataclasses import dataclass, field
+from math import cos, radians
 from os import environ
+from pathlib import Path
+from threading import Lock
+from time import monotonic, perf_counter
 from typing import Any, cast
-
-from core.axis_convention import AxisConvention, change_basis_unity_from_opencv_pose
-from core.camera_config import PinholeCameraConfig, transform_image, transform_intrinsics
-from core.lightglue import lightglue_match_tensors
+from uuid import UUID
+
+from core.axis_convention import (
+    AxisConvention,
+    change_basis_opencv_from_unity_pose,
+    change_basis_unity_from_opencv_pose,
+)
+from core.camera_config import PinholeCameraConfig, transform_intrinsics
+from core.image_tensors import LUMA_WEIGHTS, create_image_tensors
+from core.lightglue import LightGlueImage, lightglue_match_batch, lightglue_match_tensors
+from core.lightglue_profile import LIGHTGLUE_PROFILES, LightGlueProfile
 from core.localization_metrics import LocalizationMetrics
-from core.opq import decode_descriptors
+from core.point_descriptor_index import match_point_descriptors
+from core.retrieval_index import search_retrieval_index_with_scores
 from core.transform import Float3, Float4, Transform
-from numpy import asarray, float32, vstack
+from numpy import argpartition, argsort, asarray, concatenate, float64, full, inf, int32, int64, intp, unique, zeros
+from numpy.linalg import norm
+from numpy.typing import NDArray
 from pycolmap import AbsolutePoseEstimationOptions, RANSACOptions
 from pycolmap import Camera as ColmapCamera
-from pycolmap._core import Rigid3d, estimate_and_refine_absolute_pose  # type: ignore
+from pycolmap._core import (  # type: ignore
+    Rigid3d,
+    Rotation3d,
+    estimate_and_refine_absolute_pose,
+    estimate_and_refine_generalized_absolute_pose,
+)
 from scipy.spatial.transform import Rotation
-from torch import cuda, from_numpy, mv, topk  # type: ignore
+from torch import Generator, Tensor, inference_mode, mv, rand, stack, tensordot, topk  # type: ignore
 
-from .build_metrics import build_localization_metrics
+from .build_metrics import build_localization_metrics, build_rig_localization_metrics
+from .device import DEVICE
+from .instrumentation import add_seconds, count, timed
 from .map import Map
+from .micro_batcher import MicroBatcher
+from .schemas import InferenceBackend, MatchingMetrics, PosePrior
+from .sessions import SessionPrior
 
-DEVICE = "cuda" if cuda.is_available() else "cpu"
+# Between the -1 SuperPoint gives pixels near the border and the 0 of those suppressed by non-maximum suppression
+PADDED_DETECTION_THRESHOLD = -0.5
 
+# Cameras considered per image wanted when selecting images near a pose without a distance bound, before leaving out
+# those facing away
+NEARBY_CANDIDATES_PER_IMAGE = 4
 
 dir: Any = None
 superpoint: Any = None
 lightglue: Any = None
 
+# Only set when inference batching is enabled
+superpoint_batcher: MicroBatcher[Tensor, tuple[Tensor, Tensor]] | None = None
+dir_batcher: MicroBatcher[Tensor, Tensor] | None = None
+lightglue_batcher: (
+    MicroBatcher[
+        tuple[LightGlueImage, LightGlueImage, LightGlueProfile], tuple[tuple[NDArray[intp], NDArray[intp]], int]
+    ]
+    | None
+) = None
+
 
 class LocalizationError(ValueError):
     pass
 
 
-def load_models(max_keypoints_per_image: int):
+def load_models(
+    max_keypoints_per_image: int,
+    superpoint_backend: InferenceBackend = "eager",
+    dir_backend: InferenceBackend = "eager",
+    lightglue_backend: InferenceBackend = "eager",
+    artifacts_path: Path | None = None,
+):
     if environ.get("CODEGEN"):
         return
 
@@ -44,70 +89,420 @@ def load_models(max_keypoints_per_image: int):
     set_grad_enabled(False)
 
     global dir, superpoint, lightglue
-    dir = load_DIR(DEVICE)
-    superpoint = load_superpoint(max_num_keypoints=max_keypoints_per_image, device=DEVICE)
-    lightglue = load_lightglue(DEVICE)
+    dir = load_DIR(DEVICE, dir_backend, artifacts_path)
+    superpoint = load_superpoint(
+        max_num_keypoints=max_keypoints_per_image,
+        device=DEVICE,
+        backend=superpoint_backend,
+        artifacts_path=artifacts_path,
+    )
+    lightglue = load_lightglue(DEVICE, lightglue_backend, artifacts_path)
+
+
+# Started once the models are loaded, in whichever process localizes (the serving process, or each localization process)
+def start_inference_batchers(batch_max_images: int, batch_max_pairs: int, batch_max_wait_seconds: float):
+    global superpoint_batcher, dir_batcher, lightglue_batcher
+    superpoint_batcher = MicroBatcher(
+        "superpoint", _run_superpoint, batch_max_images, batch_max_wait_seconds, key=lambda image: image.shape
+    )
+    dir_batcher = MicroBatcher("dir", _run_dir, batch_max_images, batch_max_wait_seconds, key=lambda image: image.shape)
+    lightglue_batcher = MicroBatcher(
+        "lightglue", _run_lightglue, batch_max_pairs, batch_max_wait_seconds, key=lambda pair: pair[2]
+    )
+
 
+# Runs every model once on a synthetic image, so one-off allocations and kernel selection (and compilation, with the
+# compiled backend) happen before the first request instead of during it. Per process, since each has its own models.
+def warm_up(image_size: tuple[int, int]):
+    start = monotonic()
+    height, width = image_size
+    rgb = rand(3, height, width, generator=Generator().manual_seed(0))
+    gray = tensordot(LUMA_WEIGHTS, rgb, dims=1).unsqueeze(0)
+
+    # Through the batchers, if enabled, like requests
+    if superpoint_batcher is not None and dir_batcher is not None:
+        superpoint_future = superpoint_batcher.submit(gray)
+        dir_batcher.submit(rgb).result()
+        keypoints, descriptors = superpoint_future.result()
+    else:
+        keypoints, descriptors = _run_superpoint([gray])[0]
+        _run_dir([rgb])
+
+    # Noise is too easy to match for adaptive profiles to run every layer
+    _match_pairs(
+        [("warmup", "query")],
+        {"warmup": keypoints, "query": keypoints},
+        {"warmup": descriptors, "query": descriptors},
+        {"warmup": image_size, "query": image_size},
+        LIGHTGLUE_PROFILES["accurate"],
+    )
+    print(f"Warmed up in {monotonic() - start:.2f}s")
+
+
+@dataclass
+class QueryFeatures:
+    keypoints: Tensor
+    descriptors: Tensor
+    size: tuple[int, int]
+    # (width, height) the image was decoded at, before orientation
+    decoded_size: tuple[int, int]
+    # Kept so the global descriptor can be computed later, when it wasn't needed up front
+    rgb: Tensor
+    global_descriptor: Tensor | None
+    lock: Lock = field(default_factory=Lock)
+
+
+# Query features only depend on the image, so they are extracted once and shared by every map a request targets. The
+# global descriptor is only needed for retrieval, so callers localizing from session priors can skip it.
+def extract_query_features(
+    image_buffer: bytes, camera: PinholeCameraConfig, max_image_size: int | None, global_descriptor: bool = True
+):
+    with timed("decode"):
+        image = create_image_tensors(image_buffer, camera, max_image_size)
+    rgb_tensor, gray_tensor = image.rgb, image.gray
+
+    global_descriptor_tensor: Tensor | None = None
+    if superpoint_batcher is not None and dir_batcher is not None:
+        # Submitted together, so both networks run concurrently, each batched with other requests' images (and each
+        # timed from submission, including time spent waiting for its batch)
+        start = perf_counter()
+        superpoint_future = superpoint_batcher.submit(gray_tensor)
+        dir_future = dir_batcher.submit(rgb_tensor) if global_descriptor else None
+        keypoints, descriptors = superpoint_future.result()
+        add_seconds("superpoint", perf_counter() - start)
+        if dir_future is not None:
+            global_descriptor_tensor = dir_future.result()
+            add_seconds("dir", perf_counter() - start)
+    else:
+        with timed("superpoint"):
+            keypoints, descriptors = _run_superpoint([gray_tensor])[0]
+        if global_descriptor:
+            with timed("dir"):
+                global_descriptor_tensor = _run_dir([rgb_tensor])[0]
+    count("keypoints", int(keypoints.shape[0]))
+
+    height, width = image.image.shape[:2]
+    return QueryFeatures(
+        keypoints, descriptors, (height, width), image.decoded_size, rgb_tensor, global_descriptor_tensor
+    )
 
-def localize_image_against_reconstruction(
+
+def localize_query_against_reconstruction(
     map: Map,
+    query: QueryFeatures,
     camera: PinholeCameraConfig,
     axis_convention: AxisConvention,
-    image_buffer: bytes,
     retrieval_top_k: int,
     ransac_threshold: float,
-) -> tuple[Transform, LocalizationMetrics]:
-    # Extract features from query image
-    image = transform_image(image_buffer, camera.orientation)
-    rgb_tensor = from_numpy(asarray(image, dtype=float32)).permute(2, 0, 1).div(255.0)
-    gray_tensor = from_numpy(asarray(image.convert("L"), dtype=float32)).unsqueeze(0).div(255.0)
-    superpoint_output = superpoint({"image": gray_tensor.unsqueeze(0).to(device=DEVICE)})
-    query_global_descriptor = dir({"image": rgb_tensor.unsqueeze(0).to(device=DEVICE)})["global_descriptor"][0]
-
-    # Retrieve similar database images
-    similarity_scores = mv(from_numpy(map.global_descriptors_matrix).to(DEVICE), query_global_descriptor)
-    topk_rows: list[int] = topk(similarity_scores, retrieval_top_k).indices.cpu().tolist()  # type: ignore
-    matched_image_ids = [map.ordered_image_ids[i] for i in topk_rows]
-
-    # Decode descriptors of matched database images
-    descriptors = decode_descriptors(
-        map.opq_matrix, map.product_quantizer, {image_id: map.pq_codes[image_id] for image_id in matched_image_ids}
+    lightglue_profile: LightGlueProfile,
+    prior: SessionPrior | None = None,
+    prior_min_inliers: int = 0,
+    covisibility_min_overlap: float | None = None,
+    covisibility_min_inliers: int = 0,
+    covisibility_expansion_neighbors: int = 0,
+    retrieved_image_ids: list[int] | None = None,
+    direct_matching_ratio: float | None = None,
+    direct_matching_min_inliers: int = 0,
+    vlad_retrieval: bool = False,
+    pose_prior: PosePrior | None = None,
+    pose_prior_min_inliers: int = 0,
+) -> tuple[Transform, LocalizationMetrics, MatchingMetrics, SessionPrior]:
+    # Match the query's descriptors straight to the map's 3D points, falling back to retrieval if that fails (or yields
+    # too few inliers: a handful of ratio test survivors can still give a consistent, but wrong, pose)
+    if direct_matching_ratio is not None and map.point_descriptor_index is not None:
+        try:
+            correspondences = _match_points(map, query, direct_matching_ratio)
+            return _estimate_pose(
+                map, query, camera, axis_convention, correspondences, ransac_threshold, direct_matching_min_inliers
+            )
+        except LocalizationError as e:
+            print(f"Direct localization failed, falling back to retrieval: {e}")
+
+    # Try the images the session's previous frame matched, and those near it, before falling back to retrieval
+    if prior is not None:
+        try:
+            correspondences = _match_images(
+                map, query, _prior_image_ids(map, prior, retrieval_top_k), lightglue_profile
+            )
+            return _estimate_pose(
+                map, query, camera, axis_convention, correspondences, ransac_threshold, prior_min_inliers
+            )
+        except LocalizationError as e:
+            print(f"Localization from session prior failed, falling back to retrieval: {e}")
+
+    # Then the images whose cameras are near the client's own estimate of its pose
+    if pose_prior is not None:
+        try:
+            center, viewing_direction = _pose_prior_camera(pose_prior, axis_convention)
+            image_ids = _nearby_image_ids(
+                map,
+                center,
+                viewing_direction,
+                retrieval_top_k,
+                pose_prior.position_uncertainty_m,
+                pose_prior.rotation_uncertainty_deg if pose_prior.rotation_uncertainty_deg is not None else 90.0,
+            )
+            correspondences = _match_images(map, query, image_ids, lightglue_profile)
+            return _estimate_pose(
+                map, query, camera, axis_convention, correspondences, ransac_threshold, pose_prior_min_inliers
+            )
+        except LocalizationError as e:
+            print(f"Localization from pose prior failed, falling back to retrieval: {e}")
+
+    # Already retrieved when ranking several maps (see rank_maps)
+    image_ids = (
+        retrieved_image_ids
+        if retrieved_image_ids is not None
+        else _retrieve_image_ids(map, query, retrieval_top_k, vlad_retrieval)
+    )
+    if map.covisibility is None or covisibility_min_overlap is None:
+        correspondences = _match_images(map, query, image_ids, lightglue_profile)
+        return _estimate_pose(map, query, camera, axis_convention, correspondences, ransac_threshold, 0)
+
+    # Retrieved images that see mostly the same 3D points mostly yield the same correspondences, so only the best
+    # ranked image of each covisibility cluster is matched, and the rest only if that doesn't give enough inliers.
+    # Those then come with the clusters' most covisible images that weren't retrieved, which see the same part of the
+    # scene from other viewpoints, and so may match where a retrieved image's viewpoint was too different.
+    clusters = map.covisibility.cluster(image_ids, covisibility_min_overlap)
+    representative_ids = [cluster[0] for cluster in clusters]
+    correspondences = _match_images(map, query, representative_ids, lightglue_profile)
+    remaining_image_ids = [image_id for cluster in clusters for image_id in cluster[1:]]
+    remaining_image_ids += map.covisibility.neighbors(
+        representative_ids, covisibility_expansion_neighbors, set(image_ids)
     )
+    if remaining_image_ids:
+        try:
+            return _estimate_pose(
+                map, query, camera, axis_convention, correspondences, ransac_threshold, covisibility_min_inliers
+            )
+        except LocalizationError as e:
+            print(f"Localization against {len(clusters)} covisibility clusters failed, matching remaining images: {e}")
+        correspondences = correspondences.extend(_match_images(map, query, remaining_image_ids, lightglue_profile))
+
+    return _estimate_pose(map, query, camera, axis_convention, correspondences, ransac_threshold, 0)
+
+
+# Retrieves the top k images across all the maps, and ranks the maps by their share of them (the summed similarity of
+# their retrieved images), so requests targeting many overlapping maps only match and estimate poses against the maps
+# the query most likely belongs to. Returns each ranked map's retrieved image ids, most similar first.
+def rank_maps(
+    maps: dict[UUID, Map], query: QueryFeatures, retrieval_top_k: int, vlad_retrieval: bool = False
+) -> list[tuple[UUID, list[int]]]:
+    # Merging each map's top k is equivalent to searching all of their descriptors at once, without copying them into a
+    # combined index for every combination of maps requested together (VLAD similarities come from each map's own
+    # vocabulary, so they are only roughly comparable between maps)
+    retrieved = [
+        (score, id, image_id)
+        for id, map in maps.items()
+        for image_id, score in _search_map(map, query, retrieval_top_k, vlad_retrieval)
+    ]
+    retrieved.sort(key=lambda result: result[0], reverse=True)
+
+    image_ids: dict[UUID, list[int]] = {}
+    map_scores: dict[UUID, float] = {}
+    for score, id, image_id in retrieved[:retrieval_top_k]:
+        image_ids.setdefault(id, []).append(image_id)
+        map_scores[id] = map_scores.get(id, 0.0) + score
+
+    return [(id, image_ids[id]) for id in sorted(map_scores, key=lambda id: map_scores[id], reverse=True)]
+
+
+def _retrieve_image_ids(map: Map, query: QueryFeatures, retrieval_top_k: int, vlad_retrieval: bool) -> list[int]:
+    return [image_id for image_id, _ in _search_map(map, query, retrieval_top_k, vlad_retrieval)]
+
+
+# Image ids with their similarity to the query, most similar first. With VLAD retrieval (for maps that support it), the
+# query's global descriptor is aggregated from its SuperPoint descriptors, so DIR never runs.
+def _search_map(map: Map, query: QueryFeatures, retrieval_top_k: int, vlad_retrieval: bool) -> list[tuple[int, float]]:
+    if vlad_retrieval and map.vlad_aggregator is not None and map.vlad_descriptors is not None:
+        with timed("vlad"):
+            query_vlad = map.vlad_aggregator.aggregate(query.descriptors.cpu().numpy())
+        with timed("retrieval"):
+            vlad_scores = map.vlad_descriptors @ query_vlad
+            top_count = min(retrieval_top_k, vlad_scores.shape[0])
+            top_rows = argpartition(-vlad_scores, top_count - 1)[:top_count]
+            return [
+                (map.ordered_image_ids[row], float(vlad_scores[row]))
+                for row in top_rows[argsort(-vlad_scores[top_rows])].tolist()
+            ]
+
+    global_descriptor = _query_global_descriptor(query)
+    with timed("retrieval"):
+        if map.retrieval_index is not None:
+            return search_retrieval_index_with_scores(
+                map.retrieval_index, global_descriptor.cpu().numpy(), retrieval_top_k
+            )
+
+        similarity_scores = mv(map.global_descriptors_matrix, global_descriptor)
+        top = topk(similarity_scores, min(retrieval_top_k, similarity_scores.shape[0]))
+        return [
+            (map.ordered_image_ids[row], score)
+            for row, score in zip(top.indices.cpu().tolist(), top.values.cpu().tolist())  # type: ignore
+        ]
+
+
+def _query_global_descriptor(query: QueryFeatures):
+    with query.lock:
+        if query.global_descriptor is None:
+            with timed("dir"):
+                if dir_batcher is not None:
+                    query.global_descriptor = dir_batcher.submit(query.rgb).result()
+                else:
+                    query.global_descriptor = _run_dir([query.rgb])[0]
+
+        return query.global_descriptor
+
+
+# The world coordinates of the prior's camera centre and its viewing direction (OpenCV convention, like the map's)
+def _pose_prior_camera(pose_prior: PosePrior, axis_convention: AxisConvention):
+    cam_from_world = _pose_from_transform(pose_prior.transform, axis_convention)
+    rotation = cam_from_world.rotation.matrix()
+    return -rotation.T @ asarray(cam_from_world.translation, dtype=float64), rotation[2]
+
+
+# The prior's inlier images, topped up with the images whose cameras are closest to the prior pose
+def _prior_image_ids(map: Map, prior: SessionPrior, count: int):
+    image_ids = prior.image_ids[:count]
+    if len(image_ids) >= count:
+        return image_ids
+
+    selected = set(image_ids)
+    nearby_image_ids = _nearby_image_ids(map, prior.center(), prior.viewing_direction(), count + len(image_ids))
+    return image_ids + [image_id for image_id in nearby_image_ids if image_id not in selected][: count - len(image_ids)]
+
+
+# Up to count images whose cameras are nearest to the center (within max_distance) and view within max_angle_deg of
+# the viewing direction, nearest first. Cameras facing away (by 90 degrees or more) can't see much of the same scene,
+# so they are always left out.
+def _nearby_image_ids(
+    map: Map,
+    center: NDArray[float64],
+    viewing_direction: NDArray[float64],
+    count: int,
+    max_distance: float = inf,
+    max_angle_deg: float = 90.0,
+) -> list[int]:
+    if map.image_center_tree is None or map.image_centers is None or map.image_viewing_directions is None:
+        return []
+
+    with timed("spatial_retrieval"):
+        if max_distance == inf:
+            # Nearest first, padded with infinite distances when there are fewer images
+            candidate_count = min(count * NEARBY_CANDIDATES_PER_IMAGE, map.image_center_tree.n)
+            distances, rows = map.image_center_tree.query(center, k=candidate_count)
+            rows = asarray(rows, dtype=intp).reshape(-1)[asarray(distances).reshape(-1) < inf]
+        else:
+            rows = asarray(map.image_center_tree.query_ball_point(center, max_distance), dtype=intp)
+            rows = rows[argsort(norm(map.image_centers[rows] - center, axis=1), kind="stable")]
+
+        min_cosine = max(cos(radians(min(max_angle_deg, 90.0))), 0.0)
+        rows = rows[map.image_viewing_directions[rows] @ viewing_direction > min_cosine]
+        return [map.ordered_image_ids[row] for row in rows[:count].tolist()]
+
+
+# 2D-3D correspondences between the query's keypoints and the map's points, with the database image each came from
+@dataclass(frozen=True)
+class _Correspondences:
+    query_keypoint_indices: NDArray[intp]
+    point3D_rows: NDArray[int32]
+    # -1 for direct matches
+    image_ids: NDArray[int64]
+    # LightGlue layers run for each matched image
+    matching_layers: list[int]
+
+    def extend(self, other: _Correspondences):
+        return _Correspondences(
+            concatenate([self.query_keypoint_indices, other.query_keypoint_indices]),
+            concatenate([self.point3D_rows, other.point3D_rows]),
+            concatenate([self.image_ids, other.image_ids]),
+            self.matching_layers + other.matching_layers,
+        )
+
+    def matching_metrics(self, inliers: int):
+        return MatchingMetrics(
+            correspondences=int(self.query_keypoint_indices.size),
+            inliers=inliers,
+            pairs=len(self.matching_layers),
+            layers_mean=sum(self.matching_layers) / len(self.matching_layers) if self.matching_layers else 0.0,
+            layers_max=max(self.matching_layers, default=0),
+        )
+
+
+def _match_images(map: Map, query: QueryFeatures, matched_image_ids: list[int], lightglue_profile: LightGlueProfile):
+    if not matched_image_ids:
+        return _Correspondences(zeros(0, dtype=intp), zeros(0, dtype=int32), zeros(0, dtype=int64), [])
 
     # Prepare database image data for matching
-    keypoints = {str(image_id): from_numpy(map.keypoints[image_id]).to(DEVICE) for image_id in matched_image_ids}
-    descriptors = {str(image_id): from_numpy(descriptors[image_id]).to(DEVICE) for image_id in matched_image_ids}
+    keypoints = {str(image_id): map.keypoints[image_id] for image_id in matched_image_ids}
+    with timed("pq_decode"):
+        descriptors = {str(image_id): tensor for image_id, tensor in map.descriptors.get(matched_image_ids).items()}
     sizes = {str(image_id): map.image_sizes[str(image_id)] for image_id in matched_image_ids}
 
     # Prepare query image data for matching
-    keypoints["query"] = superpoint_output["keypoints"][0].to(DEVICE)
-    descriptors["query"] = superpoint_output["descriptors"][0].to(DEVICE)
-    sizes["query"] = (image.height, image.width)
+    keypoints["query"] = query.keypoints
+    descriptors["query"] = query.descriptors
+    sizes["query"] = query.size
 
     # Match features between query and database images
     pairs = [(str(image_id), "query") for image_id in matched_image_ids]
 
-    match_indices = lightglue_match_tensors(lightglue, pairs, keypoints, descriptors, sizes, len(pairs), DEVICE)
-
-    # Collect 2D-3D correspondences
-    query_keypoint_indices: list[int] = []
-    point3d_indices: list[int] = []
-    for image_id in matched_image_ids:
-        for database_image_keypoint_index, query_image_keypoint_index in zip(*match_indices[(str(image_id), "query")]):
-            point2D = map.images[image_id].points2D[int(database_image_keypoint_index)]
-
-            if not point2D.has_point3D():
-                continue
+    with timed("lightglue"):
+        match_indices, match_layers = _match_pairs(pairs, keypoints, descriptors, sizes, lightglue_profile)
+    count("matches", sum(match_indices[pair][0].shape[0] for pair in pairs))
+
+    # Collect 2D-3D correspondences with a single gather over all matched database keypoints
+    with timed("correspondences"):
+        query_keypoint_indices = concatenate([match_indices[pair][1] for pair in pairs])
+        point3D_rows = concatenate([
+            map.point3D_rows[image_id][match_indices[pair][0]] for image_id, pair in zip(matched_image_ids, pairs)
+        ])
+        correspondence_image_ids = concatenate([
+            full(match_indices[pair][0].shape[0], image_id, dtype=int64)
+            for image_id, pair in zip(matched_image_ids, pairs)
+        ])
+        observed = point3D_rows >= 0
+        return _Correspondences(
+            query_keypoint_indices[observed],
+            point3D_rows[observed],
+            correspondence_image_ids[observed],
+            [match_layers[pair] for pair in pairs],
+        )
+
+
+# Correspondences between query keypoints and the 3D points with the nearest descriptors (passing the ratio test), which
+# don't come from any particular database image
+def _match_points(map: Map, query: QueryFeatures, ratio: float):
+    assert map.point_descriptor_index is not None
+    with timed("direct_matching"):
+        query_keypoint_indices, point3D_rows = match_point_descriptors(
+            map.point_descriptor_index, query.descriptors.cpu().numpy(), ratio
+        )
+    count("matches", int(query_keypoint_indices.shape[0]))
+
+    return _Correspondences(
+        query_keypoint_indices.astype(intp),
+        point3D_rows.astype(int32),
+        full(query_keypoint_indices.shape[0], -1, dtype=int64),
+        [],
+    )
 
-            query_keypoint_indices.append(int(query_image_keypoint_index))
-            point3d_indices.append(int(point2D.point3D_id))
 
+def _estimate_pose(
+    map: Map,
+    query: QueryFeatures,
+    camera: PinholeCameraConfig,
+    axis_convention: AxisConvention,
+    correspondences: _Correspondences,
+    ransac_threshold: float,
+    min_inliers: int,
+):
     # Verify we have enough correspondences
-    if not query_keypoint_indices:
+    if correspondences.query_keypoint_indices.size == 0:
         raise LocalizationError("No matching keypoints found")
 
     # Create COLMAP camera model
-    width, height, *params = transform_intrinsics(camera)
+    # Keypoints are in the decoded image's coordinates, which may be downscaled
+    width, height, *params = transform_intrinsics(camera, query.decoded_size)
     pycolmap_camera = ColmapCamera(width=width, height=height, model="PINHOLE", params=params)
 
     # Set estimation options
@@ -117,35 +512,207 @@ def localize_image_against_reconstruction(
     estimation_options.ransac = ransac_options
 
     # Estimate pose
-    points2D = keypoints["query"][query_keypoint_indices].cpu().numpy()
-    points3D = vstack([map.points3D[i].xyz for i in point3d_indices])
-    pnp_result = cast(
-        dict[str, Any] | None,
-        estimate_and_refine_absolute_pose(points2D, points3D, pycolmap_camera, estimation_options),
-    )
+    points2D = query.keypoints.cpu().numpy()[correspondences.query_keypoint_indices]
+    points3D = map.points3D_xyz[correspondences.point3D_rows]
+    with timed("pnp"):
+        pnp_result = cast(
+            dict[str, Any] | None,
+            estimate_and_refine_absolute_pose(points2D, points3D, pycolmap_camera, estimation_options),
+        )
 
     # Check if pose estimation was successful
     if pnp_result is None:
         raise LocalizationError("Pose estimation failed")
+    if int(pnp_result["num_inliers"]) < min_inliers:
+        raise LocalizationError(f"Too few inliers ({pnp_result['num_inliers']} < {min_inliers})")
 
-    # Change basis if needed
+    # Remembered by sessions, so in OpenCV convention
     cam_from_world = cast(Rigid3d, pnp_result["cam_from_world"])
-    translation = cam_from_world.translation
-    rotation = cam_from_world.rotation.matrix()
+    prior = SessionPrior(
+        cam_from_world.rotation.matrix(),
+        asarray(cam_from_world.translation, dtype=float64),
+        _inlier_image_ids(correspondences.image_ids[asarray(pnp_result["inlier_mask"], dtype=bool)]),
+        monotonic(),
+    )
+
+    transform = _transform_from_pose(cam_from_world, axis_convention)
+
+    # Build metrics
+    with timed("metrics"):
+        metrics = build_localization_metrics(pnp_result, points2D, points3D, pycolmap_camera)
+    # Only for the attempt that succeeded, so fallbacks don't count their correspondences twice
+    count("correspondences", int(correspondences.query_keypoint_indices.size))
+    count("inliers", int(pnp_result["num_inliers"]))
+
+    # Success
+    print(transform.model_dump_json(indent=2))
+    print(metrics.model_dump_json(indent=2))
+    return transform, metrics, correspondences.matching_metrics(int(pnp_result["num_inliers"])), prior
+
+
+# Solves for the pose of a rig from the correspondences of all its frames at once (generalized absolute pose), so frames
+# with too few correspondences to localize alone still constrain it. The transform is rig_from_world (the pose of the
+# frame whose cam_from_rig is the identity, usually the first).
+def localize_rig_against_reconstruction(
+    map: Map,
+    queries: list[QueryFeatures],
+    cameras: list[PinholeCameraConfig],
+    cams_from_rig: list[Transform],
+    axis_convention: AxisConvention,
+    retrieval_top_k: int,
+    ransac_threshold: float,
+    lightglue_profile: LightGlueProfile,
+    vlad_retrieval: bool = False,
+) -> tuple[Transform, LocalizationMetrics, MatchingMetrics]:
+    # Each frame is matched against the images retrieved for it
+    frame_correspondences = [
+        _match_images(map, query, _retrieve_image_ids(map, query, retrieval_top_k, vlad_retrieval), lightglue_profile)
+        for query in queries
+    ]
+    correspondences = frame_correspondences[0]
+    for other in frame_correspondences[1:]:
+        correspondences = correspondences.extend(other)
+    if correspondences.query_keypoint_indices.size == 0:
+        raise LocalizationError("No matching keypoints found")
+
+    pycolmap_cameras: list[ColmapCamera] = []
+    for camera, query in zip(cameras, queries):
+        width, height, *params = transform_intrinsics(camera, query.decoded_size)
+        pycolmap_cameras.append(ColmapCamera(width=width, height=height, model="PINHOLE", params=params))
+    rigids = [_pose_from_transform(cam_from_rig, axis_convention) for cam_from_rig in cams_from_rig]
+
+    points2D = concatenate([
+        query.keypoints.cpu().numpy()[frame.query_keypoint_indices]
+        for query, frame in zip(queries, frame_correspondences)
+    ]).astype(float64)
+    points3D = map.points3D_xyz[correspondences.point3D_rows]
+    camera_indices = concatenate([
+        full(frame.query_keypoint_indices.shape[0], index, dtype=int64)
+        for index, frame in enumerate(frame_correspondences)
+    ])
+
+    ransac_options = RANSACOptions()
+    ransac_options.max_error = ransac_threshold
+    with timed("pnp"):
+        pose_result = cast(
+            dict[str, Any] | None,
+            estimate_and_refine_generalized_absolute_pose(
+                points2D, points3D, camera_indices.tolist(), rigids, pycolmap_cameras, ransac_options
+            ),
+        )
+    if pose_result is None:
+        raise LocalizationError("Pose estimation failed")
+
+    transform = _transform_from_pose(cast(Rigid3d, pose_result["rig_from_world"]), axis_convention)
+    with timed("metrics"):
+        metrics = build_rig_localization_metrics(
+            pose_result, points2D, points3D, camera_indices, pycolmap_cameras, rigids
+        )
+    count("correspondences", int(correspondences.query_keypoint_indices.size))
+    count("inliers", int(pose_result["num_inliers"]))
+
+    print(transform.model_dump_json(indent=2))
+    print(metrics.model_dump_json(indent=2))
+    return transform, metrics, correspondences.matching_metrics(int(pose_result["num_inliers"]))
+
+
+# OpenCV convention poses (cam_from_world, cam_from_rig) as transforms in the given convention, and back
+def _transform_from_pose(pose: Rigid3d, axis_convention: AxisConvention):
+    translation = pose.translation
+    rotation = pose.rotation.matrix()
     if axis_convention == AxisConvention.UNITY:
         translation, rotation = change_basis_unity_from_opencv_pose(translation, rotation)
     rotation = Rotation.from_matrix(rotation).as_quat()
 
-    # Build final transform
-    transform = Transform(
+    return Transform(
         translation=Float3(x=translation[0], y=translation[1], z=translation[2]),
         rotation=Float4(x=rotation[0], y=rotation[1], z=rotation[2], w=rotation[3]),
     )
 
-    # Build metrics
-    metrics = build_localization_metrics(pnp_result, points2D, points3D, pycolmap_camera)
 
-    # Success
-    print(transform.model_dump_json(indent=2))
-    print(metrics.model_dump_json(indent=2))
-    return transform, metrics
+def _pose_from_transform(transform: Transform, axis_convention: AxisConvention):
+    translation = asarray([transform.translation.x, transform.translation.y, transform.translation.z], dtype=float64)
+    rotation = Rotation.from_quat([
+        transform.rotation.x,
+        transform.rotation.y,
+        transform.rotation.z,
+        transform.rotation.w,
+    ]).as_matrix()
+    if axis_convention == AxisConvention.UNITY:
+        translation, rotation = change_basis_opencv_from_unity_pose(translation, rotation)
+
+    return Rigid3d(Rotation3d(rotation), translation)
+
+
+# Image ids ordered by their number of inliers, most first (direct correspondences, with image id -1, are left out)
+def _inlier_image_ids(inlier_image_ids: NDArray[int64]) -> list[int]:
+    image_ids, counts = unique(inlier_image_ids[inlier_image_ids >= 0], return_counts=True)
+    return image_ids[argsort(-counts, kind="stable")].tolist()
+
+
+def _match_pairs(
+    pairs: list[tuple[str, str]],
+    keypoints: dict[str, Tensor],
+    descriptors: dict[str, Tensor],
+    sizes: dict[str, tuple[int, int]],
+    profile: LightGlueProfile,
+):
+    # Adaptive profiles match one pair per forward pass, so batching their pairs would only add a hop through the
+    # batcher's thread (and serialise them behind it)
+    if lightglue_batcher is None or profile.adaptive:
+        return lightglue_match_tensors(lightglue, pairs, keypoints, descriptors, sizes, len(pairs), DEVICE, profile)
+
+    # Each pair is batched with pairs from concurrent requests using the same profile
+    futures = [
+        lightglue_batcher.submit((
+            (keypoints[a], descriptors[a], sizes[a]),
+            (keypoints[b], descriptors[b], sizes[b]),
+            profile,
+        ))
+        for a, b in pairs
+    ]
+    results = [future.result() for future in futures]
+    return (
+        {pair: match_indices for pair, (match_indices, _) in zip(pairs, results)},
+        {pair: layers for pair, (_, layers) in zip(pairs, results)},
+    )
+
+
+# Grad mode is thread-local, so the global set_grad_enabled(False) doesn't cover worker and batcher threads
+@inference_mode()
+def _run_superpoint(images: list[Tensor]) -> list[tuple[Tensor, Tensor]]:
+    detection_threshold = superpoint.conf.detection_threshold
+    if len(images) == 1 or superpoint.conf.max_num_keypoints is None:
+        return [
+            (output["keypoints"][0], output["descriptors"][0])
+            for output in (superpoint({"image": image.unsqueeze(0).to(device=DEVICE)}) for image in images)
+        ]
+
+    # SuperPoint stacks its per-image outputs, so every image in a batch must yield the same number of keypoints. With
+    # the threshold below every (non-border) score, each image is padded to max_num_keypoints with its next highest
+    # scoring pixels, which are dropped again here. Top-k keeps the highest scores, so the keypoints left are the same
+    # as without batching. Batches only run on the batcher's thread, so changing the configuration is safe.
+    superpoint.conf.detection_threshold = PADDED_DETECTION_THRESHOLD
+    try:
+        output = superpoint({"image": stack(images).to(device=DEVICE)})
+    finally:
+        superpoint.conf.detection_threshold = detection_threshold
+
+    detected = output["keypoint_scores"] > detection_threshold
+    return [
+        (keypoints[image_detected], descriptors[image_detected])
+        for keypoints, descriptors, image_detected in zip(output["keypoints"], output["descriptors"], detected)
+    ]
+
+
+@inference_mode()
+def _run_dir(images: list[Tensor]) -> list[Tensor]:
+    return list(dir({"image": stack(images).to(device=DEVICE)})["global_descriptor"])
+
+
+# Batches are grouped by profile, so every pair in one has the same profile
+def _run_lightglue(pairs: list[tuple[LightGlueImage, LightGlueImage, LightGlueProfile]]):
+    match_indices, layers = lightglue_match_batch(
+        lightglue, [a for a, _, _ in pairs], [b for _, b, _ in pairs], DEVICE, pairs[0][2]
+    )
+    return list(zip(match_indices, layers))
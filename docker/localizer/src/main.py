@@ -1,10 +1,14 @@
 from __future__ import annotations
 
-from concurrent.futures import ThreadPoolExecutor
-from os import environ
-from pathlib import Path
-from threading import Lock
-from typing import Annotated
+from asyncio import gather, wrap_future
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from os import environ, sched_getaffinity
+from threading import Event, Lock, Thread
+from time import monotonic
+from typing import TYPE_CHECKING, Annotated, Any
 from uuid import UUID
 
 from common.boto_clients import create_s3_client
@@ -12,40 +16,141 @@ from common.litestar import create_litestar_app
 from common.multipart_requests import MultipartRequestModel, MultipartRequestOperation
 from core.axis_convention import AxisConvention
 from core.camera_config import PinholeCameraConfig
-from litestar import post
+from core.lightglue_profile import LightGlueProfile, LightGlueProfileName, resolve_lightglue_profile
+from core.transform import Transform
+from litestar import delete, get, post, put
 from litestar.datastructures import UploadFile
 from litestar.enums import RequestEncodingType
-from litestar.exceptions import HTTPException
+from litestar.exceptions import HTTPException, NotFoundException
 from litestar.openapi.config import OpenAPIConfig
 from litestar.openapi.spec import Server
 from litestar.params import Body
-from litestar.status_codes import HTTP_422_UNPROCESSABLE_ENTITY
+from litestar.status_codes import HTTP_422_UNPROCESSABLE_ENTITY, HTTP_503_SERVICE_UNAVAILABLE
+from pydantic import field_validator
 
-from .map import Map, load_map
-from .schemas import LoadState, Localization
+from .instrumentation import Timings, render_histograms, snapshot_histograms
+from .map import Map, MapLoadError, MapLoadOptions, load_map
+from .map_cache import MapCache, merge_map_cache_stats
+from .map_disk_cache import MapDiskCache
+from .process_pool import LocalizationProcessPool
+from .schemas import (
+    LoadState,
+    LoadStateResponse,
+    Localization,
+    LocalizationMode,
+    MapCacheStats,
+    PosePrior,
+    WorkerPoolStats,
+)
+from .sessions import SessionStore
 from .settings import get_settings
+from .worker_pool import WorkerPool, WorkerPoolDeadlineError, WorkerPoolSaturatedError, merge_worker_pool_stats
 
-RECONSTRUCTIONS_DIR = Path("/tmp/reconstructions")
-
+if TYPE_CHECKING:
+    from .localize import QueryFeatures
 
-_executor = ThreadPoolExecutor(max_workers=2)
 _load_lock = Lock()
 _load_state: dict[UUID, LoadState] = {}
 _load_error: dict[UUID, str] = {}
-_maps: dict[UUID, Map] = {}
+_load_futures: dict[UUID, Future[Map]] = {}
 
 settings = get_settings()
-s3_client = create_s3_client(
-    minio_endpoint_url=settings.minio_endpoint_url,
-    minio_access_key=settings.minio_access_key,
-    minio_secret_key=settings.minio_secret_key,
+_map_cache = MapCache(
+    settings.map_cache_max_bytes,
+    settings.map_cache_eviction_policy,
+    settings.map_cache_pinned_ids,
+    settings.map_cache_lfu_half_life_seconds,
+    settings.map_cache_lfu_protect_seconds,
+)
+_load_executor = ThreadPoolExecutor(max_workers=settings.map_load_workers, thread_name_prefix="map-loader")
+_map_disk_cache = MapDiskCache(
+    settings.map_disk_cache_dir,
+    settings.map_disk_cache_max_bytes,
+    settings.map_download_workers,
+    settings.map_download_part_concurrency,
+    settings.map_download_part_size_bytes,
 )
 
 
-if not environ.get("CODEGEN"):
+def _create_s3_client():
+    return create_s3_client(
+        minio_endpoint_url=settings.minio_endpoint_url,
+        minio_access_key=settings.minio_access_key,
+        minio_secret_key=settings.minio_secret_key,
+        # Enough connections for every concurrent part download of every concurrently loading map
+        max_pool_connections=settings.map_load_workers
+        * settings.map_download_workers
+        * settings.map_download_part_concurrency,
+    )
+
+
+s3_client = _create_s3_client()
+
+
+def _load_models():
     from .localize import load_models
 
-    load_models(settings.max_keypoints_per_image)
+    load_models(
+        settings.max_keypoints_per_image,
+        settings.superpoint_backend,
+        settings.dir_backend,
+        settings.lightglue_backend,
+        settings.model_artifacts_dir,
+    )
+
+
+# Each localization process would hold its own copy of the models in device memory
+_localization_processes = 1
+if not environ.get("CODEGEN"):
+    from .device import DEVICE
+
+    if settings.localization_processes > 1 and DEVICE != "cpu":
+        print(f"Multiple localization processes aren't supported on {DEVICE}, using a single process")
+    else:
+        _localization_processes = settings.localization_processes
+
+    # Otherwise loaded by each localization process (see _initialize_localization_process), which also imports this
+    # module
+    if _localization_processes == 1:
+        _load_models()
+
+# Per process. Each map is only localized by the process owning it, whatever other maps a request includes (see
+# _localize), so a session's frames for a map always reach the process holding its prior for that map.
+_sessions = SessionStore(settings.max_session_priors, settings.session_prior_max_age_seconds)
+
+# Set once every localization process has warmed up its models (see /ready)
+_warmed_up = Event()
+
+# Only set when localizing in multiple processes (maps are then loaded and held by the processes, not this one)
+_process_pool: LocalizationProcessPool | None = None
+
+# Shared by every request's maps (see _localize_image_against_reconstructions); None localizes them one at a time
+_map_executor = (
+    ThreadPoolExecutor(max_workers=settings.map_localization_workers, thread_name_prefix="map-localizer")
+    if settings.map_localization_workers > 1
+    else None
+)
+
+# Localization is CPU/GPU bound and synchronous, so it runs on a bounded pool of worker threads to keep the event loop
+# (and therefore /health and other requests) responsive. With multiple processes, each has its own pool, whose threads
+# wait on it, so a process busy with a hot map sheds load while the others still admit requests for their maps.
+_worker_pools = [
+    WorkerPool(settings.localization_workers, settings.localization_queue_size, settings.localization_deadline_seconds)
+    for _ in range(_localization_processes)
+]
+
+
+@dataclass(frozen=True)
+class _LocalizationOptions:
+    camera_config: PinholeCameraConfig
+    axis_convention: AxisConvention
+    retrieval_top_k: int
+    ransac_threshold: float
+    session_id: UUID | None
+    lightglue_profile: LightGlueProfile
+    include_timings: bool
+    localization_mode: LocalizationMode
+    pose_prior: PosePrior | None
 
 
 class LocalizationRequest(MultipartRequestModel):
@@ -55,6 +160,70 @@ class LocalizationRequest(MultipartRequestModel):
     retrieval_top_k: int
     ransac_threshold: float
     image: UploadFile
+    # Frames sent with the same session id (e.g. by one device relocalizing continuously) are localized starting from
+    # the session's previous pose
+    session_id: UUID | None = None
+    # Overrides the service's LightGlue profile, or either of its thresholds, for this request
+    lightglue_profile: LightGlueProfileName | None = None
+    lightglue_depth_confidence: float | None = None
+    lightglue_width_confidence: float | None = None
+    # Adds each localization's per-stage timings to the response
+    include_timings: bool = False
+    # Overrides the service's localization mode for this request
+    localization_mode: LocalizationMode | None = None
+    # The client's estimate of its pose in one of the maps: images near it are tried before retrieval
+    pose_prior: PosePrior | None = None
+
+
+@dataclass(frozen=True)
+class _RigLocalizationOptions:
+    camera_configs: list[PinholeCameraConfig]
+    cameras_from_rig: list[Transform]
+    axis_convention: AxisConvention
+    retrieval_top_k: int
+    ransac_threshold: float
+    lightglue_profile: LightGlueProfile
+    include_timings: bool
+
+
+# Images taken together (by the cameras of a rig, or by one camera at known relative poses), localized as one: their
+# correspondences are solved for jointly, so images too weak to localize on their own still count
+class RigLocalizationRequest(MultipartRequestModel):
+    reconstruction_ids: list[UUID]
+    # Per image, in the same order as the images
+    camera_configs: list[PinholeCameraConfig]
+    # Per image, its camera's pose relative to the rig (in the request's axis convention). The localized transform is
+    # the rig's, so with the first image's camera at the identity it is that camera's.
+    cameras_from_rig: list[Transform]
+    axis_convention: AxisConvention
+    retrieval_top_k: int
+    ransac_threshold: float
+    images: list[UploadFile]
+    lightglue_profile: LightGlueProfileName | None = None
+    lightglue_depth_confidence: float | None = None
+    lightglue_width_confidence: float | None = None
+    include_timings: bool = False
+
+    # A single file part isn't extracted as a list
+    @field_validator("images", mode="before")
+    @classmethod
+    def wrap_single_image(cls, value: Any) -> Any:
+        return value if isinstance(value, list) else [value]
+
+
+# A request's profile replaces the service's, along with its threshold overrides
+def _request_lightglue_profile(data: LocalizationRequest | RigLocalizationRequest):
+    depth_confidence = data.lightglue_depth_confidence
+    width_confidence = data.lightglue_width_confidence
+    if data.lightglue_profile is None:
+        if depth_confidence is None:
+            depth_confidence = settings.lightglue_depth_confidence
+        if width_confidence is None:
+            width_confidence = settings.lightglue_width_confidence
+
+    return resolve_lightglue_profile(
+        data.lightglue_profile or settings.lightglue_profile, depth_confidence, width_confidence
+    )
 
 
 @post("/localization", operation_class=MultipartRequestOperation)
@@ -64,34 +233,605 @@ async def localize_image(
     if environ.get("CODEGEN"):
         raise
 
-    # Import here to avoid importing torch during codegen
-    from .localize import LocalizationError, localize_image_against_reconstruction
+    if data.pose_prior is not None and data.pose_prior.reconstruction_id not in data.reconstruction_ids:
+        raise HTTPException(
+            status_code=HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Pose prior is not in one of the requested reconstructions",
+        )
 
     image = await data.image.read()
+    options = _LocalizationOptions(
+        data.camera_config,
+        data.axis_convention,
+        data.retrieval_top_k,
+        data.ransac_threshold,
+        data.session_id,
+        _request_lightglue_profile(data),
+        data.include_timings,
+        data.localization_mode or settings.localization_mode,
+        data.pose_prior,
+    )
+
+    return await _localize(data.reconstruction_ids, _localize_image_against_reconstructions, options, image)
+
+
+@post("/localization/rig", operation_class=MultipartRequestOperation)
+async def localize_rig(
+    data: Annotated[RigLocalizationRequest, Body(media_type=RequestEncodingType.MULTI_PART)],
+) -> list[Localization]:
+    if not len(data.images) == len(data.camera_configs) == len(data.cameras_from_rig):
+        raise HTTPException(
+            status_code=HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Every image needs a camera config and a camera pose relative to the rig",
+        )
+    if not 1 <= len(data.images) <= settings.rig_max_images:
+        raise HTTPException(
+            status_code=HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"A rig localization takes between 1 and {settings.rig_max_images} images",
+        )
+
+    images = [await image.read() for image in data.images]
+    options = _RigLocalizationOptions(
+        data.camera_configs,
+        data.cameras_from_rig,
+        data.axis_convention,
+        data.retrieval_top_k,
+        data.ransac_threshold,
+        _request_lightglue_profile(data),
+        data.include_timings,
+    )
+
+    return await _localize(data.reconstruction_ids, _localize_rig_against_reconstructions, options, images)
+
+
+# Waits for the maps, then runs localize_against_reconstructions(*args, maps) on the worker pool. With localization
+# processes, each localizes the requested maps it owns (concurrently with the others), so a map is only ever loaded and
+# cached by its owner. Requests spanning several owners cost a feature extraction in each of them, and map ranking and
+# the early exit only apply among the maps of each.
+async def _localize(
+    reconstruction_ids: list[UUID],
+    localize_against_reconstructions: Callable[..., tuple[list[Localization], list[str]]],
+    *args: Any,
+):
+    owned_ids: dict[int, list[UUID]] = {0: reconstruction_ids}
+    if _process_pool is not None:
+        owned_ids = {}
+        for id in reconstruction_ids:
+            owned_ids.setdefault(_process_pool.owner(id), []).append(id)
+
+    try:
+        results = await gather(
+            *(
+                _localize_in_process(index, ids, localize_against_reconstructions, args)
+                for index, ids in owned_ids.items()
+            )
+        )
+    except (WorkerPoolSaturatedError, WorkerPoolDeadlineError) as e:
+        raise HTTPException(
+            status_code=HTTP_503_SERVICE_UNAVAILABLE, detail=str(e), headers={"Retry-After": str(e.retry_after_seconds)}
+        ) from e
+
+    localizations = [localization for process_localizations, _ in results for localization in process_localizations]
+    errors = [error for _, process_errors in results for error in process_errors]
+
+    if not localizations:
+        raise HTTPException(status_code=HTTP_422_UNPROCESSABLE_ENTITY, detail="; ".join(errors))
+
+    return localizations
+
+
+async def _localize_in_process(
+    index: int,
+    ids: list[UUID],
+    localize_against_reconstructions: Callable[..., tuple[list[Localization], list[str]]],
+    args: tuple[Any, ...],
+) -> tuple[list[Localization], list[str]]:
+    # Wait for maps outside of the worker pool, so map loads don't tie up localization workers
+    errors: list[str] = []
+    localize: Callable[[], tuple[list[Localization], list[str]]]
+    if _process_pool is None:
+        maps: dict[UUID, Map] = {}
+        for id in ids:
+            try:
+                maps[id] = await wrap_future(_request_map_load(id))
+            except MapLoadError as e:
+                errors.append(f"Reconstruction {id}: Failed to load map: {e}")
+
+        localize = partial(localize_against_reconstructions, *args, maps)
+    else:
+        loaded_ids, errors = await wrap_future(_process_pool.call(index, _load_maps, ids))
+        call = partial(
+            _process_pool.call, index, _localize_against_loaded_maps, localize_against_reconstructions, args, loaded_ids
+        )
+
+        def localize():
+            return call().result()
+
+    localizations, localization_errors = await _worker_pools[index].run(localize)
+    return localizations, errors + localization_errors
+
+
+@post("/maps/{id:uuid}/load")
+async def request_map_load(id: UUID) -> LoadStateResponse:
+    return await _run_in_owner(id, _request_map_load_state, id)
+
+
+@get("/maps/{id:uuid}/load")
+async def get_map_load_state(id: UUID) -> LoadStateResponse:
+    load_state = await _run_in_owner(id, _find_load_state, id)
+    if load_state is None:
+        raise NotFoundException(f"Map {id} has not been requested")
+
+    return load_state
+
+
+@put("/maps/{id:uuid}/pin")
+async def pin_map(id: UUID) -> LoadStateResponse:
+    return await _run_in_owner(id, _pin_map, id)
+
+
+@delete("/maps/{id:uuid}/pin")
+async def unpin_map(id: UUID) -> None:
+    await _run_in_owner(id, _unpin_map, id)
+
+
+@get("/maps/cache", include_in_schema=False)
+async def get_map_cache() -> MapCacheStats:
+    if _process_pool is None:
+        return _map_cache_stats()
+
+    return merge_map_cache_stats(
+        await gather(*(wrap_future(future) for future in _process_pool.call_all(_map_cache_stats)))
+    )
+
+
+@get("/localization/queue", include_in_schema=False)
+async def get_localization_queue() -> WorkerPoolStats:
+    return merge_worker_pool_stats([worker_pool.stats() for worker_pool in _worker_pools])
+
+
+# Unlike /health, only succeeds once the models are warmed up, so new instances don't take traffic before they can
+# localize at full speed
+@get("/ready", include_in_schema=False)
+async def get_readiness() -> dict[str, str]:
+    if not _warmed_up.is_set():
+        raise HTTPException(status_code=HTTP_503_SERVICE_UNAVAILABLE, detail="Warming up")
+    return {"status": "ready"}
+
+
+# Stage latencies and counts of every localization process, for Prometheus to scrape
+@get("/metrics", include_in_schema=False, media_type="text/plain; version=0.0.4")
+async def get_metrics() -> str:
+    snapshots = [snapshot_histograms()]
+    if _process_pool is not None:
+        snapshots += await gather(*(wrap_future(future) for future in _process_pool.call_all(snapshot_histograms)))
+    return render_histograms(snapshots)
+
+
+def _localize_image_against_reconstructions(options: _LocalizationOptions, image: bytes, maps: dict[UUID, Map]):
+    # Import here to avoid importing torch during codegen
+    from .localize import LocalizationError, extract_query_features, localize_query_against_reconstruction
 
     localizations: list[Localization] = []
     errors: list[str] = []
 
-    for id in data.reconstruction_ids:
-        if id not in _maps:
-            _maps[id] = load_map(id, s3_client, settings.reconstructions_bucket, RECONSTRUCTIONS_DIR)
+    if not maps:
+        return localizations, errors
+
+    priors = {id: _sessions.get(options.session_id, id) if options.session_id is not None else None for id in maps}
+    pose_priors = {
+        id: options.pose_prior
+        if options.pose_prior is not None and options.pose_prior.reconstruction_id == id
+        else None
+        for id in maps
+    }
+    direct = options.localization_mode == "direct"
+    # Maps localized without retrieval (unless that fails): from a fresh session prior or a pose prior, or directly
+    # against their 3D points
+    unretrieved_ids = {
+        id
+        for id, map in maps.items()
+        if priors[id] is not None
+        or (pose_priors[id] is not None and map.image_center_tree is not None)
+        or (direct and map.point_descriptor_index is not None)
+    }
+    vlad_retrieval = settings.retrieval_descriptor == "vlad"
+    # DIR is only needed for retrieval, and not with VLAD (it's computed later if needed after all)
+    query_timings = Timings()
+    with query_timings.activate():
+        query = extract_query_features(
+            image,
+            options.camera_config,
+            settings.query_image_max_size,
+            global_descriptor=any(
+                id not in unretrieved_ids and not (vlad_retrieval and map.vlad_aggregator is not None)
+                for id, map in maps.items()
+            ),
+        )
+        targets = _select_maps(maps, unretrieved_ids, query, options.retrieval_top_k)
+    # Query stages are observed once per request, and map stages once per map
+    query_timings.observe()
 
+    def localize_against_map(id: UUID, retrieved_image_ids: list[int] | None):
+        map_timings = Timings()
         try:
-            result = localize_image_against_reconstruction(
-                _maps[id], data.camera_config, data.axis_convention, image, data.retrieval_top_k, data.ransac_threshold
+            with map_timings.activate():
+                transform, metrics, matching, prior = localize_query_against_reconstruction(
+                    maps[id],
+                    query,
+                    options.camera_config,
+                    options.axis_convention,
+                    options.retrieval_top_k,
+                    options.ransac_threshold,
+                    options.lightglue_profile,
+                    priors[id],
+                    settings.session_prior_min_inliers,
+                    settings.covisibility_cluster_min_overlap,
+                    settings.covisibility_min_inliers,
+                    settings.covisibility_expansion_neighbors,
+                    retrieved_image_ids,
+                    settings.direct_matching_ratio if direct else None,
+                    settings.direct_matching_min_inliers,
+                    vlad_retrieval,
+                    pose_priors[id],
+                    settings.pose_prior_min_inliers,
+                )
+        except LocalizationError:
+            if options.session_id is not None:
+                _sessions.discard(options.session_id, id)
+            raise
+        finally:
+            map_timings.observe()
+
+        if options.session_id is not None:
+            _sessions.put(options.session_id, id, prior)
+
+        timings: dict[str, float] | None = None
+        if options.include_timings:
+            # Shared query stages are included in every map's timings
+            timings = dict(query_timings.seconds)
+            for stage, seconds in map_timings.seconds.items():
+                timings[stage] = timings.get(stage, 0.0) + seconds
+
+        return Localization(id=id, transform=transform, metrics=metrics, matching=matching, timings=timings)
+
+    # Maps are matched and their poses estimated concurrently (LightGlue, RANSAC and metrics mostly release the GIL),
+    # so a request takes about as long as its slowest map; results are still taken in rank order, for the early exit
+    futures: list[Future[Localization]] = []
+    if _map_executor is not None and len(targets) > 1:
+        futures = [_map_executor.submit(localize_against_map, id, image_ids) for id, image_ids in targets]
+    results = (
+        (future.result for future in futures)
+        if futures
+        else (partial(localize_against_map, *target) for target in targets)
+    )
+
+    for (id, _), result in zip(targets, results):
+        try:
+            localization = result()
+        except LocalizationError as e:
+            errors.append(f"Reconstruction {id}: {e}")
+            continue
+
+        localizations.append(localization)
+        inliers = localization.matching.inliers if localization.matching is not None else 0
+        early_exit_min_inliers = settings.multi_map_early_exit_min_inliers
+        if early_exit_min_inliers is not None and inliers >= early_exit_min_inliers:
+            # Maps still running finish (and update their sessions), but their results aren't waited for
+            for future in futures:
+                future.cancel()
+            break
+
+    return localizations, errors
+
+
+# Session and pose priors, direct matching and map ranking are single image features: every map is tried, each image
+# retrieving its own images
+def _localize_rig_against_reconstructions(options: _RigLocalizationOptions, images: list[bytes], maps: dict[UUID, Map]):
+    # Import here to avoid importing torch during codegen
+    from .localize import LocalizationError, extract_query_features, localize_rig_against_reconstruction
+
+    localizations: list[Localization] = []
+    errors: list[str] = []
+
+    if not maps:
+        return localizations, errors
+
+    vlad_retrieval = settings.retrieval_descriptor == "vlad"
+    query_timings = Timings()
+    with query_timings.activate():
+        queries = [
+            extract_query_features(
+                image,
+                camera_config,
+                settings.query_image_max_size,
+                global_descriptor=not (
+                    vlad_retrieval and all(map.vlad_aggregator is not None for map in maps.values())
+                ),
             )
+            for image, camera_config in zip(images, options.camera_configs)
+        ]
+    query_timings.observe()
+
+    def localize_against_map(id: UUID):
+        map_timings = Timings()
+        try:
+            with map_timings.activate():
+                transform, metrics, matching = localize_rig_against_reconstruction(
+                    maps[id],
+                    queries,
+                    options.camera_configs,
+                    options.cameras_from_rig,
+                    options.axis_convention,
+                    options.retrieval_top_k,
+                    options.ransac_threshold,
+                    options.lightglue_profile,
+                    vlad_retrieval,
+                )
+        finally:
+            map_timings.observe()
 
-            localizations.append(Localization(id=id, transform=result[0], metrics=result[1]))
+        timings: dict[str, float] | None = None
+        if options.include_timings:
+            timings = dict(query_timings.seconds)
+            for stage, seconds in map_timings.seconds.items():
+                timings[stage] = timings.get(stage, 0.0) + seconds
+
+        return Localization(id=id, transform=transform, metrics=metrics, matching=matching, timings=timings)
+
+    ids = list(maps)
+    futures: list[Future[Localization]] = []
+    if _map_executor is not None and len(ids) > 1:
+        futures = [_map_executor.submit(localize_against_map, id) for id in ids]
+    results = (future.result for future in futures) if futures else (partial(localize_against_map, id) for id in ids)
+
+    for id, result in zip(ids, results):
+        try:
+            localizations.append(result())
         except LocalizationError as e:
-            errors.append(f"Reconstruction {id}: {str(e)}")
+            errors.append(f"Reconstruction {id}: {e}")
 
-    if not localizations:
-        raise HTTPException(status_code=HTTP_422_UNPROCESSABLE_ENTITY, detail="; ".join(errors))
+    return localizations, errors
 
-    return localizations
+
+# The maps to localize against, in order, with their retrieved images when ranked (maps localized without retrieval
+# first, retrieving their own images if that fails)
+def _select_maps(
+    maps: dict[UUID, Map], unretrieved_ids: set[UUID], query: QueryFeatures, retrieval_top_k: int
+) -> list[tuple[UUID, list[int] | None]]:
+    from .localize import rank_maps
+
+    if settings.multi_map_max_maps is None or len(maps) < 2:
+        return [(id, None) for id in maps]
+
+    targets: list[tuple[UUID, list[int] | None]] = [(id, None) for id in maps if id in unretrieved_ids]
+    retrieved_maps = {id: map for id, map in maps.items() if id not in unretrieved_ids}
+    if retrieved_maps and len(targets) < settings.multi_map_max_maps:
+        ranked = rank_maps(retrieved_maps, query, retrieval_top_k, settings.retrieval_descriptor == "vlad")
+        targets += ranked[: settings.multi_map_max_maps - len(targets)]
+        print(f"Localizing against {len(targets)} of {len(maps)} maps")
+    return targets
+
+
+# Runs in the process owning the map (or in this one, without localization processes)
+async def _run_in_owner[T](id: UUID, function: Callable[..., T], *args: Any) -> T:
+    if _process_pool is None:
+        return function(*args)
+
+    return await wrap_future(_process_pool.call(_process_pool.owner(id), function, *args))
+
+
+# Runs in a localization process, which keeps the maps and only returns which of them loaded
+def _load_maps(ids: list[UUID]):
+    maps, errors = _wait_for_maps(ids)
+    return list(maps), errors
+
+
+def _localize_against_loaded_maps(
+    localize_against_reconstructions: Callable[..., tuple[list[Localization], list[str]]],
+    args: tuple[Any, ...],
+    ids: list[UUID],
+):
+    # Normally cache hits, unless a map was evicted since _load_maps
+    maps, errors = _wait_for_maps(ids)
+    localizations, localization_errors = localize_against_reconstructions(*args, maps)
+    return localizations, errors + localization_errors
+
+
+def _wait_for_maps(ids: list[UUID]):
+    maps: dict[UUID, Map] = {}
+    errors: list[str] = []
+    for id in ids:
+        try:
+            maps[id] = _request_map_load(id).result()
+        except MapLoadError as e:
+            errors.append(f"Reconstruction {id}: Failed to load map: {e}")
+
+    return maps, errors
+
+
+def _request_map_load_state(id: UUID):
+    _request_map_load(id)
+    return _get_load_state(id)
+
+
+def _find_load_state(id: UUID):
+    with _load_lock:
+        if id not in _load_state:
+            return None
+
+    return _get_load_state(id)
+
+
+def _pin_map(id: UUID):
+    _map_cache.pin(id)
+    return _request_map_load_state(id)
+
+
+def _unpin_map(id: UUID):
+    _map_cache.unpin(id)
+
+
+def _map_cache_stats():
+    return _map_cache.stats()
+
+
+def _request_map_load(id: UUID) -> Future[Map]:
+    with _load_lock:
+        # Concurrent requests for the same map share a single load
+        future = _load_futures.get(id)
+        if future is not None:
+            return future
+
+        future = Future[Map]()
+        map = _map_cache.get(id)
+        if map is not None:
+            future.set_result(map)
+            return future
+
+        _load_state[id] = LoadState.PENDING
+        _load_error.pop(id, None)
+        _load_futures[id] = _load_executor.submit(_load_map, id)
+        return _load_futures[id]
+
+
+def _load_map(id: UUID):
+    with _load_lock:
+        _load_state[id] = LoadState.LOADING
+
+    started_at = monotonic()
+    try:
+        map = load_map(id, s3_client, settings.reconstructions_bucket, _map_disk_cache, _map_load_options(id))
+    except Exception as e:
+        print(f"Failed to load map {id}: {e}")
+        with _load_lock:
+            _load_state[id] = LoadState.FAILED
+            _load_error[id] = str(e)
+            # Forget the failed load, so the next request retries it
+            del _load_futures[id]
+        raise MapLoadError(str(e)) from e
+
+    evicted_ids = _map_cache.put(id, map, monotonic() - started_at)
+
+    with _load_lock:
+        _load_state[id] = LoadState.READY
+        del _load_futures[id]
+
+        for evicted_id in evicted_ids:
+            print(f"Evicted map {evicted_id} from cache")
+            _load_state[evicted_id] = LoadState.EVICTED
+
+    return map
+
+
+def _map_load_options(id: UUID):
+    return MapLoadOptions(
+        descriptor_storage=settings.map_descriptor_storage.get(id, settings.descriptor_storage),
+        decoded_descriptor_cache_images=settings.decoded_descriptor_cache_images,
+        use_retrieval_index=settings.use_retrieval_index,
+        retrieval_hnsw_ef_search=settings.retrieval_hnsw_ef_search,
+        retrieval_ivf_nprobe=settings.retrieval_ivf_nprobe,
+        use_point_descriptor_index=settings.use_point_descriptor_index,
+        point_descriptor_hnsw_ef_search=settings.point_descriptor_hnsw_ef_search,
+        point_descriptor_ivf_nprobe=settings.point_descriptor_ivf_nprobe,
+    )
+
+
+def _get_load_state(id: UUID):
+    with _load_lock:
+        return LoadStateResponse(status=_load_state[id], error=_load_error.get(id))
+
+
+def _start_localization():
+    from .localize import start_inference_batchers
+
+    if settings.inference_batching:
+        start_inference_batchers(
+            settings.inference_batch_max_images,
+            settings.inference_batch_max_pairs,
+            settings.inference_batch_max_wait_ms / 1000,
+        )
+
+
+def _warm_up_localization():
+    from .localize import warm_up
+
+    warm_up((settings.warmup_image_height, settings.warmup_image_width))
+
+
+def _warm_up():
+    try:
+        if _process_pool is None:
+            _warm_up_localization()
+        else:
+            for future in _process_pool.call_all(_warm_up_localization):
+                future.result()
+    except Exception:
+        # Stays unready, so the instance is replaced rather than serving with broken models (the thread prints the
+        # traceback)
+        print("Warmup failed")
+        raise
+
+    _warmed_up.set()
+
+
+# Runs in a fresh localization process, which has imported this module (without loading the models) to unpickle it
+def _initialize_localization_process(index: int):
+    from torch import set_num_threads
+
+    print(f"Starting localization process {index}")
+    # Processes split the cores and the map cache budget between them
+    set_num_threads(max(1, len(sched_getaffinity(0)) // _localization_processes))
+    _map_cache.max_bytes = settings.map_cache_max_bytes // _localization_processes
+    _load_models()
+    _start_localization()
+
+
+def _start_serving():
+    if environ.get("CODEGEN"):
+        return
+
+    global _process_pool
+
+    if _localization_processes > 1:
+        _process_pool = LocalizationProcessPool(
+            _localization_processes,
+            _initialize_localization_process,
+            settings.localization_workers + settings.map_load_workers,
+        )
+    else:
+        _start_localization()
+
+    if settings.warmup:
+        # In the background, so /health responds while warming up
+        Thread(target=_warm_up, name="warmup", daemon=True).start()
+    else:
+        _warmed_up.set()
+
+    # Warm the cache with pinned maps, so they are ready before their first localization
+    for id in _map_cache.pinned_ids():
+        if _process_pool is None:
+            _request_map_load(id)
+        else:
+            _process_pool.call(_process_pool.owner(id), _request_map_load_state, id)
 
 
 openapi_config = OpenAPIConfig("Localizer", "0.1.0", servers=[Server(url="http://localhost:8000")])
 
 
-app = create_litestar_app([localize_image], openapi_config)
+app = create_litestar_app(
+    [
+        localize_image,
+        localize_rig,
+        request_map_load,
+        get_map_load_state,
+        pin_map,
+        unpin_map,
+        get_map_cache,
+        get_localization_queue,
+        get_readiness,
+        get_metrics,
+    ],
+    openapi_config,
+    on_startup=[_start_serving],
+)
@@ -2,89 +2,325 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Mapping, cast
+from time import perf_counter
+from typing import TYPE_CHECKING, Any
 from uuid import UUID
 
 from core.h5 import FEATURES_FILE, GLOBAL_DESCRIPTORS_FILE, read_features, read_global_descriptors
-from core.opq import OPQ_MATRIX_FILE, PQ_QUANTIZER_FILE, read_opq_matrix, read_pq_quantizer
-from faiss import (  # type: ignore
-    OPQMatrix,
-    ProductQuantizer,
+from core.localization_bundle import (
+    LOCALIZATION_BUNDLE_FILE,
+    LocalizationBundle,
+    build_localization_bundle,
+    deserialize_opq_matrix,
+    deserialize_pq_quantizer,
+    read_localization_bundle,
+)
+from core.opq import OPQ_MATRIX_FILE, PQ_QUANTIZER_FILE
+from core.point_descriptor_index import (
+    POINT_DESCRIPTOR_INDEX_FILE,
+    configure_point_descriptor_index,
+    read_point_descriptor_index,
+)
+from core.retrieval_index import RETRIEVAL_INDEX_FILE, configure_retrieval_index, read_retrieval_index
+from core.vlad import VladAggregator
+from faiss import Index  # type: ignore
+from numpy import (
+    concatenate,
+    cumsum,
+    diff,
+    float32,
+    float64,
+    frombuffer,
+    int32,
+    int64,
+    nonzero,
+    searchsorted,
+    split,
+    uint8,
 )
-from numpy import float32, stack, uint8
 from numpy.typing import NDArray
 from pycolmap import Reconstruction
-from pycolmap._core import ImageMap, Point3DMap
+from scipy.spatial import cKDTree
+
+from .instrumentation import MAP_LOAD_SECONDS, Timings, add_seconds, timed
+from .map_disk_cache import MapDiskCache
+from .schemas import DescriptorStorage
 
 if TYPE_CHECKING:
     from mypy_boto3_s3 import S3Client
+    from torch import Tensor
+
+    from .descriptor_store import DescriptorStore
 else:
     S3Client = Any
 
 
+class MapLoadError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class MapLoadOptions:
+    descriptor_storage: DescriptorStorage
+    decoded_descriptor_cache_images: int
+    use_retrieval_index: bool
+    retrieval_hnsw_ef_search: int
+    retrieval_ivf_nprobe: int
+    use_point_descriptor_index: bool
+    point_descriptor_hnsw_ef_search: int
+    point_descriptor_ivf_nprobe: int
+
+
+# Image covisibility from the reconstruction: how many 3D points each image shares with its most covisible neighbours
+@dataclass(frozen=True)
+class CovisibilityGraph:
+    # Sorted image ids, whose positions are the rows used by the graph
+    image_ids: NDArray[int64]
+    # Number of 3D points observed by each image
+    point_counts: NDArray[int64]
+    # CSR adjacency, most shared points first
+    offsets: NDArray[int64]
+    rows: NDArray[int32]
+    counts: NDArray[int32]
+
+    def size_bytes(self):
+        return (
+            self.image_ids.nbytes
+            + self.point_counts.nbytes
+            + self.offsets.nbytes
+            + self.rows.nbytes
+            + self.counts.nbytes
+        )
+
+    # Each image only keeps its strongest neighbours, so a pair may be listed by just one of its images (the one for
+    # which the other is among the strongest); either gives the count, since sharing is symmetric
+    def shared_points(self, row: int, other_row: int):
+        return max(self._listed_shared_points(row, other_row), self._listed_shared_points(other_row, row))
+
+    def _listed_shared_points(self, row: int, other_row: int):
+        neighbors = self.rows[self.offsets[row] : self.offsets[row + 1]]
+        matches = nonzero(neighbors == other_row)[0]
+        return int(self.counts[self.offsets[row] + matches[0]]) if matches.size > 0 else 0
+
+    # Up to count of each image's most covisible neighbours (strongest first) that aren't excluded, without repeats
+    def neighbors(self, image_ids: list[int], count: int, exclude: set[int]):
+        seen = set(exclude)
+        neighbor_ids: list[int] = []
+        for row in searchsorted(self.image_ids, image_ids).tolist():
+            added = 0
+            for neighbor_row in self.rows[self.offsets[row] : self.offsets[row + 1]].tolist():
+                if added == count:
+                    break
+                neighbor_id = int(self.image_ids[neighbor_row])
+                if neighbor_id not in seen:
+                    seen.add(neighbor_id)
+                    neighbor_ids.append(neighbor_id)
+                    added += 1
+        return neighbor_ids
+
+    # Groups image ids (in order of preference) so that each image joins the first cluster whose first image shares at
+    # least min_overlap of the smaller of the two images' 3D points with it. Clusters keep the order of preference, so
+    # the first image of each cluster is its most preferred.
+    def cluster(self, image_ids: list[int], min_overlap: float):
+        rows = searchsorted(self.image_ids, image_ids).tolist()
+        clusters: list[list[int]] = []
+        cluster_rows: list[int] = []
+        for image_id, row in zip(image_ids, rows):
+            for cluster, cluster_row in zip(clusters, cluster_rows):
+                smaller_point_count = min(int(self.point_counts[row]), int(self.point_counts[cluster_row]))
+                if (
+                    smaller_point_count > 0
+                    and self.shared_points(cluster_row, row) >= min_overlap * smaller_point_count
+                ):
+                    cluster.append(image_id)
+                    break
+            else:
+                clusters.append([image_id])
+                cluster_rows.append(row)
+        return clusters
+
+
 @dataclass(frozen=True)
 class Map:
-    points3D: Point3DMap
-    images: ImageMap
     ordered_image_ids: list[int]
     image_sizes: dict[str, tuple[int, int]]
-    keypoints: dict[int, NDArray[float32]]
-    pq_codes: dict[int, NDArray[uint8]]
-    global_descriptors_matrix: NDArray[float32]
-    opq_matrix: OPQMatrix
-    product_quantizer: ProductQuantizer
-
-
-def load_map(id: UUID, s3_client: S3Client, reconstruction_bucket: str, reconstructions_dir: Path) -> Map:
-    for page in s3_client.get_paginator("list_objects_v2").paginate(Bucket=reconstruction_bucket, Prefix=f"{id}/"):
-        for obj in page.get("Contents", []):
-            key = obj["Key"]  # type: ignore
-            if not (
-                key.startswith(f"{id}/sfm_model/")
-                or key
-                in {
-                    f"{id}/{GLOBAL_DESCRIPTORS_FILE}",
-                    f"{id}/{FEATURES_FILE}",
-                    f"{id}/{OPQ_MATRIX_FILE}",
-                    f"{id}/{PQ_QUANTIZER_FILE}",
-                }
-            ):
-                continue
-
-            local_path = reconstructions_dir / str(id) / key[len(str(id)) :].lstrip("/")
-            local_path.parent.mkdir(parents=True, exist_ok=True)
-            print(f"Downloading s3://{reconstruction_bucket}/{key} to {local_path}")
-            s3_client.download_file(reconstruction_bucket, key, str(local_path))
-
-    reconstruction_path = reconstructions_dir / str(id)
-    reconstruction = Reconstruction(str(reconstruction_path / "sfm_model"))
-    ordered_image_ids: list[int] = sorted(cast(Mapping[int, Any], reconstruction.images).keys())
-    ordered_image_names = [reconstruction.images[image_id].name for image_id in ordered_image_ids]
-    global_descriptors_by_name = read_global_descriptors(reconstruction_path, ordered_image_names)
-    (keypoints_by_name, pq_codes_by_name) = read_features(reconstruction_path, ordered_image_names)
-
-    image_sizes: dict[str, tuple[int, int]] = {}
-    global_descriptor_rows: list[NDArray[float32]] = []
-    keypoints: dict[int, NDArray[float32]] = {}
-    pq_codes: dict[int, NDArray[uint8]] = {}
-
-    for image_id in ordered_image_ids:
-        image = reconstruction.images[image_id]
-        camera = reconstruction.cameras[image.camera_id]
-        name = image.name
-        image_sizes[str(image_id)] = (camera.height, camera.width)
-        keypoints[image_id] = keypoints_by_name[name]
-        pq_codes[image_id] = pq_codes_by_name[name]
-        global_descriptor_rows.append(global_descriptors_by_name[name])
+    # Views into a single device tensor holding the keypoints of all images
+    keypoints: dict[int, Tensor]
+    # Per image, the row in points3D_xyz observed by each keypoint, or -1 if the keypoint has no 3D point (views into a
+    # single array, like keypoints)
+    point3D_rows: dict[int, NDArray[int32]]
+    # COLMAP ids and world coordinates of the 3D points, one row per point
+    point3D_ids: NDArray[int64]
+    points3D_xyz: NDArray[float64]
+    # Per image (in ordered_image_ids order), the world coordinates of its camera centre and its viewing direction (None
+    # for bundles written before these were added)
+    image_centers: NDArray[float64] | None
+    image_viewing_directions: NDArray[float64] | None
+    # Spatial index of image_centers, for selecting images near a pose
+    image_center_tree: cKDTree | None
+    # None for bundles written before it was added
+    covisibility: CovisibilityGraph | None
+    # Device tensor with one row per image, in ordered_image_ids order
+    global_descriptors_matrix: Tensor
+    # Aggregates query descriptors for VLAD retrieval, against one row per image in ordered_image_ids order (None for
+    # bundles written before they were added)
+    vlad_aggregator: VladAggregator | None
+    vlad_descriptors: NDArray[float32] | None
+    descriptors: DescriptorStore
+    # Approximate nearest-neighbour index over the global descriptors, returning image ids (large maps only)
+    retrieval_index: Index | None
+    retrieval_index_size_bytes: int
+    # Nearest-neighbour index over a descriptor per 3D point, returning rows of points3D_xyz (direct localization only)
+    point_descriptor_index: Index | None
+    point_descriptor_index_size_bytes: int
+
+    def size_bytes(self):
+        size = self.global_descriptors_matrix.nbytes
+        size += self.retrieval_index_size_bytes
+        size += self.point_descriptor_index_size_bytes
+        if self.vlad_aggregator is not None and self.vlad_descriptors is not None:
+            size += self.vlad_aggregator.projection.nbytes + self.vlad_descriptors.nbytes
+        size += sum(keypoints.nbytes for keypoints in self.keypoints.values())
+        size += self.descriptors.size_bytes()
+        size += sum(rows.nbytes for rows in self.point3D_rows.values())
+        size += self.point3D_ids.nbytes + self.points3D_xyz.nbytes
+        if self.image_centers is not None and self.image_viewing_directions is not None:
+            # The tree holds a copy of the centres, and about as much again in its nodes
+            size += 3 * self.image_centers.nbytes + self.image_viewing_directions.nbytes
+        if self.covisibility is not None:
+            size += self.covisibility.size_bytes()
+        return size
+
+
+def load_map(
+    id: UUID, s3_client: S3Client, reconstruction_bucket: str, disk_cache: MapDiskCache, options: MapLoadOptions
+) -> Map:
+    timings = Timings()
+    with timings.activate(), timed("total"):
+        start = perf_counter()
+        with disk_cache.fetch(id, s3_client, reconstruction_bucket, _select_map_files) as reconstruction_path:
+            add_seconds("fetch", perf_counter() - start)
+            map = _read_map(reconstruction_path, options)
+
+    timings.observe(MAP_LOAD_SECONDS)
+    print(f"Loaded map {id} in " + ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in timings.seconds.items()))
+    return map
+
+
+def _select_map_files(relative_paths: set[str]):
+    # Reconstructions made before the localization bundle existed only have the COLMAP model and h5 files
+    if LOCALIZATION_BUNDLE_FILE in relative_paths:
+        files = {LOCALIZATION_BUNDLE_FILE}
+    else:
+        files = {path for path in relative_paths if path.startswith("sfm_model/")}
+        files |= {GLOBAL_DESCRIPTORS_FILE, FEATURES_FILE, OPQ_MATRIX_FILE, PQ_QUANTIZER_FILE}
+    return (files | {RETRIEVAL_INDEX_FILE, POINT_DESCRIPTOR_INDEX_FILE}) & relative_paths
+
+
+def _read_map(reconstruction_path: Path, options: MapLoadOptions):
+    # Imported here because torch isn't installed when generating the OpenAPI spec
+    from torch import from_numpy
+
+    from .descriptor_store import DescriptorStore
+    from .device import DEVICE
+
+    with timed("read"):
+        if (reconstruction_path / LOCALIZATION_BUNDLE_FILE).exists():
+            bundle = read_localization_bundle(reconstruction_path)
+        else:
+            bundle = _read_legacy_bundle(reconstruction_path)
+
+    ordered_image_ids = [int(image_id) for image_id in bundle.image_ids]
+    image_sizes = {
+        str(image_id): (int(height), int(width))
+        for image_id, (height, width) in zip(ordered_image_ids, bundle.image_sizes)
+    }
+    # Per-image arrays are views into the bundle's arrays; on the CPU from_numpy shares their (memory-mapped) memory,
+    # so only the device upload copies anything
+    keypoint_splits = bundle.keypoint_offsets[1:-1]
+    global_descriptors_matrix = from_numpy(bundle.global_descriptors).to(DEVICE).contiguous()
+    all_keypoints = from_numpy(bundle.keypoints).to(DEVICE)
+    keypoint_counts = (bundle.keypoint_offsets[1:] - bundle.keypoint_offsets[:-1]).tolist()
+    keypoints = dict(zip(ordered_image_ids, all_keypoints.split(keypoint_counts)))
+    point3D_rows = dict(zip(ordered_image_ids, split(bundle.point3D_rows, keypoint_splits)))
+    pq_codes = dict(zip(ordered_image_ids, split(bundle.pq_codes, keypoint_splits)))
+
+    covisibility: CovisibilityGraph | None = None
+    if (
+        bundle.covisibility_offsets is not None
+        and bundle.covisibility_rows is not None
+        and bundle.covisibility_counts is not None
+    ):
+        observed = (bundle.point3D_rows >= 0).astype(int64)
+        covisibility = CovisibilityGraph(
+            bundle.image_ids,
+            diff(concatenate([[0], cumsum(observed)])[bundle.keypoint_offsets]),
+            bundle.covisibility_offsets,
+            bundle.covisibility_rows,
+            bundle.covisibility_counts,
+        )
+
+    # The reconstructor only builds a retrieval index for maps too large for exhaustive search
+    retrieval_index: Index | None = None
+    retrieval_index_size_bytes = 0
+    retrieval_index_path = reconstruction_path / RETRIEVAL_INDEX_FILE
+    if options.use_retrieval_index and retrieval_index_path.exists():
+        with timed("retrieval_index"):
+            retrieval_index = read_retrieval_index(reconstruction_path)
+            configure_retrieval_index(retrieval_index, options.retrieval_hnsw_ef_search, options.retrieval_ivf_nprobe)
+        retrieval_index_size_bytes = retrieval_index_path.stat().st_size
+
+    point_descriptor_index: Index | None = None
+    point_descriptor_index_size_bytes = 0
+    point_descriptor_index_path = reconstruction_path / POINT_DESCRIPTOR_INDEX_FILE
+    if options.use_point_descriptor_index and point_descriptor_index_path.exists():
+        with timed("point_descriptor_index"):
+            point_descriptor_index = read_point_descriptor_index(reconstruction_path)
+            configure_point_descriptor_index(
+                point_descriptor_index, options.point_descriptor_hnsw_ef_search, options.point_descriptor_ivf_nprobe
+            )
+        point_descriptor_index_size_bytes = point_descriptor_index_path.stat().st_size
 
     return Map(
-        reconstruction.points3D,
-        reconstruction.images,
         ordered_image_ids,
         image_sizes,
         keypoints,
+        point3D_rows,
+        bundle.point3D_ids,
+        bundle.points3D_xyz,
+        bundle.image_centers,
+        bundle.image_viewing_directions,
+        cKDTree(bundle.image_centers) if bundle.image_centers is not None else None,
+        covisibility,
+        global_descriptors_matrix,
+        bundle.vlad_aggregator(),
+        bundle.vlad_descriptors,
+        DescriptorStore(
+            deserialize_opq_matrix(bundle.opq_matrix),
+            deserialize_pq_quantizer(bundle.pq_quantizer),
+            pq_codes,
+            options.descriptor_storage,
+            options.decoded_descriptor_cache_images,
+        ),
+        retrieval_index,
+        retrieval_index_size_bytes,
+        point_descriptor_index,
+        point_descriptor_index_size_bytes,
+    )
+
+
+# Builds the bundle in memory from the COLMAP model and h5 files
+def _read_legacy_bundle(reconstruction_path: Path) -> LocalizationBundle:
+    reconstruction = Reconstruction(str(reconstruction_path / "sfm_model"))
+    image_names = [image.name for image in reconstruction.images.values()]
+    global_descriptors = read_global_descriptors(reconstruction_path, image_names)
+    (keypoints, pq_codes) = read_features(reconstruction_path, image_names)
+
+    return build_localization_bundle(
+        reconstruction,
+        keypoints,
         pq_codes,
-        stack(global_descriptor_rows, axis=0),
-        read_opq_matrix(reconstruction_path),
-        read_pq_quantizer(reconstruction_path),
+        global_descriptors,
+        frombuffer((reconstruction_path / OPQ_MATRIX_FILE).read_bytes(), dtype=uint8),
+        frombuffer((reconstruction_path / PQ_QUANTIZER_FILE).read_bytes(), dtype=uint8),
     )
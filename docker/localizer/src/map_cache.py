@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from math import exp2
+from threading import Lock
+from time import monotonic
+from uuid import UUID
+
+from .map import Map
+from .schemas import MapCacheEntryStats, MapCacheEvictionPolicy, MapCacheStats
+
+
+@dataclass
+class _Entry:
+    map: Map
+    size_bytes: int
+    load_seconds: float
+    loaded_at: float
+    hits: int = 0
+    last_used: float = 0.0
+    # Hits halved every LFU half-life, as of scored_at
+    score: float = 0.0
+    scored_at: float = 0.0
+
+    def decayed_score(self, now: float, half_life_seconds: float):
+        return self.score * exp2(-(now - self.scored_at) / half_life_seconds)
+
+
+class MapCache:
+    def __init__(
+        self,
+        max_bytes: int,
+        eviction_policy: MapCacheEvictionPolicy,
+        pinned_ids: list[UUID],
+        lfu_half_life_seconds: float = 600.0,
+        lfu_protect_seconds: float = 60.0,
+    ):
+        self.max_bytes = max_bytes
+        self.eviction_policy: MapCacheEvictionPolicy = eviction_policy
+        self.lfu_half_life_seconds = lfu_half_life_seconds
+        self.lfu_protect_seconds = lfu_protect_seconds
+
+        self._lock = Lock()
+        # Ordered from least to most recently used
+        self._entries: OrderedDict[UUID, _Entry] = OrderedDict()
+        # Pins are tracked independently of entries, so a map can be pinned before it is loaded
+        self._pinned: set[UUID] = set(pinned_ids)
+        self._used_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._loads = 0
+        self._load_seconds_total = 0.0
+
+    def get(self, id: UUID):
+        with self._lock:
+            entry = self._entries.get(id)
+            if entry is None:
+                self._misses += 1
+                return None
+
+            now = monotonic()
+            self._hits += 1
+            entry.hits += 1
+            entry.score = entry.decayed_score(now, self.lfu_half_life_seconds) + 1
+            entry.scored_at = now
+            entry.last_used = now
+            self._entries.move_to_end(id)
+            return entry.map
+
+    # Returns the ids of the maps that were evicted to make room for the new one
+    def put(self, id: UUID, map: Map, load_seconds: float):
+        size_bytes = map.size_bytes()
+
+        with self._lock:
+            previous = self._entries.pop(id, None)
+            if previous is not None:
+                self._used_bytes -= previous.size_bytes
+
+            now = monotonic()
+            self._entries[id] = _Entry(map, size_bytes, load_seconds, now, last_used=now, scored_at=now)
+            self._used_bytes += size_bytes
+            self._loads += 1
+            self._load_seconds_total += load_seconds
+
+            evicted: list[UUID] = []
+            while self._used_bytes > self.max_bytes:
+                victim = self._select_victim(exclude=id)
+                if victim is None:
+                    # Everything else is pinned (or the new map alone exceeds the budget); keep it rather than fail
+                    print(f"Map cache is over budget ({self._used_bytes} > {self.max_bytes} bytes)")
+                    break
+
+                self._used_bytes -= self._entries.pop(victim).size_bytes
+                self._evictions += 1
+                evicted.append(victim)
+
+            return evicted
+
+    def pin(self, id: UUID):
+        with self._lock:
+            self._pinned.add(id)
+
+    def unpin(self, id: UUID):
+        with self._lock:
+            self._pinned.discard(id)
+
+    def pinned_ids(self):
+        with self._lock:
+            return list(self._pinned)
+
+    def stats(self):
+        with self._lock:
+            now = monotonic()
+            return MapCacheStats(
+                max_bytes=self.max_bytes,
+                used_bytes=self._used_bytes,
+                eviction_policy=self.eviction_policy,
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                loads=self._loads,
+                load_seconds_total=self._load_seconds_total,
+                maps=[
+                    MapCacheEntryStats(
+                        id=id,
+                        size_bytes=entry.size_bytes,
+                        pinned=id in self._pinned,
+                        hits=entry.hits,
+                        load_seconds=entry.load_seconds,
+                        idle_seconds=now - entry.last_used,
+                    )
+                    for id, entry in self._entries.items()
+                ],
+            )
+
+    def _select_victim(self, exclude: UUID):
+        candidates = [id for id in self._entries if id != exclude and id not in self._pinned]
+        if not candidates:
+            return None
+
+        if self.eviction_policy == "lfu":
+            # Recently loaded maps haven't had the chance to be used yet, so they are only evicted if nothing else can
+            # be (otherwise maps that don't fit together evict each other on every load). Among the rest, the least
+            # frequently used recently (hits decay, so maps used heavily long ago make room), ties broken by least
+            # recently used (candidates are in LRU order).
+            now = monotonic()
+            unprotected = [id for id in candidates if now - self._entries[id].loaded_at >= self.lfu_protect_seconds]
+            return min(
+                unprotected or candidates,
+                key=lambda id: self._entries[id].decayed_score(now, self.lfu_half_life_seconds),
+            )
+
+        return candidates[0]
+
+
+# Combines the caches of several localization processes, which hold disjoint sets of maps
+def merge_map_cache_stats(stats: list[MapCacheStats]):
+    return MapCacheStats(
+        max_bytes=sum(cache.max_bytes for cache in stats),
+        used_bytes=sum(cache.used_bytes for cache in stats),
+        eviction_policy=stats[0].eviction_policy,
+        hits=sum(cache.hits for cache in stats),
+        misses=sum(cache.misses for cache in stats),
+        evictions=sum(cache.evictions for cache in stats),
+        loads=sum(cache.loads for cache in stats),
+        load_seconds_total=sum(cache.load_seconds_total for cache in stats),
+        maps=[map for cache in stats for map in cache.maps],
+    )
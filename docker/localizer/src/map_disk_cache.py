@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Generator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from fcntl import LOCK_EX, LOCK_NB, flock
+from json import JSONDecodeError, dumps, loads
+from os import fstat
+from os.path import samestat
+from pathlib import Path
+from shutil import rmtree
+from threading import Lock
+from typing import IO, TYPE_CHECKING, Any
+from uuid import UUID
+
+from common.boto_clients import create_s3_transfer_config
+
+if TYPE_CHECKING:
+    from mypy_boto3_s3 import S3Client
+else:
+    S3Client = Any
+
+# Records the ETag and size of every file downloaded into a map directory; its mtime doubles as the last use time
+MANIFEST_FILE = ".manifest.json"
+PARTIAL_SUFFIX = ".part"
+# Per-map lock files in the cache root, so localizer processes sharing the cache don't download into or remove a map
+# directory another process is using. Removed along with the map's directory.
+LOCK_FILE_SUFFIX = ".lock"
+
+
+class MapDiskCache:
+    def __init__(self, root: Path, max_bytes: int, download_workers: int, part_concurrency: int, part_size_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.download_workers = download_workers
+        # Large files (features, descriptors) are additionally split into parts that download concurrently
+        self.transfer_config = create_s3_transfer_config(part_size_bytes, part_concurrency)
+
+        self._lock = Lock()
+        # Maps whose files are being downloaded or read, which cleanup must leave alone
+        self._in_use: dict[UUID, int] = {}
+
+    # Makes the objects under s3://{bucket}/{id}/ chosen by select (given every relative path in the prefix) available
+    # locally, downloading only files that are missing or whose ETag changed, and yields the local directory. The files
+    # stay in place until the block exits (files memory-mapped by then stay readable even if cleanup removes them).
+    @contextmanager
+    def fetch(
+        self, id: UUID, s3_client: S3Client, bucket: str, select: Callable[[set[str]], set[str]]
+    ) -> Generator[Path]:
+        with self._lock:
+            self._in_use[id] = self._in_use.get(id, 0) + 1
+
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            with self._map_lock(id):
+                yield self._sync(id, s3_client, bucket, select)
+        finally:
+            with self._lock:
+                self._in_use[id] -= 1
+                if self._in_use[id] == 0:
+                    del self._in_use[id]
+
+            self.cleanup()
+
+    def cleanup(self):
+        with self._lock:
+            if not self.root.exists():
+                return
+
+            directories = [path for path in self.root.iterdir() if path.is_dir()]
+            self._remove_orphaned_lock_files({directory.name for directory in directories})
+            sizes = {directory: _directory_size(directory) for directory in directories}
+            used_bytes = sum(sizes.values())
+
+            # Least recently used first
+            for directory in sorted(directories, key=_last_used):
+                if used_bytes <= self.max_bytes:
+                    break
+                id = _parse_id(directory.name)
+                if id is None or id in self._in_use:
+                    continue
+
+                with self._map_lock(id, blocking=False) as locked:
+                    if not locked:
+                        # In use by another process
+                        continue
+
+                    print(f"Removing cached map files in {directory} ({sizes[directory]} bytes)")
+                    rmtree(directory, ignore_errors=True)
+                    self._lock_path(id).unlink(missing_ok=True)
+                    used_bytes -= sizes[directory]
+
+            if used_bytes > self.max_bytes:
+                print(f"Map disk cache is over budget ({used_bytes} > {self.max_bytes} bytes)")
+
+    def _lock_path(self, id: UUID):
+        return self.root / f".{id}{LOCK_FILE_SUFFIX}"
+
+    # Yields whether the map's lock file was locked (always, if blocking). Lock files are removed while locked, so a
+    # process that opened one before its removal locks a file no one else can open; the lock is then retaken on the
+    # file now at the path.
+    @contextmanager
+    def _map_lock(self, id: UUID, blocking: bool = True) -> Generator[bool]:
+        path = self._lock_path(id)
+        while True:
+            with open(path, "a") as lock_file:
+                try:
+                    flock(lock_file, LOCK_EX if blocking else LOCK_EX | LOCK_NB)
+                except BlockingIOError:
+                    yield False
+                    return
+
+                if _is_current(lock_file, path):
+                    yield True
+                    return
+
+    # Lock files of maps with no cached directory (removed other than by eviction, which removes its lock file too)
+    def _remove_orphaned_lock_files(self, directory_names: set[str]):
+        for path in self.root.glob(f".*{LOCK_FILE_SUFFIX}"):
+            id = _parse_id(path.name[1 : -len(LOCK_FILE_SUFFIX)])
+            if id is None or id in self._in_use or str(id) in directory_names:
+                continue
+
+            with self._map_lock(id, blocking=False) as locked:
+                if locked and not (self.root / str(id)).exists():
+                    path.unlink(missing_ok=True)
+
+    def _sync(self, id: UUID, s3_client: S3Client, bucket: str, select: Callable[[set[str]], set[str]]):
+        directory = self.root / str(id)
+        directory.mkdir(parents=True, exist_ok=True)
+        manifest = _read_manifest(directory)
+
+        listed: dict[str, tuple[str, int]] = {}
+        for page in s3_client.get_paginator("list_objects_v2").paginate(Bucket=bucket, Prefix=f"{id}/"):
+            for obj in page.get("Contents", []):
+                relative_path = obj["Key"][len(f"{id}/") :]  # type: ignore
+                listed[relative_path] = (obj["ETag"], obj["Size"])  # type: ignore
+        selected = select(set(listed))
+        objects = {relative_path: value for relative_path, value in listed.items() if relative_path in selected}
+
+        stale = [
+            relative_path
+            for relative_path, (etag, size) in objects.items()
+            if manifest.get(relative_path) != {"etag": etag, "size": size}
+            or not _has_size(directory / relative_path, size)
+        ]
+        print(f"Map {id}: {len(objects) - len(stale)} cached files, {len(stale)} to download")
+
+        # Files that no longer exist in the bucket would otherwise be read alongside the new ones
+        for relative_path in set(manifest) - set(objects):
+            (directory / relative_path).unlink(missing_ok=True)
+            del manifest[relative_path]
+
+        def download(relative_path: str):
+            local_path = directory / relative_path
+            partial_path = local_path.with_name(local_path.name + PARTIAL_SUFFIX)
+            local_path.parent.mkdir(parents=True, exist_ok=True)
+            print(f"Downloading s3://{bucket}/{id}/{relative_path} to {local_path}")
+            s3_client.download_file(bucket, f"{id}/{relative_path}", str(partial_path), Config=self.transfer_config)
+            # Readers never see a partially written file
+            partial_path.replace(local_path)
+
+        errors: list[BaseException] = []
+        with ThreadPoolExecutor(max_workers=self.download_workers, thread_name_prefix="map-download") as executor:
+            futures = {relative_path: executor.submit(download, relative_path) for relative_path in stale}
+            for relative_path, future in futures.items():
+                exception = future.exception()
+                if exception is None:
+                    etag, size = objects[relative_path]
+                    manifest[relative_path] = {"etag": etag, "size": size}
+                else:
+                    manifest.pop(relative_path, None)
+                    errors.append(exception)
+
+        # Written even on failure, so a retry only downloads what is still missing
+        (directory / MANIFEST_FILE).write_text(dumps(manifest))
+
+        if errors:
+            raise errors[0]
+
+        return directory
+
+
+def _is_current(lock_file: IO[str], path: Path):
+    try:
+        return samestat(fstat(lock_file.fileno()), path.stat())
+    except FileNotFoundError:
+        return False
+
+
+def _read_manifest(directory: Path) -> dict[str, dict[str, Any]]:
+    try:
+        return loads((directory / MANIFEST_FILE).read_text())
+    except (FileNotFoundError, JSONDecodeError):
+        return {}
+
+
+def _has_size(path: Path, size: int):
+    try:
+        return path.stat().st_size == size
+    except FileNotFoundError:
+        return False
+
+
+def _directory_size(directory: Path):
+    size = 0
+    for path in directory.rglob("*"):
+        try:
+            size += path.stat().st_size if path.is_file() else 0
+        except FileNotFoundError:
+            # Renamed or removed by a concurrent download
+            pass
+    return size
+
+
+def _last_used(directory: Path):
+    manifest_path = directory / MANIFEST_FILE
+    return (manifest_path if manifest_path.exists() else directory).stat().st_mtime
+
+
+def _parse_id(name: str):
+    try:
+        return UUID(name)
+    except ValueError:
+        return None
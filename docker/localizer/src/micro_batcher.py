@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Hashable
+from concurrent.futures import Future
+from queue import Empty, SimpleQueue
+from threading import Thread
+from time import monotonic
+
+
+# Collects items submitted concurrently (typically by different requests) and processes them together, so inference
+# runs as batched forward passes. A batch takes every item waiting (up to max_batch_size), then waits up to
+# max_wait_seconds after its first item for more. With no wait (the default) a lone item is processed immediately, and
+# batches form from the items submitted while the previous batch runs. Items whose keys differ (e.g. images of different
+# sizes) can't share a forward pass, and are processed as separate batches.
+class MicroBatcher[T, R]:
+    def __init__(
+        self,
+        name: str,
+        run_batch: Callable[[list[T]], list[R]],
+        max_batch_size: int,
+        max_wait_seconds: float = 0.0,
+        key: Callable[[T], Hashable] = lambda _: None,
+    ):
+        self.name = name
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+
+        self._run_batch = run_batch
+        self._key = key
+        self._queue: SimpleQueue[tuple[T, Future[R]]] = SimpleQueue()
+        self._thread = Thread(target=self._run, name=f"{name}-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, item: T) -> Future[R]:
+        future = Future[R]()
+        self._queue.put((item, future))
+        return future
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = monotonic() + self.max_wait_seconds
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - monotonic()
+                try:
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                except Empty:
+                    break
+
+            groups: dict[Hashable, list[tuple[T, Future[R]]]] = {}
+            for item, future in batch:
+                groups.setdefault(self._key(item), []).append((item, future))
+
+            for group in groups.values():
+                self._process(group)
+
+    def _process(self, group: list[tuple[T, Future[R]]]):
+        try:
+            results = self._run_batch([item for item, _ in group])
+        # Failures belong to the batch's items, and mustn't stop the batcher
+        except Exception as e:  # noqa: BLE001
+            print(f"{self.name} batch of {len(group)} failed: {e}")
+            for _, future in group:
+                future.set_exception(e)
+            return
+
+        for (_, future), result in zip(group, results):
+            future.set_result(result)
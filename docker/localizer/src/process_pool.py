@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+from atexit import register
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from hashlib import blake2b
+from itertools import count
+from multiprocessing import get_context
+from multiprocessing.connection import Connection
+from os import getpid, kill
+from pickle import PicklingError
+from signal import SIG_DFL, SIGINT, SIGTERM, signal
+from threading import Lock, Thread
+from typing import Any, TypeVar
+from uuid import UUID
+
+T = TypeVar("T")
+
+
+class LocalizationProcessError(RuntimeError):
+    pass
+
+
+# Starts processes that run module-level functions (sent by reference, so they run against the process's own globals)
+# on behalf of the serving process. They are started from a fork server rather than forked from the serving process,
+# whose event loop, HTTP clients and inference threads can't safely be forked, so each process loads its own models
+# (in initialize). Maps are memory-mapped from the shared disk cache, so N processes don't cost N copies of them. Every
+# map is owned by one process, chosen by rendezvous hashing, so requests for a map always reach the process that
+# already has it loaded.
+class LocalizationProcessPool:
+    def __init__(self, processes: int, initialize: Callable[[int], None], process_workers: int):
+        self.processes = processes
+
+        self._call_ids = count()
+        self._lock = Lock()
+        self._pending: list[dict[int, Future[Any]]] = []
+        self._connections: list[Connection] = []
+        self._send_locks: list[Lock] = []
+        self._closing = False
+        # Runs before multiprocessing terminates the (daemonic) processes at exit
+        register(self._close)
+
+        context = get_context("forkserver")
+        for index in range(processes):
+            connection, child_connection = context.Pipe()
+            context.Process(
+                target=_serve,
+                args=(index, child_connection, initialize, process_workers),
+                name=f"localizer-{index}",
+                daemon=True,
+            ).start()
+            child_connection.close()
+
+            self._connections.append(connection)
+            self._send_locks.append(Lock())
+            self._pending.append({})
+            Thread(target=self._receive, args=(index,), name=f"localizer-{index}-receiver", daemon=True).start()
+
+    def owner(self, id: UUID):
+        return max(range(self.processes), key=lambda index: _rendezvous_weight(id, index))
+
+    def call(self, index: int, function: Callable[..., T], *args: Any) -> Future[T]:
+        future = Future[T]()
+        with self._lock:
+            call_id = next(self._call_ids)
+            self._pending[index][call_id] = future
+
+        try:
+            with self._send_locks[index]:
+                self._connections[index].send((call_id, function, args))
+        except OSError as e:
+            with self._lock:
+                self._pending[index].pop(call_id, None)
+            future.set_exception(LocalizationProcessError(f"Localization process {index} is unavailable: {e}"))
+
+        return future
+
+    def call_all(self, function: Callable[..., T], *args: Any) -> list[Future[T]]:
+        return [self.call(index, function, *args) for index in range(self.processes)]
+
+    def _close(self):
+        self._closing = True
+
+    def _receive(self, index: int):
+        connection = self._connections[index]
+        while True:
+            try:
+                call_id, succeeded, value = connection.recv()
+            except (EOFError, OSError):
+                break
+
+            with self._lock:
+                future = self._pending[index].pop(call_id)
+            if succeeded:
+                future.set_result(value)
+            else:
+                future.set_exception(LocalizationProcessError(value))
+
+        with self._lock:
+            pending = list(self._pending[index].values())
+            self._pending[index].clear()
+        for future in pending:
+            future.set_exception(LocalizationProcessError(f"Localization process {index} exited"))
+
+        if self._closing:
+            return
+
+        # Its maps can't be served by any other process, so shut down and let the container be restarted
+        print(f"Localization process {index} exited, shutting down")
+        kill(getpid(), SIGTERM)
+
+
+def _rendezvous_weight(id: UUID, index: int):
+    return int.from_bytes(blake2b(id.bytes + index.to_bytes(4), digest_size=8).digest())
+
+
+def _serve(index: int, connection: Connection, initialize: Callable[[int], None], workers: int):
+    # Interrupts reach the whole process group; exit on them like the serving process, rather than raising
+    # KeyboardInterrupt in whichever thread is running
+    signal(SIGINT, SIG_DFL)
+
+    initialize(index)
+
+    send_lock = Lock()
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"localizer-{index}")
+
+    def run(call_id: int, function: Callable[..., Any], args: tuple[Any, ...]):
+        try:
+            result = (call_id, True, function(*args))
+        # Any failure is the caller's to handle, in the serving process
+        except Exception as e:  # noqa: BLE001
+            print(f"Localization process {index}: {function.__name__} failed: {e}")
+            result = (call_id, False, f"{type(e).__name__}: {e}")
+
+        with send_lock:
+            try:
+                connection.send(result)
+            # Results that can't be pickled
+            except (PicklingError, TypeError, AttributeError) as e:
+                connection.send((call_id, False, f"Failed to send result of {function.__name__}: {e}"))
+
+    while True:
+        try:
+            call_id, function, args = connection.recv()
+        except EOFError:
+            # The serving process exited
+            return
+
+        executor.submit(run, call_id, function, args)
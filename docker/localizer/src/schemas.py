@@ -1,4 +1,5 @@
 from enum import Enum
+from typing import Literal
 from uuid import UUID
 
 from core.localization_metrics import LocalizationMetrics
@@ -11,6 +12,7 @@ class LoadState(str, Enum):
     LOADING = "loading"
     READY = "ready"
     FAILED = "failed"
+    EVICTED = "evicted"
 
 
 class LoadStateResponse(BaseModel):
@@ -18,7 +20,81 @@ class LoadStateResponse(BaseModel):
     error: str | None = None
 
 
+MapCacheEvictionPolicy = Literal["lru", "lfu"]
+
+DescriptorStorage = Literal["pq", "float16", "float32"]
+
+# retrieval: DIR retrieval, then LightGlue against the retrieved images
+# direct: query descriptors matched straight to the map's 3D points
+LocalizationMode = Literal["retrieval", "direct"]
+
+# dir: DIR (ResNet-101) global descriptors
+# vlad: VLAD aggregated from the query's SuperPoint descriptors (see core.vlad), so retrieval runs no second network
+RetrievalDescriptor = Literal["dir", "vlad"]
+
+# neural_networks.backends.InferenceBackend, which can't be imported when generating the OpenAPI spec
+InferenceBackend = Literal["eager", "channels_last", "compiled", "int8"]
+
+
+# A client's estimate of its camera pose in one of the requested maps (e.g. its previous localization advanced by its
+# own tracking, or GPS in a geo-registered map)
+class PosePrior(BaseModel):
+    reconstruction_id: UUID
+    # Like localizations' transforms: cam_from_world, in the request's axis convention
+    transform: Transform
+    # How far (in meters) the camera may be from the prior's position, and its viewing direction from the prior's (in
+    # degrees, None if unknown)
+    position_uncertainty_m: float
+    rotation_uncertainty_deg: float | None = None
+
+
+class MatchingMetrics(BaseModel):
+    correspondences: int
+    inliers: int
+    pairs: int
+    # LightGlue layers run per pair (fewer than its depth for pairs where an adaptive profile stopped early)
+    layers_mean: float
+    layers_max: int
+
+
 class Localization(BaseModel):
     id: UUID
     transform: Transform
     metrics: LocalizationMetrics
+    matching: MatchingMetrics | None = None
+    # Seconds spent in each localization stage, when requested
+    timings: dict[str, float] | None = None
+
+
+class WorkerPoolStats(BaseModel):
+    workers: int
+    active: int
+    queued: int
+    max_queue_size: int
+    completed: int
+    rejected: int
+    expired: int
+    wait_seconds_last: float
+    wait_seconds_mean: float
+    run_seconds_mean: float
+
+
+class MapCacheEntryStats(BaseModel):
+    id: UUID
+    size_bytes: int
+    pinned: bool
+    hits: int
+    load_seconds: float
+    idle_seconds: float
+
+
+class MapCacheStats(BaseModel):
+    max_bytes: int
+    used_bytes: int
+    eviction_policy: MapCacheEvictionPolicy
+    hits: int
+    misses: int
+    evictions: int
+    loads: int
+    load_seconds_total: float
+    maps: list[MapCacheEntryStats]
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from time import monotonic
+from uuid import UUID
+
+from numpy import float64
+from numpy.typing import NDArray
+
+
+# The last accepted localization of a session against a map
+@dataclass(frozen=True)
+class SessionPrior:
+    # OpenCV convention cam_from_world
+    rotation: NDArray[float64]
+    translation: NDArray[float64]
+    # Database images that contributed inliers, most inliers first
+    image_ids: list[int]
+    updated_at: float
+
+    def center(self) -> NDArray[float64]:
+        return -self.rotation.T @ self.translation
+
+    def viewing_direction(self) -> NDArray[float64]:
+        return self.rotation[2]
+
+
+# Consecutive frames of a session (e.g. continuous relocalization from one device) see nearly the same part of a map,
+# so each session remembers its last pose per map. Priors older than max_age_seconds are dropped, and the least
+# recently used sessions are dropped beyond max_priors.
+class SessionStore:
+    def __init__(self, max_priors: int, max_age_seconds: float):
+        self.max_priors = max_priors
+        self.max_age_seconds = max_age_seconds
+
+        self._lock = Lock()
+        # Ordered from least to most recently used
+        self._priors: OrderedDict[tuple[UUID, UUID], SessionPrior] = OrderedDict()
+
+    def get(self, session_id: UUID, map_id: UUID):
+        with self._lock:
+            prior = self._priors.get((session_id, map_id))
+            if prior is None:
+                return None
+
+            if monotonic() - prior.updated_at > self.max_age_seconds:
+                del self._priors[(session_id, map_id)]
+                return None
+
+            self._priors.move_to_end((session_id, map_id))
+            return prior
+
+    def put(self, session_id: UUID, map_id: UUID, prior: SessionPrior):
+        with self._lock:
+            self._priors[(session_id, map_id)] = prior
+            self._priors.move_to_end((session_id, map_id))
+            while len(self._priors) > self.max_priors:
+                self._priors.popitem(last=False)
+
+    def discard(self, session_id: UUID, map_id: UUID):
+        with self._lock:
+            self._priors.pop((session_id, map_id), None)
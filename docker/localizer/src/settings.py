@@ -1,9 +1,14 @@
 from functools import lru_cache
 from os import environ
+from pathlib import Path
+from uuid import UUID
 
+from core.lightglue_profile import LightGlueProfileName
 from pydantic import AnyHttpUrl, Field, model_validator
 from pydantic_settings import BaseSettings
 
+from .schemas import DescriptorStorage, InferenceBackend, LocalizationMode, MapCacheEvictionPolicy, RetrievalDescriptor
+
 
 class Settings(BaseSettings):
     minio_endpoint_url: AnyHttpUrl | None = None
@@ -13,6 +18,120 @@ class Settings(BaseSettings):
     reconstructions_bucket: str = Field(...)
 
     max_keypoints_per_image: int = Field(...)
+    # Query JPEGs larger than this (longer side, in pixels) are decoded at a reduced scale (1/2, 1/4 or 1/8, whichever
+    # keeps them at least this large); intrinsics are scaled to match
+    query_image_max_size: int | None = None
+
+    # How each model runs inference (see neural_networks.backends). On CPU, channels_last or compiled usually speed up
+    # SuperPoint and DIR, and int8 or compiled LightGlue (int8 runs SuperPoint and DIR eagerly, as they're
+    # convolutional); check a backend with neural_networks.parity before using it.
+    superpoint_backend: InferenceBackend = "eager"
+    dir_backend: InferenceBackend = "eager"
+    lightglue_backend: InferenceBackend = "eager"
+    # Models serialised at image build time (python -m neural_networks.export_artifacts), loaded instead of building
+    # them from their checkpoints when present
+    model_artifacts_dir: Path | None = None
+    # Before reporting ready (GET /ready), every localization process runs the models on a synthetic image of this size
+    # (typically the size of query images, after query_image_max_size)
+    warmup: bool = True
+    warmup_image_width: int = 1440
+    warmup_image_height: int = 1920
+
+    # Processes (CPU only, each loading its own models) owning a share of the maps each; worker and queue sizes are per
+    # process, as is admission control, and the map cache budget is split between them
+    localization_processes: int = 1
+    localization_workers: int = 2
+    localization_queue_size: int = 8
+    localization_deadline_seconds: float = 30.0
+    # Threads (per process, shared by all requests) localizing a request's maps concurrently after feature extraction;
+    # 1 localizes them one after another
+    map_localization_workers: int = 4
+
+    # LightGlue profile used unless a request sets its own, optionally with either threshold overridden. The adaptive
+    # "fast" profile trades a few matches for much faster matching, but matches one pair per forward pass, so its pairs
+    # are never batched (see inference_batching): its early exit and pruning save more than batching does with few
+    # concurrent requests. Under heavy concurrency, "accurate" with batching may give more throughput.
+    lightglue_profile: LightGlueProfileName = "fast"
+    lightglue_depth_confidence: float | None = None
+    lightglue_width_confidence: float | None = None
+
+    # Concurrent requests' SuperPoint/DIR images and LightGlue pairs are run as batched forward passes. Batches take
+    # whatever is waiting when the previous one finishes, then wait up to inference_batch_max_wait_ms for more. The
+    # default of 0 adds no latency, so a lone request doesn't wait for others; under steady concurrency, 5-10 ms gives
+    # fuller batches. Only pairs matched with a non-adaptive LightGlue profile (not the default "fast") are batched.
+    inference_batching: bool = True
+    inference_batch_max_images: int = 8
+    inference_batch_max_pairs: int = 64
+    inference_batch_max_wait_ms: float = 0.0
+
+    # Requests with a session id first try the images matched by the session's previous frame and those near its pose,
+    # skipping retrieval (and DIR), as long as that frame was localized within the max age and the prior still yields
+    # enough inliers
+    session_prior_max_age_seconds: float = 5.0
+    session_prior_min_inliers: int = 50
+    max_session_priors: int = 10_000
+    # Requests with a pose prior first try the images whose cameras are within its uncertainty, falling back to
+    # retrieval unless that yields enough inliers
+    pose_prior_min_inliers: int = 50
+
+    # Retrieved images sharing at least this fraction of their 3D points (of the image with fewer) are clustered, and
+    # only the best ranked image of each cluster is matched unless that yields fewer than the min inliers. Then the
+    # rest are matched, along with up to expansion neighbors of each cluster's most covisible images that weren't
+    # retrieved (0 matches only retrieved images). None matches every retrieved image.
+    covisibility_cluster_min_overlap: float | None = 0.5
+    covisibility_min_inliers: int = 50
+    covisibility_expansion_neighbors: int = 2
+
+    # Requests targeting several maps retrieve the top images across all of them, and only match against the maps
+    # holding the most similar images, at most this many (None localizes against every map). Maps are tried in rank
+    # order, and with early exit inliers set, stop at the first localization with at least that many inliers. Maps
+    # with a session prior are always tried, first. With localization processes, this applies to the maps of each
+    # process separately (each localizes only the maps it owns).
+    multi_map_max_maps: int | None = 3
+    multi_map_early_exit_min_inliers: int | None = None
+    # Most images a rig localization request may solve for jointly (each is matched like a single image query)
+    rig_max_images: int = 4
+
+    # Localization mode used unless a request sets its own. The direct mode skips DIR, retrieval and LightGlue, matching
+    # query descriptors to the nearest 3D point descriptors (the reconstructor's point descriptor index) with a ratio
+    # test; maps without the index, or where direct matching fails or yields fewer than the min inliers, fall back to
+    # retrieval. The index is searched approximately: HNSW candidate list size, or number of IVF lists visited (nearest
+    # first).
+    localization_mode: LocalizationMode = "retrieval"
+    use_point_descriptor_index: bool = True
+    direct_matching_ratio: float = 0.8
+    direct_matching_min_inliers: int = 50
+    point_descriptor_hnsw_ef_search: int = 64
+    point_descriptor_ivf_nprobe: int = 16
+
+    map_load_workers: int = 2
+    map_cache_max_bytes: int = 8 * 1024**3
+    map_cache_eviction_policy: MapCacheEvictionPolicy = "lru"
+    map_cache_pinned_ids: list[UUID] = []
+    # With LFU eviction, hit counts halve every half-life, and maps loaded within the protect window are evicted last
+    map_cache_lfu_half_life_seconds: float = 600.0
+    map_cache_lfu_protect_seconds: float = 60.0
+
+    # How database image descriptors are held in memory: PQ codes decoded on demand (with an LRU of decoded images),
+    # or decoded at load and kept resident. MAP_DESCRIPTOR_STORAGE overrides the default for individual maps.
+    descriptor_storage: DescriptorStorage = "pq"
+    map_descriptor_storage: dict[UUID, DescriptorStorage] = {}
+    decoded_descriptor_cache_images: int = 256
+
+    # Global descriptor used for retrieval. Maps reconstructed before VLAD descriptors were added use DIR regardless.
+    retrieval_descriptor: RetrievalDescriptor = "dir"
+
+    # Maps with a retrieval index (built by the reconstructor for large maps) search it instead of comparing against
+    # every image. Higher values trade speed for recall: HNSW candidate list size and number of IVF lists visited.
+    use_retrieval_index: bool = True
+    retrieval_hnsw_ef_search: int = 128
+    retrieval_ivf_nprobe: int = 32
+
+    map_disk_cache_dir: Path = Path("/var/cache/localizer/reconstructions")
+    map_disk_cache_max_bytes: int = 64 * 1024**3
+    map_download_workers: int = 8
+    map_download_part_concurrency: int = 4
+    map_download_part_size_bytes: int = 16 * 1024**2
 
     @model_validator(mode="after")
     def check_storage_config(self):
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+from asyncio import Future, get_running_loop, wait
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from math import ceil
+from threading import Lock
+from time import monotonic
+from typing import TypeVar
+
+from .schemas import WorkerPoolStats
+
+T = TypeVar("T")
+
+# Weight given to the newest sample when updating the moving averages
+EWMA_ALPHA = 0.2
+
+
+class WorkerPoolSaturatedError(RuntimeError):
+    def __init__(self, retry_after_seconds: int):
+        super().__init__("Localization queue is full")
+        self.retry_after_seconds = retry_after_seconds
+
+
+class WorkerPoolDeadlineError(TimeoutError):
+    def __init__(self, retry_after_seconds: int):
+        super().__init__("Localization deadline exceeded")
+        self.retry_after_seconds = retry_after_seconds
+
+
+class WorkerPool:
+    def __init__(self, max_workers: int, max_queue_size: int, deadline_seconds: float):
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self.deadline_seconds = deadline_seconds
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="localizer")
+        self._lock = Lock()
+        self._queued = 0
+        self._active = 0
+        self._completed = 0
+        self._rejected = 0
+        self._expired = 0
+        self._wait_seconds_last = 0.0
+        self._wait_seconds_mean = 0.0
+        self._run_seconds_mean = 0.0
+
+    async def run(self, function: Callable[[], T], deadline_seconds: float | None = None) -> T:
+        deadline = monotonic() + (deadline_seconds if deadline_seconds is not None else self.deadline_seconds)
+
+        # Admission control: shed load instead of letting the queue (and therefore latency) grow without bound
+        with self._lock:
+            if self._queued >= self.max_queue_size:
+                self._rejected += 1
+                raise WorkerPoolSaturatedError(self._retry_after_seconds())
+            self._queued += 1
+
+        enqueued_at = monotonic()
+
+        def _work() -> T:
+            started_at = monotonic()
+            with self._lock:
+                self._queued -= 1
+                self._active += 1
+                self._wait_seconds_last = started_at - enqueued_at
+                self._wait_seconds_mean += EWMA_ALPHA * (self._wait_seconds_last - self._wait_seconds_mean)
+
+            try:
+                # Don't start work whose caller has already given up
+                if started_at >= deadline:
+                    raise WorkerPoolDeadlineError(0)
+
+                return function()
+            finally:
+                finished_at = monotonic()
+                with self._lock:
+                    self._active -= 1
+                    self._completed += 1
+                    self._run_seconds_mean += EWMA_ALPHA * ((finished_at - started_at) - self._run_seconds_mean)
+
+        # Waiting with a timeout never cancels the executor future, so _work always runs (keeping the counters
+        # consistent) and returns immediately if its caller has already given up
+        future = get_running_loop().run_in_executor(self._executor, _work)
+        future.add_done_callback(_retrieve_exception)
+        done, _ = await wait({future}, timeout=max(0.0, deadline - monotonic()))
+
+        if not done or isinstance(future.exception(), WorkerPoolDeadlineError):
+            with self._lock:
+                self._expired += 1
+                retry_after_seconds = self._retry_after_seconds()
+            raise WorkerPoolDeadlineError(retry_after_seconds)
+
+        return future.result()
+
+    def stats(self):
+        with self._lock:
+            return WorkerPoolStats(
+                workers=self.max_workers,
+                active=self._active,
+                queued=self._queued,
+                max_queue_size=self.max_queue_size,
+                completed=self._completed,
+                rejected=self._rejected,
+                expired=self._expired,
+                wait_seconds_last=self._wait_seconds_last,
+                wait_seconds_mean=self._wait_seconds_mean,
+                run_seconds_mean=self._run_seconds_mean,
+            )
+
+    def _retry_after_seconds(self):
+        # Estimated time for the current backlog to drain (must be called with the lock held)
+        backlog = self._queued + self._active
+        return max(1, ceil(backlog * self._run_seconds_mean / self.max_workers))
+
+
+# Combines the pools of several localization processes
+def merge_worker_pool_stats(stats: list[WorkerPoolStats]):
+    completed = sum(pool.completed for pool in stats)
+    return WorkerPoolStats(
+        workers=sum(pool.workers for pool in stats),
+        active=sum(pool.active for pool in stats),
+        queued=sum(pool.queued for pool in stats),
+        max_queue_size=sum(pool.max_queue_size for pool in stats),
+        completed=completed,
+        rejected=sum(pool.rejected for pool in stats),
+        expired=sum(pool.expired for pool in stats),
+        wait_seconds_last=max(pool.wait_seconds_last for pool in stats),
+        # Weighted by completed work
+        wait_seconds_mean=sum(pool.wait_seconds_mean * pool.completed for pool in stats) / max(1, completed),
+        run_seconds_mean=sum(pool.run_seconds_mean * pool.completed for pool in stats) / max(1, completed),
+    )
+
+
+def _retrieve_exception(future: Future[object]):
+    # Mark exceptions of abandoned futures as retrieved, so asyncio doesn't log them as unhandled
+    if not future.cancelled():
+        future.exception()
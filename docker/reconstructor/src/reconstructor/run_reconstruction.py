@@ -1,23 +1,43 @@
 from __future__ import annotations
 
 import tarfile
+from collections.abc import Mapping
 from io import BytesIO
 from pathlib import Path
-from typing import Any
+from typing import Any, cast
 from uuid import UUID
 
 from common.boto_clients import create_s3_client
-from core.camera_config import PinholeCameraConfig, transform_image
+from core.camera_config import PinholeCameraConfig, save_image
 from core.capture_session_manifest import CaptureSessionManifest
 from core.h5 import write_features, write_global_descriptors
+from core.image_tensors import create_image_tensors
 from core.lightglue import lightglue_match
-from core.opq import encode_descriptors, train_opq_matrix, train_pq_quantizer, write_opq_matrix, write_pq_quantizer
+from core.lightglue_profile import resolve_lightglue_profile
+from core.localization_bundle import build_localization_bundle, write_localization_bundle
+from core.opq import (
+    OPQ_MATRIX_FILE,
+    PQ_QUANTIZER_FILE,
+    encode_descriptors,
+    train_opq_matrix,
+    train_pq_quantizer,
+    write_opq_matrix,
+    write_pq_quantizer,
+)
+from core.point_descriptor_index import (
+    build_point_descriptor_index,
+    compute_point_descriptors,
+    write_point_descriptor_index,
+)
 from core.reconstruction_manifest import ReconstructionManifest
+from core.retrieval_index import RETRIEVAL_INDEX_MIN_IMAGES, build_retrieval_index, write_retrieval_index
+from core.vlad import train_vlad_aggregator
+from neural_networks.backends import InferenceBackend
 from neural_networks.models import load_DIR, load_lightglue, load_superpoint
-from numpy import asarray, ascontiguousarray, float32, random, vstack
+from numpy import asarray, ascontiguousarray, float32, frombuffer, int64, random, uint8, vstack
 from numpy.typing import NDArray
 from pycolmap._core import set_random_seed
-from torch import cuda, from_numpy, set_grad_enabled  # type: ignore
+from torch import cuda, set_grad_enabled  # type: ignore
 
 from .colmap import run_colmap_reconstruction
 from .metrics_builder import MetricsBuilder
@@ -36,16 +56,21 @@ lightglue: Any = None
 superpoint: Any = None
 
 
-def load_models(max_keypoints_per_image: int):
+def load_models(
+    max_keypoints_per_image: int,
+    superpoint_backend: InferenceBackend = "eager",
+    dir_backend: InferenceBackend = "eager",
+    lightglue_backend: InferenceBackend = "eager",
+):
     print(f"Using device: {DEVICE}")
 
     # Turn off gradient calculations globally (we only do inference here)
     set_grad_enabled(False)
 
     global dir, lightglue, superpoint
-    dir = load_DIR(DEVICE)
-    lightglue = load_lightglue(DEVICE)
-    superpoint = load_superpoint(max_num_keypoints=max_keypoints_per_image, device=DEVICE)
+    dir = load_DIR(DEVICE, dir_backend)
+    lightglue = load_lightglue(DEVICE, lightglue_backend)
+    superpoint = load_superpoint(max_num_keypoints=max_keypoints_per_image, device=DEVICE, backend=superpoint_backend)
 
 
 def run_reconstruction(reconstruction_id: UUID, capture_id: UUID):
@@ -117,21 +142,18 @@ def run_reconstruction(reconstruction_id: UUID, capture_id: UUID):
         print(f"Extracting features: image {index + 1} of {len(image_list)}")
 
         image_path = CAPTURE_SESSION_DIRECTORY / image_name
-        # (image, rgb_tensor, gray_tensor) = create_image_tensors(image_path.read_bytes(), camera_config)
-        image = transform_image(image_path.read_bytes(), camera_config.orientation)
-        rgb_tensor = from_numpy(asarray(image, dtype=float32)).permute(2, 0, 1).div(255.0)
-        gray_tensor = from_numpy(asarray(image.convert("L"), dtype=float32)).unsqueeze(0).div(255.0)
+        image_tensors = create_image_tensors(image_path.read_bytes(), camera_config)
 
         # Write image back to disk, so incremental_mapping samples the processed image for point cloud colorization
-        image.save(image_path)
+        save_image(image_tensors.image, image_path)
 
-        dir_output = dir({"image": rgb_tensor.unsqueeze(0).to(device=DEVICE)})
-        superpoint_output = superpoint({"image": gray_tensor.unsqueeze(0).to(device=DEVICE)})
+        dir_output = dir({"image": image_tensors.rgb.unsqueeze(0).to(device=DEVICE)})
+        superpoint_output = superpoint({"image": image_tensors.gray.unsqueeze(0).to(device=DEVICE)})
 
         global_descriptors[image_name] = dir_output["global_descriptor"][0].cpu().numpy().astype(float32, copy=False)
         keypoints[image_name] = superpoint_output["keypoints"][0].cpu().numpy().astype(float32, copy=False)
         descriptors[image_name] = superpoint_output["descriptors"][0].cpu().numpy().astype(float32, copy=False)
-        sizes[image_name] = (image.height, image.width)
+        sizes[image_name] = (image_tensors.image.shape[0], image_tensors.image.shape[1])
 
     # Write global descriptors to storage
     file_name, file_bytes = write_global_descriptors(WORK_DIR, global_descriptors)
@@ -164,15 +186,25 @@ def run_reconstruction(reconstruction_id: UUID, capture_id: UUID):
     file_name, file_bytes = write_pq_quantizer(product_quantizer, WORK_DIR)
     _put_reconstruction_object(key=file_name, body=file_bytes)
 
+    # Global descriptors aggregated from the local descriptors, which the localizer can retrieve with instead of DIR
+    vlad_aggregator, image_vlad_descriptors = train_vlad_aggregator(descriptor_array, list(descriptors.values()))
+    vlad_descriptors = dict(zip(descriptors.keys(), image_vlad_descriptors))
+
     # Encode image descriptors
     image_codes = encode_descriptors(opq_matrix, product_quantizer, descriptors)
     file_name, file_bytes = write_features(WORK_DIR, keypoints, image_codes)
     _put_reconstruction_object(key=file_name, body=file_bytes)
 
     # Match features
-    match_indices = lightglue_match(
-        lightglue, pairs, keypoints, descriptors, sizes, options.lightglue_batch_size(), DEVICE
+    lightglue_profile = resolve_lightglue_profile(
+        settings.lightglue_profile, settings.lightglue_depth_confidence, settings.lightglue_width_confidence
+    )
+    match_indices, match_layers = lightglue_match(
+        lightglue, pairs, keypoints, descriptors, sizes, options.lightglue_batch_size(), DEVICE, lightglue_profile
     )
+    if match_layers:
+        mean_layers = sum(match_layers.values()) / len(match_layers)
+        print(f"Matched {len(match_layers)} pairs, running {mean_layers:.2f} LightGlue layers per pair on average")
     if cuda.is_available():
         cuda.empty_cache()
 
@@ -196,6 +228,42 @@ def run_reconstruction(reconstruction_id: UUID, capture_id: UUID):
                     key=f"sfm_model/{file_path.relative_to(sfm_output_path)}", body=file_path.read_bytes()
                 )
 
+        # Everything the localizer needs in a single file it can memory-map, instead of parsing the model and h5 files
+        bundle = build_localization_bundle(
+            reconstruction,
+            keypoints,
+            image_codes,
+            global_descriptors,
+            frombuffer((WORK_DIR / OPQ_MATRIX_FILE).read_bytes(), dtype=uint8),
+            frombuffer((WORK_DIR / PQ_QUANTIZER_FILE).read_bytes(), dtype=uint8),
+            vlad_aggregator,
+            vlad_descriptors,
+        )
+        file_name, file_bytes = write_localization_bundle(WORK_DIR, bundle)
+        _put_reconstruction_object(key=file_name, body=file_bytes)
+
+        # Build an approximate nearest-neighbour index for maps too large for exhaustive retrieval
+        image_ids = sorted(cast(Mapping[int, Any], reconstruction.images).keys())
+        if len(image_ids) >= RETRIEVAL_INDEX_MIN_IMAGES:
+            retrieval_index = build_retrieval_index(
+                asarray(image_ids, dtype=int64),
+                vstack([global_descriptors[reconstruction.images[image_id].name] for image_id in image_ids]),
+            )
+            file_name, file_bytes = write_retrieval_index(retrieval_index, WORK_DIR)
+            _put_reconstruction_object(key=file_name, body=file_bytes)
+
+        # For the localizer's direct mode, which matches query descriptors straight to 3D points (from the full
+        # precision descriptors, not their PQ codes)
+        if settings.build_point_descriptor_index:
+            point_descriptors = compute_point_descriptors(
+                bundle.point3D_rows,
+                vstack([descriptors[reconstruction.images[image_id].name] for image_id in image_ids]),
+                bundle.point3D_ids.shape[0],
+            )
+            point_descriptor_index = build_point_descriptor_index(point_descriptors, product_quantizer.M)
+            file_name, file_bytes = write_point_descriptor_index(point_descriptor_index, WORK_DIR)
+            _put_reconstruction_object(key=file_name, body=file_bytes)
+
     # Update and write reconstruction manifest
     manifest.metrics = metrics.metrics
     manifest.status = "succeeded"
@@ -1,5 +1,7 @@
 from functools import lru_cache
 
+from core.lightglue_profile import LightGlueProfileName
+from neural_networks.backends import InferenceBackend
 from pydantic import AnyHttpUrl, Field, model_validator
 from pydantic_settings import BaseSettings
 
@@ -17,6 +19,19 @@ class Settings(BaseSettings):
     reconstructions_bucket: str = Field()
 
     max_keypoints_per_image: int = Field(...)
+    # LightGlue profile for matching image pairs, optionally with either threshold overridden. Adaptive profiles match
+    # one pair per forward pass instead of lightglue_batch_size.
+    lightglue_profile: LightGlueProfileName = "accurate"
+    lightglue_depth_confidence: float | None = None
+    lightglue_width_confidence: float | None = None
+
+    # How each model runs inference (see neural_networks.backends)
+    superpoint_backend: InferenceBackend = "eager"
+    dir_backend: InferenceBackend = "eager"
+    lightglue_backend: InferenceBackend = "eager"
+
+    # Index of a descriptor per 3D point, used by the localizer's direct (retrieval-free) localization mode
+    build_point_descriptor_index: bool = True
 
     @model_validator(mode="after")
     def check_storage_config(self):
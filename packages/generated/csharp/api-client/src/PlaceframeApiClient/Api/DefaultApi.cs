@@ -683,8 +683,9 @@ namespace PlaceframeApiClient.Api
         /// <param name="retrievalTopK"></param>
         /// <param name="ransacThreshold"></param>
         /// <param name="image"></param>
+        /// <param name="sessionId"> (optional)</param>
         /// <returns>List&lt;MapLocalization&gt;</returns>
-        List<MapLocalization> LocalizeImage(List<Guid> mapIds, PinholeCameraConfig cameraConfig, AxisConvention axisConvention, int retrievalTopK, double ransacThreshold, FileParameter image);
+        List<MapLocalization> LocalizeImage(List<Guid> mapIds, PinholeCameraConfig cameraConfig, AxisConvention axisConvention, int retrievalTopK, double ransacThreshold, FileParameter image, Guid? sessionId = default);
 
         /// <summary>
         /// LocalizeImage
@@ -699,8 +700,9 @@ namespace PlaceframeApiClient.Api
         /// <param name="retrievalTopK"></param>
         /// <param name="ransacThreshold"></param>
         /// <param name="image"></param>
+        /// <param name="sessionId"> (optional)</param>
         /// <returns>ApiResponse of List&lt;MapLocalization&gt;</returns>
-        ApiResponse<List<MapLocalization>> LocalizeImageWithHttpInfo(List<Guid> mapIds, PinholeCameraConfig cameraConfig, AxisConvention axisConvention, int retrievalTopK, double ransacThreshold, FileParameter image);
+        ApiResponse<List<MapLocalization>> LocalizeImageWithHttpInfo(List<Guid> mapIds, PinholeCameraConfig cameraConfig, AxisConvention axisConvention, int retrievalTopK, double ransacThreshold, FileParameter image, Guid? sessionId = default);
         /// <summary>
         /// RequestLease
         /// </summary>
@@ -1720,9 +1722,10 @@ namespace PlaceframeApiClient.Api
         /// <param name="retrievalTopK"></param>
         /// <param name="ransacThreshold"></param>
         /// <param name="image"></param>
+        /// <param name="sessionId"> (optional)</param>
         /// <param name="cancellationToken">Cancellation Token to cancel the request.</param>
         /// <returns>Task of List&lt;MapLocalization&gt;</returns>
-        System.Threading.Tasks.Task<List<MapLocalization>> LocalizeImageAsync(List<Guid> mapIds, PinholeCameraConfig cameraConfig, AxisConvention axisConvention, int retrievalTopK, double ransacThreshold, FileParameter image, System.Threading.CancellationToken cancellationToken = default);
+        System.Threading.Tasks.Task<List<MapLocalization>> LocalizeImageAsync(List<Guid> mapIds, PinholeCameraConfig cameraConfig, AxisConvention axisConvention, int retrievalTopK, double ransacThreshold, FileParameter image, Guid? sessionId = default, System.Threading.CancellationToken cancellationToken = default);
 
         /// <summary>
         /// LocalizeImage
@@ -1737,9 +1740,10 @@ namespace PlaceframeApiClient.Api
         /// <param name="retrievalTopK"></param>
         /// <param name="ransacThreshold"></param>
         /// <param name="image"></param>
+        /// <param name="sessionId"> (optional)</param>
         /// <param name="cancellationToken">Cancellation Token to cancel the request.</param>
         /// <returns>Task of ApiResponse (List&lt;MapLocalization&gt;)</returns>
-        System.Threading.Tasks.Task<ApiResponse<List<MapLocalization>>> LocalizeImageWithHttpInfoAsync(List<Guid> mapIds, PinholeCameraConfig cameraConfig, AxisConvention axisConvention, int retrievalTopK, double ransacThreshold, FileParameter image, System.Threading.CancellationToken cancellationToken = default);
+        System.Threading.Tasks.Task<ApiResponse<List<MapLocalization>>> LocalizeImageWithHttpInfoAsync(List<Guid> mapIds, PinholeCameraConfig cameraConfig, AxisConvention axisConvention, int retrievalTopK, double ransacThreshold, FileParameter image, Guid? sessionId = default, System.Threading.CancellationToken cancellationToken = default);
         /// <summary>
         /// RequestLease
         /// </summary>
@@ -6173,10 +6177,11 @@ namespace PlaceframeApiClient.Api
         /// <param name="retrievalTopK"></param>
         /// <param name="ransacThreshold"></param>
         /// <param name="image"></param>
+        /// <param name="sessionId"> (optional)</param>
         /// <returns>List&lt;MapLocalization&gt;</returns>
-        public List<MapLocalization> LocalizeImage(List<Guid> mapIds, PinholeCameraConfig cameraConfig, AxisConvention axisConvention, int retrievalTopK, double ransacThreshold, FileParameter image)
+        public List<MapLocalization> LocalizeImage(List<Guid> mapIds, PinholeCameraConfig cameraConfig, AxisConvention axisConvention, int retrievalTopK, double ransacThreshold, FileParameter image, Guid? sessionId = default)
         {
-            PlaceframeApiClient.Client.ApiResponse<List<MapLocalization>> localVarResponse = LocalizeImageWithHttpInfo(mapIds, cameraConfig, axisConvention, retrievalTopK, ransacThreshold, image);
+            PlaceframeApiClient.Client.ApiResponse<List<MapLocalization>> localVarResponse = LocalizeImageWithHttpInfo(mapIds, cameraConfig, axisConvention, retrievalTopK, ransacThreshold, image, sessionId);
             return localVarResponse.Data;
         }
 
@@ -6190,8 +6195,9 @@ namespace PlaceframeApiClient.Api
         /// <param name="retrievalTopK"></param>
         /// <param name="ransacThreshold"></param>
         /// <param name="image"></param>
+        /// <param name="sessionId"> (optional)</param>
         /// <returns>ApiResponse of List&lt;MapLocalization&gt;</returns>
-        public PlaceframeApiClient.Client.ApiResponse<List<MapLocalization>> LocalizeImageWithHttpInfo(List<Guid> mapIds, PinholeCameraConfig cameraConfig, AxisConvention axisConvention, int retrievalTopK, double ransacThreshold, FileParameter image)
+        public PlaceframeApiClient.Client.ApiResponse<List<MapLocalization>> LocalizeImageWithHttpInfo(List<Guid> mapIds, PinholeCameraConfig cameraConfig, AxisConvention axisConvention, int retrievalTopK, double ransacThreshold, FileParameter image, Guid? sessionId = default)
         {
             // verify the required parameter 'mapIds' is set
             if (mapIds == null)
@@ -6247,6 +6253,11 @@ namespace PlaceframeApiClient.Api
             // Primitive types (int, string, bool) go as standard form fields
             localVarRequestOptions.FormParameters.Add("ransac_threshold", PlaceframeApiClient.Client.ClientUtils.ParameterToString(ransacThreshold));
             localVarRequestOptions.FileParameters.Add("image", image);
+            if (sessionId != null)
+            {
+                // Primitive types (int, string, bool) go as standard form fields
+                localVarRequestOptions.FormParameters.Add("session_id", PlaceframeApiClient.Client.ClientUtils.ParameterToString(sessionId));
+            }
 
 
             // make the HTTP request
@@ -6271,11 +6282,12 @@ namespace PlaceframeApiClient.Api
         /// <param name="retrievalTopK"></param>
         /// <param name="ransacThreshold"></param>
         /// <param name="image"></param>
+        /// <param name="sessionId"> (optional)</param>
         /// <param name="cancellationToken">Cancellation Token to cancel the request.</param>
         /// <returns>Task of List&lt;MapLocalization&gt;</returns>
-        public async System.Threading.Tasks.Task<List<MapLocalization>> LocalizeImageAsync(List<Guid> mapIds, PinholeCameraConfig cameraConfig, AxisConvention axisConvention, int retrievalTopK, double ransacThreshold, FileParameter image, System.Threading.CancellationToken cancellationToken = default)
+        public async System.Threading.Tasks.Task<List<MapLocalization>> LocalizeImageAsync(List<Guid> mapIds, PinholeCameraConfig cameraConfig, AxisConvention axisConvention, int retrievalTopK, double ransacThreshold, FileParameter image, Guid? sessionId = default, System.Threading.CancellationToken cancellationToken = default)
         {
-            PlaceframeApiClient.Client.ApiResponse<List<MapLocalization>> localVarResponse = await LocalizeImageWithHttpInfoAsync(mapIds, cameraConfig, axisConvention, retrievalTopK, ransacThreshold, image, cancellationToken).ConfigureAwait(false);
+            PlaceframeApiClient.Client.ApiResponse<List<MapLocalization>> localVarResponse = await LocalizeImageWithHttpInfoAsync(mapIds, cameraConfig, axisConvention, retrievalTopK, ransacThreshold, image, sessionId, cancellationToken).ConfigureAwait(false);
             return localVarResponse.Data;
         }
 
@@ -6289,9 +6301,10 @@ namespace PlaceframeApiClient.Api
         /// <param name="retrievalTopK"></param>
         /// <param name="ransacThreshold"></param>
         /// <param name="image"></param>
+        /// <param name="sessionId"> (optional)</param>
         /// <param name="cancellationToken">Cancellation Token to cancel the request.</param>
         /// <returns>Task of ApiResponse (List&lt;MapLocalization&gt;)</returns>
-        public async System.Threading.Tasks.Task<PlaceframeApiClient.Client.ApiResponse<List<MapLocalization>>> LocalizeImageWithHttpInfoAsync(List<Guid> mapIds, PinholeCameraConfig cameraConfig, AxisConvention axisConvention, int retrievalTopK, double ransacThreshold, FileParameter image, System.Threading.CancellationToken cancellationToken = default)
+        public async System.Threading.Tasks.Task<PlaceframeApiClient.Client.ApiResponse<List<MapLocalization>>> LocalizeImageWithHttpInfoAsync(List<Guid> mapIds, PinholeCameraConfig cameraConfig, AxisConvention axisConvention, int retrievalTopK, double ransacThreshold, FileParameter image, Guid? sessionId = default, System.Threading.CancellationToken cancellationToken = default)
         {
             // verify the required parameter 'mapIds' is set
             if (mapIds == null)
@@ -6349,6 +6362,11 @@ namespace PlaceframeApiClient.Api
             // Primitive types (int, string, bool) go as standard form fields
             localVarRequestOptions.FormParameters.Add("ransac_threshold", PlaceframeApiClient.Client.ClientUtils.ParameterToString(ransacThreshold));
             localVarRequestOptions.FileParameters.Add("image", image);
+            if (sessionId != null)
+            {
+                // Primitive types (int, string, bool) go as standard form fields
+                localVarRequestOptions.FormParameters.Add("session_id", PlaceframeApiClient.Client.ClientUtils.ParameterToString(sessionId));
+            }
 
 
             // make the HTTP request
@@ -9489,6 +9489,7 @@ class DefaultApi:
         retrieval_top_k: StrictInt,
         ransac_threshold: Union[StrictFloat, StrictInt],
         image: Union[StrictBytes, StrictStr, Tuple[StrictStr, StrictBytes]],
+        session_id: Optional[UUID] = None,
         _request_timeout: Union[
             None,
             Annotated[StrictFloat, Field(gt=0)],
@@ -9517,6 +9518,8 @@ class DefaultApi:
         :type ransac_threshold: float
         :param image: (required)
         :type image: bytearray
+        :param session_id:
+        :type session_id: UUID
         :param _request_timeout: timeout setting for this request. If one
                                  number provided, it will be total request
                                  timeout. It can also be a pair (tuple) of
@@ -9546,6 +9549,7 @@ class DefaultApi:
             retrieval_top_k=retrieval_top_k,
             ransac_threshold=ransac_threshold,
             image=image,
+            session_id=session_id,
             _request_auth=_request_auth,
             _content_type=_content_type,
             _headers=_headers,
@@ -9576,6 +9580,7 @@ class DefaultApi:
         retrieval_top_k: StrictInt,
         ransac_threshold: Union[StrictFloat, StrictInt],
         image: Union[StrictBytes, StrictStr, Tuple[StrictStr, StrictBytes]],
+        session_id: Optional[UUID] = None,
         _request_timeout: Union[
             None,
             Annotated[StrictFloat, Field(gt=0)],
@@ -9604,6 +9609,8 @@ class DefaultApi:
         :type ransac_threshold: float
         :param image: (required)
         :type image: bytearray
+        :param session_id:
+        :type session_id: UUID
         :param _request_timeout: timeout setting for this request. If one
                                  number provided, it will be total request
                                  timeout. It can also be a pair (tuple) of
@@ -9633,6 +9640,7 @@ class DefaultApi:
             retrieval_top_k=retrieval_top_k,
             ransac_threshold=ransac_threshold,
             image=image,
+            session_id=session_id,
             _request_auth=_request_auth,
             _content_type=_content_type,
             _headers=_headers,
@@ -9663,6 +9671,7 @@ class DefaultApi:
         retrieval_top_k: StrictInt,
         ransac_threshold: Union[StrictFloat, StrictInt],
         image: Union[StrictBytes, StrictStr, Tuple[StrictStr, StrictBytes]],
+        session_id: Optional[UUID] = None,
         _request_timeout: Union[
             None,
             Annotated[StrictFloat, Field(gt=0)],
@@ -9691,6 +9700,8 @@ class DefaultApi:
         :type ransac_threshold: float
         :param image: (required)
         :type image: bytearray
+        :param session_id:
+        :type session_id: UUID
         :param _request_timeout: timeout setting for this request. If one
                                  number provided, it will be total request
                                  timeout. It can also be a pair (tuple) of
@@ -9720,6 +9731,7 @@ class DefaultApi:
             retrieval_top_k=retrieval_top_k,
             ransac_threshold=ransac_threshold,
             image=image,
+            session_id=session_id,
             _request_auth=_request_auth,
             _content_type=_content_type,
             _headers=_headers,
@@ -9745,6 +9757,7 @@ class DefaultApi:
         retrieval_top_k,
         ransac_threshold,
         image,
+        session_id,
         _request_auth,
         _content_type,
         _headers,
@@ -9782,6 +9795,8 @@ class DefaultApi:
             _form_params.append(('ransac_threshold', ransac_threshold))
         if image is not None:
             _files['image'] = image
+        if session_id is not None:
+            _form_params.append(('session_id', session_id))
         # process the body parameter
 
 
@@ -31,11 +31,15 @@ __all__ = [
     "AxisConvention",
     "Float3",
     "Float4",
+    "LoadState",
+    "LoadStateResponse",
     "Localization",
     "LocalizationMetrics",
     "LocalizeImage400Response",
     "LocalizeImage400ResponseExtra",
+    "MatchingMetrics",
     "PinholeCameraConfig",
+    "PosePrior",
     "Transform",
 ]
 
@@ -57,10 +61,14 @@ from placeframe_localizer_client.exceptions import ApiException as ApiException
 from placeframe_localizer_client.models.axis_convention import AxisConvention as AxisConvention
 from placeframe_localizer_client.models.float3 import Float3 as Float3
 from placeframe_localizer_client.models.float4 import Float4 as Float4
+from placeframe_localizer_client.models.load_state import LoadState as LoadState
+from placeframe_localizer_client.models.load_state_response import LoadStateResponse as LoadStateResponse
 from placeframe_localizer_client.models.localization import Localization as Localization
 from placeframe_localizer_client.models.localization_metrics import LocalizationMetrics as LocalizationMetrics
 from placeframe_localizer_client.models.localize_image400_response import LocalizeImage400Response as LocalizeImage400Response
 from placeframe_localizer_client.models.localize_image400_response_extra import LocalizeImage400ResponseExtra as LocalizeImage400ResponseExtra
+from placeframe_localizer_client.models.matching_metrics import MatchingMetrics as MatchingMetrics
 from placeframe_localizer_client.models.pinhole_camera_config import PinholeCameraConfig as PinholeCameraConfig
+from placeframe_localizer_client.models.pose_prior import PosePrior as PosePrior
 from placeframe_localizer_client.models.transform import Transform as Transform
 
@@ -0,0 +1,40 @@
+# coding: utf-8
+
+"""
+    Localizer
+
+    No description provided (generated by Openapi Generator https://github.com/openapitools/openapi-generator)
+
+    The version of the OpenAPI document: 0.1.0
+    Generated by OpenAPI Generator (https://openapi-generator.tech)
+
+    Do not edit the class manually.
+"""  # noqa: E501
+
+
+from __future__ import annotations
+import json
+from enum import Enum
+from typing_extensions import Self
+
+
+class LoadState(str, Enum):
+    """
+    LoadState
+    """
+
+    """
+    allowed enum values
+    """
+    PENDING = 'pending'
+    LOADING = 'loading'
+    READY = 'ready'
+    FAILED = 'failed'
+    EVICTED = 'evicted'
+
+    @classmethod
+    def from_json(cls, json_str: str) -> Self:
+        """Create an instance of LoadState from a JSON string"""
+        return cls(json.loads(json_str))
+
+
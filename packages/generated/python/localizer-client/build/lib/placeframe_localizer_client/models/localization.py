@@ -17,10 +17,11 @@ import pprint
 import re  # noqa: F401
 import json
 
-from pydantic import BaseModel, ConfigDict
-from typing import Any, ClassVar, Dict, List
+from pydantic import BaseModel, ConfigDict, StrictFloat, StrictInt
+from typing import Any, ClassVar, Dict, List, Optional, Union
 from uuid import UUID
 from placeframe_localizer_client.models.localization_metrics import LocalizationMetrics
+from placeframe_localizer_client.models.matching_metrics import MatchingMetrics
 from placeframe_localizer_client.models.transform import Transform
 from typing import Optional, Set
 from typing_extensions import Self
@@ -32,8 +33,10 @@ class Localization(BaseModel):
     id: UUID
     transform: Transform
     metrics: LocalizationMetrics
+    matching: Optional[MatchingMetrics] = None
+    timings: Optional[Dict[str, Union[StrictFloat, StrictInt]]] = None
     additional_properties: Dict[str, Any] = {}
-    __properties: ClassVar[List[str]] = ["id", "transform", "metrics"]
+    __properties: ClassVar[List[str]] = ["id", "transform", "metrics", "matching", "timings"]
 
     model_config = ConfigDict(
         populate_by_name=True,
@@ -82,11 +85,19 @@ class Localization(BaseModel):
         # override the default output from pydantic by calling `to_dict()` of metrics
         if self.metrics:
             _dict['metrics'] = self.metrics.to_dict()
+        # override the default output from pydantic by calling `to_dict()` of matching
+        if self.matching:
+            _dict['matching'] = self.matching.to_dict()
         # puts key-value pairs in additional_properties in the top level
         if self.additional_properties is not None:
             for _key, _value in self.additional_properties.items():
                 _dict[_key] = _value
 
+        # set to None if timings (nullable) is None
+        # and model_fields_set contains the field
+        if self.timings is None and "timings" in self.model_fields_set:
+            _dict['timings'] = None
+
         return _dict
 
     @classmethod
@@ -101,7 +112,9 @@ class Localization(BaseModel):
         _obj = cls.model_validate({
             "id": obj.get("id"),
             "transform": Transform.from_dict(obj["transform"]) if obj.get("transform") is not None else None,
-            "metrics": LocalizationMetrics.from_dict(obj["metrics"]) if obj.get("metrics") is not None else None
+            "metrics": LocalizationMetrics.from_dict(obj["metrics"]) if obj.get("metrics") is not None else None,
+            "matching": MatchingMetrics.from_dict(obj["matching"]) if obj.get("matching") is not None else None,
+            "timings": obj.get("timings")
         })
         # store additional fields in additional_properties
         for _key in obj.keys():
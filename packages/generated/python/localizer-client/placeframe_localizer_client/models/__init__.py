@@ -16,10 +16,14 @@
 from placeframe_localizer_client.models.axis_convention import AxisConvention
 from placeframe_localizer_client.models.float3 import Float3
 from placeframe_localizer_client.models.float4 import Float4
+from placeframe_localizer_client.models.load_state import LoadState
+from placeframe_localizer_client.models.load_state_response import LoadStateResponse
 from placeframe_localizer_client.models.localization import Localization
 from placeframe_localizer_client.models.localization_metrics import LocalizationMetrics
 from placeframe_localizer_client.models.localize_image400_response import LocalizeImage400Response
 from placeframe_localizer_client.models.localize_image400_response_extra import LocalizeImage400ResponseExtra
+from placeframe_localizer_client.models.matching_metrics import MatchingMetrics
 from placeframe_localizer_client.models.pinhole_camera_config import PinholeCameraConfig
+from placeframe_localizer_client.models.pose_prior import PosePrior
 from placeframe_localizer_client.models.transform import Transform
 
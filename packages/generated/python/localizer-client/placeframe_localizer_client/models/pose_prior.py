@@ -0,0 +1,116 @@
+# coding: utf-8
+
+"""
+    Localizer
+
+    No description provided (generated by Openapi Generator https://github.com/openapitools/openapi-generator)
+
+    The version of the OpenAPI document: 0.1.0
+    Generated by OpenAPI Generator (https://openapi-generator.tech)
+
+    Do not edit the class manually.
+"""  # noqa: E501
+
+
+from __future__ import annotations
+import pprint
+import re  # noqa: F401
+import json
+
+from pydantic import BaseModel, ConfigDict, StrictFloat, StrictInt
+from typing import Any, ClassVar, Dict, List, Optional, Union
+from uuid import UUID
+from placeframe_localizer_client.models.transform import Transform
+from typing import Optional, Set
+from typing_extensions import Self
+
+class PosePrior(BaseModel):
+    """
+    PosePrior
+    """ # noqa: E501
+    reconstruction_id: UUID
+    transform: Transform
+    position_uncertainty_m: Union[StrictFloat, StrictInt]
+    rotation_uncertainty_deg: Optional[Union[StrictFloat, StrictInt]] = None
+    additional_properties: Dict[str, Any] = {}
+    __properties: ClassVar[List[str]] = ["reconstruction_id", "transform", "position_uncertainty_m", "rotation_uncertainty_deg"]
+
+    model_config = ConfigDict(
+        populate_by_name=True,
+        validate_assignment=True,
+        protected_namespaces=(),
+    )
+
+
+    def to_str(self) -> str:
+        """Returns the string representation of the model using alias"""
+        return pprint.pformat(self.model_dump(by_alias=True))
+
+    def to_json(self) -> str:
+        """Returns the JSON representation of the model using alias"""
+        # TODO: pydantic v2: use .model_dump_json(by_alias=True, exclude_unset=True) instead
+        return json.dumps(self.to_dict())
+
+    @classmethod
+    def from_json(cls, json_str: str) -> Optional[Self]:
+        """Create an instance of PosePrior from a JSON string"""
+        return cls.from_dict(json.loads(json_str))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the dictionary representation of the model using alias.
+
+        This has the following differences from calling pydantic's
+        `self.model_dump(by_alias=True)`:
+
+        * `None` is only added to the output dict for nullable fields that
+          were set at model initialization. Other fields with value `None`
+          are ignored.
+        * Fields in `self.additional_properties` are added to the output dict.
+        """
+        excluded_fields: Set[str] = set([
+            "additional_properties",
+        ])
+
+        _dict = self.model_dump(
+            by_alias=True,
+            exclude=excluded_fields,
+            exclude_none=True,
+        )
+        # override the default output from pydantic by calling `to_dict()` of transform
+        if self.transform:
+            _dict['transform'] = self.transform.to_dict()
+        # puts key-value pairs in additional_properties in the top level
+        if self.additional_properties is not None:
+            for _key, _value in self.additional_properties.items():
+                _dict[_key] = _value
+
+        # set to None if rotation_uncertainty_deg (nullable) is None
+        # and model_fields_set contains the field
+        if self.rotation_uncertainty_deg is None and "rotation_uncertainty_deg" in self.model_fields_set:
+            _dict['rotation_uncertainty_deg'] = None
+
+        return _dict
+
+    @classmethod
+    def from_dict(cls, obj: Optional[Dict[str, Any]]) -> Optional[Self]:
+        """Create an instance of PosePrior from a dict"""
+        if obj is None:
+            return None
+
+        if not isinstance(obj, dict):
+            return cls.model_validate(obj)
+
+        _obj = cls.model_validate({
+            "reconstruction_id": obj.get("reconstruction_id"),
+            "transform": Transform.from_dict(obj["transform"]) if obj.get("transform") is not None else None,
+            "position_uncertainty_m": obj.get("position_uncertainty_m"),
+            "rotation_uncertainty_deg": obj.get("rotation_uncertainty_deg")
+        })
+        # store additional fields in additional_properties
+        for _key in obj.keys():
+            if _key not in cls.__properties:
+                _obj.additional_properties[_key] = obj.get(_key)
+
+        return _obj
+
+
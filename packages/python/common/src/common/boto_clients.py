@@ -1,6 +1,7 @@
 from typing import TYPE_CHECKING, Any, cast
 
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.config import Config
 from pydantic import AnyHttpUrl
 
@@ -55,24 +56,41 @@ def create_lambda_client() -> LambdaClient:
 
 
 def create_s3_client(
-    minio_endpoint_url: AnyHttpUrl | None, minio_access_key: str | None, minio_secret_key: str | None
+    minio_endpoint_url: AnyHttpUrl | None,
+    minio_access_key: str | None,
+    minio_secret_key: str | None,
+    max_pool_connections: int | None = None,
 ) -> S3Client:
 
     kwargs: dict[str, Any] = {}
 
+    # botocore defaults to 10 pooled connections, which throttles concurrent transfers
+    config = Config(max_pool_connections=max_pool_connections) if max_pool_connections else Config()
+
     if minio_endpoint_url:
         kwargs.update(
             endpoint_url=str(minio_endpoint_url),
             aws_access_key_id=minio_access_key,
             aws_secret_access_key=minio_secret_key,
-            config=Config(
+        )
+        config = config.merge(
+            Config(
                 signature_version="s3v4",
                 region_name="us-east-1",  # required by SigV4
                 s3={"addressing_style": "path"},  # ← force path-style (/{bucket}/{key})
-            ),
+            )
         )
 
-    return cast(S3Client, boto3.client("s3", **kwargs))  # type: ignore[call-arg]
+    return cast(S3Client, boto3.client("s3", config=config, **kwargs))  # type: ignore[call-arg]
+
+
+def create_s3_transfer_config(part_size_bytes: int, part_concurrency: int) -> TransferConfig:
+    return TransferConfig(
+        multipart_threshold=part_size_bytes,
+        multipart_chunksize=part_size_bytes,
+        max_concurrency=part_concurrency,
+        use_threads=part_concurrency > 1,
+    )
 
 
 def create_secretsmanager_client() -> SecretsManagerClient:
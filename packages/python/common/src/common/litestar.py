@@ -1,11 +1,13 @@
+from collections.abc import Callable, Sequence
 from logging import getLogger
-from typing import Any, Sequence
+from typing import Any
 
 from litestar import Litestar, Request, Response, get
 from litestar.exceptions import HTTPException, ValidationException
 from litestar.handlers import HTTPRouteHandler
 from litestar.openapi.config import OpenAPIConfig
 from litestar.response import Redirect
+from litestar.status_codes import HTTP_503_SERVICE_UNAVAILABLE
 from litestar.types import ControllerRouterHandler, Method, Middleware
 from litestar.types.internal_types import PathParameterDefinition
 
@@ -20,8 +22,8 @@ def use_handler_name(
 
 
 def log_http_exception(request: Request[Any, Any, Any], exception: HTTPException) -> Response[dict[str, Any]]:
-    # Server Errors
-    if exception.status_code >= 500:
+    # Server Errors (503 is expected under load shedding, so it is reported like a client error)
+    if exception.status_code >= 500 and exception.status_code != HTTP_503_SERVICE_UNAVAILABLE:
         logger.exception(
             "HTTPException %s on %s %s: %r",
             exception.status_code,
@@ -31,7 +33,9 @@ def log_http_exception(request: Request[Any, Any, Any], exception: HTTPException
             exc_info=exception,
         )
 
-        return Response(content={"detail": "Internal Server Error"}, status_code=exception.status_code)
+        return Response(
+            content={"detail": "Internal Server Error"}, status_code=exception.status_code, headers=exception.headers
+        )
 
     # Client Errors
     logger.info(
@@ -43,7 +47,7 @@ def log_http_exception(request: Request[Any, Any, Any], exception: HTTPException
     if isinstance(exception, ValidationException) and exception.extra:
         content["validation_errors"] = exception.extra
 
-    return Response(content=content, status_code=exception.status_code)
+    return Response(content=content, status_code=exception.status_code, headers=exception.headers)
 
 
 def log_unhandled_exception(request: Request[Any, Any, Any], exception: Exception) -> Response[dict[str, Any]]:
@@ -66,6 +70,7 @@ def create_litestar_app(
     route_handlers: Sequence[ControllerRouterHandler],
     openapi_config: OpenAPIConfig,
     middleware: Sequence[Middleware] | None = None,
+    on_startup: Sequence[Callable[[], Any]] | None = None,
 ) -> Litestar:
     openapi_config.operation_id_creator = use_handler_name
 
@@ -73,6 +78,7 @@ def create_litestar_app(
         [root, health_check, *route_handlers],
         openapi_config=openapi_config,
         middleware=middleware,
+        on_startup=on_startup,
         request_max_body_size=1024 * 1024 * 1024,
         exception_handlers={HTTPException: log_http_exception, Exception: log_unhandled_exception},
     )
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
 from io import BytesIO
+from math import ceil
+from pathlib import Path
 from typing import Literal
 
+from numpy import asarray, flip, rot90, uint8
+from numpy.typing import NDArray
 from PIL import Image as PILImage
 from PIL.Image import Transpose
 from pydantic import BaseModel
@@ -47,7 +51,66 @@ def transform_image(image_buffer: bytes, orientation: ImageOrientation) -> PILIm
     return image.convert("RGB")
 
 
-def transform_intrinsics(camera: PinholeCameraConfig):
+# Decodes to an RGB (height, width, 3) array. With max_size, JPEGs are decoded at a reduced scale (in the DCT domain, so
+# much faster than decoding then resizing) to the smallest size whose longer side is at least max_size.
+def decode_image(image_buffer: bytes, max_size: int | None = None) -> NDArray[uint8]:
+    image = PILImage.open(BytesIO(image_buffer))
+
+    if max_size is not None and max(image.size) > max_size:
+        scale = max_size / max(image.size)
+        # No-op for formats other than JPEG
+        image.draft("RGB", (ceil(image.width * scale), ceil(image.height * scale)))
+
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+
+    return asarray(image)
+
+
+def save_image(image: NDArray[uint8], path: Path):
+    PILImage.fromarray(image).save(path)
+
+
+# Same as transform_image, but on a decoded (height, width, channels) array, returning a view rather than a copy
+def orient_image(image: NDArray[uint8], orientation: ImageOrientation) -> NDArray[uint8]:
+    match orientation:
+        case "TOP_LEFT":
+            return image
+        case "TOP_RIGHT":
+            return flip(image, axis=1)
+        case "BOTTOM_RIGHT":
+            return rot90(image, 2)
+        case "BOTTOM_LEFT":
+            return flip(image, axis=0)
+        case "LEFT_TOP":
+            return image.transpose(1, 0, 2)
+        case "RIGHT_TOP":
+            return rot90(image, -1)
+        case "RIGHT_BOTTOM":
+            return rot90(image, 2).transpose(1, 0, 2)
+        case "LEFT_BOTTOM":
+            return rot90(image, 1)
+
+    raise ValueError(f"Unknown orientation: {orientation!r}")
+
+
+# With decoded_size, the (width, height) an image was decoded at before orientation (see decode_image), the intrinsics
+# are scaled to match
+def transform_intrinsics(camera: PinholeCameraConfig, decoded_size: tuple[int, int] | None = None):
+    if decoded_size is not None and decoded_size != (camera.width, camera.height):
+        scale_x = decoded_size[0] / camera.width
+        scale_y = decoded_size[1] / camera.height
+        camera = camera.model_copy(
+            update={
+                "width": decoded_size[0],
+                "height": decoded_size[1],
+                "fx": camera.fx * scale_x,
+                "fy": camera.fy * scale_y,
+                "cx": camera.cx * scale_x,
+                "cy": camera.cy * scale_y,
+            }
+        )
+
     w = camera.width
     h = camera.height
 
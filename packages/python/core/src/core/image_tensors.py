@@ -0,0 +1,33 @@
+from dataclasses import dataclass
+
+from numpy import ascontiguousarray, float32, uint8
+from numpy.typing import NDArray
+from torch import Tensor, from_numpy, tensor, tensordot  # type: ignore
+
+from .camera_config import PinholeCameraConfig, decode_image, orient_image
+
+# ITU-R 601-2 luma weights, as used by PIL's convert("L")
+LUMA_WEIGHTS = tensor([0.299, 0.587, 0.114])
+
+
+@dataclass(frozen=True)
+class ImageTensors:
+    # Oriented (height, width, 3) view of the decoded image
+    image: NDArray[uint8]
+    # (3, height, width) and (1, height, width), in [0, 1]
+    rgb: Tensor
+    gray: Tensor
+    # (width, height) the image was decoded at, before orientation (for transform_intrinsics)
+    decoded_size: tuple[int, int]
+
+
+# Decodes once and derives both network inputs from the same pixels. Orientation is a view, so the only full-size copy
+# is the conversion to float, which also makes the tensor channels-first and contiguous.
+def create_image_tensors(image_buffer: bytes, camera: PinholeCameraConfig, max_size: int | None = None):
+    decoded = decode_image(image_buffer, max_size)
+    image = orient_image(decoded, camera.orientation)
+
+    rgb = from_numpy(ascontiguousarray(image.transpose(2, 0, 1), dtype=float32)).div_(255.0)
+    gray = tensordot(LUMA_WEIGHTS, rgb, dims=1).unsqueeze(0)
+
+    return ImageTensors(image, rgb, gray, (decoded.shape[1], decoded.shape[0]))
@@ -1,9 +1,18 @@
+from copy import copy
+from functools import lru_cache
+from types import SimpleNamespace
+
 from lightglue import LightGlue  # type: ignore
 from numpy import float32, int32, intp, nonzero
 from numpy.typing import NDArray
 from torch import Tensor, from_numpy, inference_mode, tensor  # type: ignore
 from torch.nn.utils.rnn import pad_sequence
 
+from .lightglue_profile import LIGHTGLUE_PROFILES, LightGlueProfile
+
+# Keypoints, descriptors and (height, width) of one image
+LightGlueImage = tuple[Tensor, Tensor, tuple[int, int]]
+
 
 def lightglue_match(
     lightglue: LightGlue,
@@ -13,13 +22,17 @@ def lightglue_match(
     sizes: dict[str, tuple[int, int]],
     batch_size: int,
     device: str,
+    profile: LightGlueProfile = LIGHTGLUE_PROFILES["accurate"],
 ):
     keypoints_tensors = {name: from_numpy(kp).to(device) for name, kp in keypoints.items()}
     descriptors_tensors = {name: from_numpy(desc).to(device) for name, desc in descriptors.items()}
 
-    return lightglue_match_tensors(lightglue, pairs, keypoints_tensors, descriptors_tensors, sizes, batch_size, device)
+    return lightglue_match_tensors(
+        lightglue, pairs, keypoints_tensors, descriptors_tensors, sizes, batch_size, device, profile
+    )
 
 
+# Returns the matched keypoint indices of each pair, and the number of LightGlue layers run for it
 def lightglue_match_tensors(
     lightglue: LightGlue,
     pairs: list[tuple[str, str]],
@@ -28,37 +41,84 @@ def lightglue_match_tensors(
     sizes: dict[str, tuple[int, int]],
     batch_size: int,
     device: str,
+    profile: LightGlueProfile = LIGHTGLUE_PROFILES["accurate"],
 ):
     num_batches = (len(pairs) + batch_size - 1) // batch_size
     match_indices: dict[tuple[str, str], tuple[NDArray[intp], NDArray[intp]]] = {}
+    layers: dict[tuple[str, str], int] = {}
     for batch_start in range(0, len(pairs), batch_size):
         print(f"Matching features: batch {batch_start // batch_size + 1} of {num_batches}")
         batch_pairs = pairs[batch_start : batch_start + batch_size]
 
-        with inference_mode():
-            matches = lightglue({
-                "image0": {
-                    "keypoints": pad_sequence([keypoints[a] for a, _ in batch_pairs], batch_first=True),
-                    "descriptors": pad_sequence([descriptors[a] for a, _ in batch_pairs], batch_first=True),
-                    "image_size": tensor([sizes[a] for a, _ in batch_pairs], device=device),
-                },
-                "image1": {
-                    "keypoints": pad_sequence([keypoints[b] for _, b in batch_pairs], batch_first=True),
-                    "descriptors": pad_sequence([descriptors[b] for _, b in batch_pairs], batch_first=True),
-                    "image_size": tensor([sizes[b] for _, b in batch_pairs], device=device),
-                },
-            })["matches0"]
-
-        for i, (image_a, image_b) in enumerate(batch_pairs):
-            image_a_num_keypoints = keypoints[image_a].shape[0]
-
-            # Get actual batch matches (without padding), move to CPU, and convert to numpy
-            batch_matches = matches[i, :image_a_num_keypoints].cpu().numpy().astype(int32)
-
-            # Mask out non-matches (-1)
-            mask = batch_matches >= 0
-            image_a_keypoint_indices = nonzero(mask)[0]
-            image_b_keypoint_indices = batch_matches[mask]
-            match_indices[(image_a, image_b)] = (image_a_keypoint_indices, image_b_keypoint_indices)
-
-    return match_indices
+        batch_match_indices, batch_layers = lightglue_match_batch(
+            lightglue,
+            [(keypoints[a], descriptors[a], sizes[a]) for a, _ in batch_pairs],
+            [(keypoints[b], descriptors[b], sizes[b]) for _, b in batch_pairs],
+            device,
+            profile,
+        )
+        match_indices.update(zip(batch_pairs, batch_match_indices))
+        layers.update(zip(batch_pairs, batch_layers))
+
+    return match_indices, layers
+
+
+# Matches each image in images0 against the image at the same position in images1, in a single forward pass (one per
+# pair for adaptive profiles). Also returns the number of layers run for each pair.
+def lightglue_match_batch(
+    lightglue: LightGlue,
+    images0: list[LightGlueImage],
+    images1: list[LightGlueImage],
+    device: str,
+    profile: LightGlueProfile = LIGHTGLUE_PROFILES["accurate"],
+) -> tuple[list[tuple[NDArray[intp], NDArray[intp]]], list[int]]:
+    if profile.adaptive and len(images0) > 1:
+        match_indices: list[tuple[NDArray[intp], NDArray[intp]]] = []
+        layers: list[int] = []
+        for image0, image1 in zip(images0, images1):
+            pair_match_indices, pair_layers = lightglue_match_batch(lightglue, [image0], [image1], device, profile)
+            match_indices += pair_match_indices
+            layers += pair_layers
+        return match_indices, layers
+
+    with inference_mode():
+        output = _configure(lightglue, profile)({
+            "image0": {
+                "keypoints": pad_sequence([keypoints for keypoints, _, _ in images0], batch_first=True),
+                "descriptors": pad_sequence([descriptors for _, descriptors, _ in images0], batch_first=True),
+                "image_size": tensor([size for _, _, size in images0], device=device),
+            },
+            "image1": {
+                "keypoints": pad_sequence([keypoints for keypoints, _, _ in images1], batch_first=True),
+                "descriptors": pad_sequence([descriptors for _, descriptors, _ in images1], batch_first=True),
+                "image_size": tensor([size for _, _, size in images1], device=device),
+            },
+        })
+    matches = output["matches0"]
+
+    match_indices = []
+    for i, (image0_keypoints, _, _) in enumerate(images0):
+        # Get actual batch matches (without padding), move to CPU, and convert to numpy
+        batch_matches = matches[i, : image0_keypoints.shape[0]].cpu().numpy().astype(int32)
+
+        # Mask out non-matches (-1)
+        mask = batch_matches >= 0
+        image0_keypoint_indices = nonzero(mask)[0]
+        image1_keypoint_indices = batch_matches[mask]
+        match_indices.append((image0_keypoint_indices, image1_keypoint_indices))
+
+    return match_indices, [int(output["stop"])] * len(images0)
+
+
+# LightGlue reads its thresholds from its configuration on every forward pass, so each profile gets a shallow copy of
+# the model, sharing its weights, with its own configuration (and concurrent passes with different profiles don't
+# interfere)
+@lru_cache(maxsize=16)
+def _configure(lightglue: LightGlue, profile: LightGlueProfile) -> LightGlue:
+    configured = copy(lightglue)
+    configured.conf = SimpleNamespace(**{
+        **vars(lightglue.conf),
+        "depth_confidence": profile.depth_confidence,
+        "width_confidence": profile.width_confidence,
+    })
+    return configured
@@ -0,0 +1,38 @@
+from dataclasses import dataclass
+from typing import Literal
+
+LightGlueProfileName = Literal["accurate", "fast"]
+
+
+@dataclass(frozen=True)
+class LightGlueProfile:
+    # LightGlue stops after the first layer at which more than this fraction of keypoints is confidently predicted
+    # (-1 runs every layer)
+    depth_confidence: float
+    # Keypoints confidently predicted as unmatchable are pruned after each layer (-1 keeps every keypoint)
+    width_confidence: float
+
+    # Adaptive depth and width decide once per forward pass (and pruning assumes a single pair), so adaptive profiles
+    # match one pair per forward pass
+    @property
+    def adaptive(self):
+        return self.depth_confidence > 0 or self.width_confidence > 0
+
+
+LIGHTGLUE_PROFILES: dict[LightGlueProfileName, LightGlueProfile] = {
+    # Every layer for every keypoint, the most matches
+    "accurate": LightGlueProfile(depth_confidence=-1, width_confidence=-1),
+    # LightGlue's own defaults: typically 2-3x faster on easy pairs, for a small loss of matches
+    "fast": LightGlueProfile(depth_confidence=0.95, width_confidence=0.99),
+}
+
+
+# A named profile, with either threshold overridden
+def resolve_lightglue_profile(
+    name: LightGlueProfileName, depth_confidence: float | None = None, width_confidence: float | None = None
+):
+    profile = LIGHTGLUE_PROFILES[name]
+    return LightGlueProfile(
+        depth_confidence=profile.depth_confidence if depth_confidence is None else depth_confidence,
+        width_confidence=profile.width_confidence if width_confidence is None else width_confidence,
+    )
@@ -0,0 +1,272 @@
+from collections.abc import Mapping
+from dataclasses import MISSING, dataclass, fields
+from json import dumps, loads
+from pathlib import Path
+from typing import Any, cast
+
+from faiss import (  # type: ignore
+    OPQMatrix,
+    ProductQuantizer,
+    VectorIOReader,
+    copy_array_to_vector,  # type: ignore
+    read_ProductQuantizer,  # type: ignore
+    read_VectorTransform,  # type: ignore
+)
+from numpy import (
+    arange,
+    argsort,
+    asarray,
+    ascontiguousarray,
+    concatenate,
+    cumsum,
+    diff,
+    dtype,
+    float32,
+    float64,
+    frombuffer,
+    full,
+    int32,
+    int64,
+    memmap,
+    ones,
+    repeat,
+    searchsorted,
+    stack,
+    uint8,
+    uint32,
+    zeros,
+)
+from numpy.typing import NDArray
+from scipy.sparse import csr_matrix
+
+from .vlad import VladAggregator
+
+LOCALIZATION_BUNDLE_FILE = "localization_bundle.bin"
+
+# Layout: magic, format version (uint32), header length (uint32), JSON header describing each array (dtype, shape and
+# offset from the start of the data section), then the arrays themselves, each starting on an ALIGNMENT boundary so
+# they can be used directly from a memory map. Readers reject other versions, so bump this on any incompatible layout
+# change; arrays added to the end of LocalizationBundle with a None default are optional and don't need a new version.
+LOCALIZATION_BUNDLE_MAGIC = b"PFLOCBDL"
+LOCALIZATION_BUNDLE_VERSION = 1
+ALIGNMENT = 64
+
+# Neighbours kept per image in the covisibility graph
+COVISIBILITY_MAX_NEIGHBORS = 64
+
+_PREAMBLE_SIZE = len(LOCALIZATION_BUNDLE_MAGIC) + 2 * uint32().nbytes
+
+
+class LocalizationBundleError(ValueError):
+    pass
+
+
+# Everything the localizer needs to localize against a reconstruction, as flat arrays. Per-image data is concatenated
+# in image_ids order, and image i owns rows keypoint_offsets[i]:keypoint_offsets[i + 1] of the per-keypoint arrays.
+@dataclass(frozen=True)
+class LocalizationBundle:
+    # Sorted COLMAP image ids
+    image_ids: NDArray[int64]
+    # (height, width) per image
+    image_sizes: NDArray[int32]
+    keypoint_offsets: NDArray[int64]
+    keypoints: NDArray[float32]
+    pq_codes: NDArray[uint8]
+    # Row in points3D_xyz observed by each keypoint, or -1 if the keypoint has no 3D point
+    point3D_rows: NDArray[int32]
+    # One row per image
+    global_descriptors: NDArray[float32]
+    # Sorted COLMAP 3D point ids, and their world coordinates
+    point3D_ids: NDArray[int64]
+    points3D_xyz: NDArray[float64]
+    # faiss serialisations of the OPQ matrix and product quantizer (same bytes as OPQ_MATRIX_FILE and PQ_QUANTIZER_FILE)
+    opq_matrix: NDArray[uint8]
+    pq_quantizer: NDArray[uint8]
+    # World coordinates of each image's projection centre, and its unit viewing direction
+    image_centers: NDArray[float64] | None = None
+    image_viewing_directions: NDArray[float64] | None = None
+    # Covisibility graph in CSR form: image i's neighbours (rows of image_ids) are
+    # covisibility_rows[covisibility_offsets[i]:covisibility_offsets[i + 1]], most shared 3D points first, with the
+    # number of shared points in covisibility_counts
+    covisibility_offsets: NDArray[int64] | None = None
+    covisibility_rows: NDArray[int32] | None = None
+    covisibility_counts: NDArray[int32] | None = None
+    # VLAD aggregation of local descriptors (see core.vlad), and one aggregated descriptor per image
+    vlad_vocabulary: NDArray[float32] | None = None
+    vlad_mean: NDArray[float32] | None = None
+    vlad_projection: NDArray[float32] | None = None
+    vlad_descriptors: NDArray[float32] | None = None
+
+    def vlad_aggregator(self):
+        if self.vlad_vocabulary is None or self.vlad_mean is None or self.vlad_projection is None:
+            return None
+        return VladAggregator(self.vlad_vocabulary, self.vlad_mean, self.vlad_projection)
+
+
+# Flattens a reconstruction and its per-image features (keyed by image name) into a bundle. The reconstruction is a
+# pycolmap Reconstruction, which isn't a dependency of this package.
+def build_localization_bundle(
+    reconstruction: Any,
+    keypoints: Mapping[str, NDArray[float32]],
+    pq_codes: Mapping[str, NDArray[uint8]],
+    global_descriptors: Mapping[str, NDArray[float32]],
+    opq_matrix: NDArray[uint8],
+    pq_quantizer: NDArray[uint8],
+    vlad_aggregator: VladAggregator | None = None,
+    vlad_descriptors: Mapping[str, NDArray[float32]] | None = None,
+):
+    image_ids = asarray(sorted(cast(Mapping[int, Any], reconstruction.images).keys()), dtype=int64)
+    images = [reconstruction.images[int(image_id)] for image_id in image_ids]
+    cameras = [reconstruction.cameras[image.camera_id] for image in images]
+
+    keypoint_counts = [keypoints[image.name].shape[0] for image in images]
+    keypoint_offsets = concatenate([[0], cumsum(keypoint_counts)]).astype(int64)
+
+    point3D_ids = asarray(sorted(cast(Mapping[int, Any], reconstruction.points3D).keys()), dtype=int64)
+    points3D_xyz = asarray([reconstruction.points3D[int(point3D_id)].xyz for point3D_id in point3D_ids], dtype=float64)
+    point3D_rows = full(int(keypoint_offsets[-1]), -1, dtype=int32)
+    for image, image_offset in zip(images, keypoint_offsets):
+        observed_keypoint_indices = asarray(image.get_observation_point2D_idxs(), dtype=int64)
+        observed_point3D_ids = asarray(
+            [point2D.point3D_id for point2D in image.get_observation_points2D()], dtype=int64
+        )
+        point3D_rows[image_offset + observed_keypoint_indices] = searchsorted(point3D_ids, observed_point3D_ids)
+
+    covisibility_offsets, covisibility_rows, covisibility_counts = _build_covisibility_graph(
+        point3D_rows, keypoint_offsets, point3D_ids.shape[0]
+    )
+
+    return LocalizationBundle(
+        image_ids=image_ids,
+        image_sizes=asarray([(camera.height, camera.width) for camera in cameras], dtype=int32).reshape(-1, 2),
+        keypoint_offsets=keypoint_offsets,
+        keypoints=concatenate([keypoints[image.name] for image in images]).astype(float32),
+        pq_codes=concatenate([pq_codes[image.name] for image in images]).astype(uint8),
+        point3D_rows=point3D_rows,
+        global_descriptors=stack([global_descriptors[image.name] for image in images]).astype(float32),
+        point3D_ids=point3D_ids,
+        points3D_xyz=points3D_xyz.reshape(-1, 3),
+        opq_matrix=opq_matrix,
+        pq_quantizer=pq_quantizer,
+        image_centers=asarray([image.projection_center() for image in images], dtype=float64).reshape(-1, 3),
+        image_viewing_directions=asarray([image.viewing_direction() for image in images], dtype=float64).reshape(-1, 3),
+        covisibility_offsets=covisibility_offsets,
+        covisibility_rows=covisibility_rows,
+        covisibility_counts=covisibility_counts,
+        vlad_vocabulary=vlad_aggregator.vocabulary if vlad_aggregator is not None else None,
+        vlad_mean=vlad_aggregator.mean if vlad_aggregator is not None else None,
+        vlad_projection=vlad_aggregator.projection if vlad_aggregator is not None else None,
+        vlad_descriptors=(
+            stack([vlad_descriptors[image.name] for image in images]).astype(float32)
+            if vlad_descriptors is not None
+            else None
+        ),
+    )
+
+
+# Counts the 3D points shared by every pair of images, keeping each image's strongest neighbours
+def _build_covisibility_graph(point3D_rows: NDArray[int32], keypoint_offsets: NDArray[int64], point_count: int):
+    image_count = keypoint_offsets.shape[0] - 1
+    keypoint_image_rows = repeat(arange(image_count), diff(keypoint_offsets))
+    observed = point3D_rows >= 0
+
+    incidence = csr_matrix(
+        (ones(int(observed.sum()), dtype=int32), (keypoint_image_rows[observed], point3D_rows[observed])),
+        shape=(image_count, point_count),
+    )
+    # A point observed by several keypoints of one image still counts once
+    incidence.data[:] = 1
+    shared = cast(csr_matrix, (incidence @ incidence.T).tocsr())
+    shared.setdiag(0)
+    shared.eliminate_zeros()
+
+    offsets = zeros(image_count + 1, dtype=int64)
+    rows: list[NDArray[int32]] = [zeros(0, dtype=int32)]
+    counts: list[NDArray[int32]] = [zeros(0, dtype=int32)]
+    for image_row in range(image_count):
+        neighbors = shared.indices[shared.indptr[image_row] : shared.indptr[image_row + 1]]
+        neighbor_counts = shared.data[shared.indptr[image_row] : shared.indptr[image_row + 1]]
+        strongest = argsort(-neighbor_counts, kind="stable")[:COVISIBILITY_MAX_NEIGHBORS]
+        rows.append(neighbors[strongest].astype(int32))
+        counts.append(neighbor_counts[strongest].astype(int32))
+        offsets[image_row + 1] = offsets[image_row] + strongest.shape[0]
+
+    return offsets, concatenate(rows).astype(int32), concatenate(counts).astype(int32)
+
+
+def write_localization_bundle(root_path: Path, bundle: LocalizationBundle):
+    arrays = {
+        field.name: ascontiguousarray(getattr(bundle, field.name))
+        for field in fields(bundle)
+        if getattr(bundle, field.name) is not None
+    }
+
+    header: dict[str, dict[str, object]] = {}
+    offset = 0
+    for name, array in arrays.items():
+        header[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset = _align(offset + array.nbytes)
+    header_bytes = dumps(header).encode("utf-8")
+    data_start = _align(_PREAMBLE_SIZE + len(header_bytes))
+
+    path = root_path / LOCALIZATION_BUNDLE_FILE
+    with open(path, "wb") as file:
+        file.write(LOCALIZATION_BUNDLE_MAGIC)
+        file.write(uint32(LOCALIZATION_BUNDLE_VERSION).tobytes())
+        file.write(uint32(len(header_bytes)).tobytes())
+        file.write(header_bytes)
+        for name, array in arrays.items():
+            file.write(b"\0" * (data_start + cast(int, header[name]["offset"]) - file.tell()))
+            file.write(array.tobytes())
+
+    return LOCALIZATION_BUNDLE_FILE, path.read_bytes()
+
+
+# The returned arrays are views into a private (copy-on-write) memory map of the file, so nothing is read until it is
+# used, and pages are shared with the page cache rather than copied
+def read_localization_bundle(root_path: Path):
+    mapped = memmap(root_path / LOCALIZATION_BUNDLE_FILE, dtype=uint8, mode="c")
+
+    if bytes(mapped[: len(LOCALIZATION_BUNDLE_MAGIC)]) != LOCALIZATION_BUNDLE_MAGIC:
+        raise LocalizationBundleError("Not a localization bundle")
+    version, header_length = frombuffer(mapped, dtype=uint32, count=2, offset=len(LOCALIZATION_BUNDLE_MAGIC))
+    if version != LOCALIZATION_BUNDLE_VERSION:
+        raise LocalizationBundleError(
+            f"Unsupported localization bundle version {version} (expected {LOCALIZATION_BUNDLE_VERSION})"
+        )
+
+    header = loads(bytes(mapped[_PREAMBLE_SIZE : _PREAMBLE_SIZE + int(header_length)]))
+    data_start = _align(_PREAMBLE_SIZE + int(header_length))
+
+    arrays: dict[str, NDArray[object]] = {}
+    for field in fields(LocalizationBundle):
+        if field.name not in header:
+            if field.default is MISSING:
+                raise LocalizationBundleError(f"Localization bundle is missing {field.name}")
+            continue
+        entry = header[field.name]
+        array_dtype = dtype(entry["dtype"])
+        shape = tuple(entry["shape"])
+        start = data_start + entry["offset"]
+        count = 1
+        for dimension in shape:
+            count *= dimension
+        arrays[field.name] = mapped[start : start + count * array_dtype.itemsize].view(array_dtype).reshape(shape)
+
+    return LocalizationBundle(**arrays)  # type: ignore
+
+
+def deserialize_opq_matrix(data: NDArray[uint8]):
+    reader = VectorIOReader()
+    copy_array_to_vector(ascontiguousarray(data), reader.data)
+    return cast(OPQMatrix, read_VectorTransform(reader))
+
+
+def deserialize_pq_quantizer(data: NDArray[uint8]):
+    reader = VectorIOReader()
+    copy_array_to_vector(ascontiguousarray(data), reader.data)
+    return cast(ProductQuantizer, read_ProductQuantizer(reader))
+
+
+def _align(offset: int):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
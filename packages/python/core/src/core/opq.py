@@ -9,7 +9,7 @@ from faiss import (  # type: ignore
     write_ProductQuantizer,  # type: ignore
     write_VectorTransform,  # type: ignore
 )
-from numpy import ascontiguousarray, float32, uint8
+from numpy import ascontiguousarray, concatenate, cumsum, float32, split, uint8
 from numpy.linalg import norm
 from numpy.typing import NDArray
 
@@ -50,13 +50,17 @@ def encode_descriptors(
 
 
 def decode_descriptors(opq_matrix: OPQMatrix, product_quantizer: ProductQuantizer, pq_codes: dict[int, NDArray[uint8]]):
-    descriptors: dict[int, NDArray[float32]] = {}
-    for image_id, code in pq_codes.items():
-        decoded = cast(NDArray[float32], product_quantizer.decode(code))  # type: ignore
-        reversed_transformed = cast(NDArray[float32], opq_matrix.reverse_transform(decoded))  # type: ignore
-        descriptors[image_id] = _l2_normalize_rows(reversed_transformed)
+    if not pq_codes:
+        return {}
 
-    return descriptors
+    # Decode all images in one call, rather than paying faiss's per-call overhead for every image
+    codes = concatenate(list(pq_codes.values()), axis=0)
+    decoded = cast(NDArray[float32], product_quantizer.decode(codes))  # type: ignore
+    reversed_transformed = cast(NDArray[float32], opq_matrix.reverse_transform(decoded))  # type: ignore
+    normalized = _l2_normalize_rows(reversed_transformed)
+
+    offsets = cumsum([code.shape[0] for code in pq_codes.values()])[:-1]
+    return dict(zip(pq_codes.keys(), split(normalized, offsets, axis=0)))
 
 
 def _l2_normalize_rows(matrix: NDArray[float32]) -> NDArray[float32]:
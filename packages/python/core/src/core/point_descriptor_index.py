@@ -0,0 +1,108 @@
+from math import sqrt
+from pathlib import Path
+from typing import cast
+
+from faiss import (  # type: ignore
+    METRIC_L2,  # type: ignore
+    Index,
+    IndexHNSWFlat,
+    IndexIVF,
+    downcast_index,  # type: ignore
+    extract_index_ivf,  # type: ignore
+    index_factory,  # type: ignore
+    read_index,  # type: ignore
+    write_index,  # type: ignore
+)
+from numpy import arange, ascontiguousarray, float32, int32, int64, nonzero, ones, random
+from numpy import sqrt as element_sqrt
+from numpy.linalg import norm
+from numpy.typing import NDArray
+from scipy.sparse import csr_matrix
+
+POINT_DESCRIPTOR_INDEX_FILE = "point_descriptor_index.faiss"
+
+# Maps with more 3D points than this use an OPQ/IVF-PQ index (a fraction of the memory) instead of HNSW over the raw
+# descriptors
+POINT_DESCRIPTOR_HNSW_MAX_POINTS = 250_000
+HNSW_NEIGHBORS = 32
+HNSW_EF_CONSTRUCTION = 80
+# IVF lists per square root of the number of points (the usual 4 * sqrt(N) rule of thumb)
+IVF_LISTS_PER_SQRT_POINTS = 4
+# faiss needs about this many training points per IVF list, and gains little from more
+IVF_TRAINING_POINTS_PER_LIST = 64
+
+
+# The mean of each 3D point's track descriptors (the descriptors of the keypoints observing it), L2-normalised like
+# SuperPoint's own descriptors. point3D_rows and descriptors are per keypoint, in the same order; points without
+# observations get a zero descriptor.
+def compute_point_descriptors(point3D_rows: NDArray[int32], descriptors: NDArray[float32], point_count: int):
+    observed = point3D_rows >= 0
+    track = csr_matrix(
+        (ones(int(observed.sum()), dtype=float32), (point3D_rows[observed], nonzero(observed)[0])),
+        shape=(point_count, point3D_rows.shape[0]),
+    )
+    sums = cast(NDArray[float32], track @ descriptors)
+    lengths = norm(sums, axis=1, keepdims=True)
+    lengths[lengths == 0] = 1
+    return (sums / lengths).astype(float32)
+
+
+# Builds a nearest-neighbour index over the point descriptors, with the row of each point in points3D_xyz as its id.
+# subvectors is the number of PQ subvectors for large maps (the map's own product quantizer's is a good choice).
+def build_point_descriptor_index(point_descriptors: NDArray[float32], subvectors: int):
+    count, dimension = point_descriptors.shape
+    point_descriptors = ascontiguousarray(point_descriptors, dtype=float32)
+
+    if count <= POINT_DESCRIPTOR_HNSW_MAX_POINTS:
+        print(f"Building HNSW point descriptor index over {count} points")
+        index = IndexHNSWFlat(dimension, HNSW_NEIGHBORS, METRIC_L2)
+        index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+    else:
+        number_of_lists = int(IVF_LISTS_PER_SQRT_POINTS * sqrt(count))
+        print(f"Building OPQ/IVF-PQ point descriptor index over {count} points with {number_of_lists} lists")
+        index = cast(Index, index_factory(dimension, f"OPQ{subvectors},IVF{number_of_lists},PQ{subvectors}", METRIC_L2))
+        training_count = min(count, number_of_lists * IVF_TRAINING_POINTS_PER_LIST)
+        training_rows = random.default_rng(0).choice(count, training_count, replace=False)
+        index.train(point_descriptors[training_rows])  # type: ignore
+
+    # Added in row order, so faiss's sequential ids are the point rows
+    index.add(point_descriptors)  # type: ignore
+    return index
+
+
+def write_point_descriptor_index(index: Index, root_path: Path):
+    path = root_path / POINT_DESCRIPTOR_INDEX_FILE
+    write_index(index, str(path))
+    return POINT_DESCRIPTOR_INDEX_FILE, path.read_bytes()
+
+
+def read_point_descriptor_index(root_path: Path):
+    return cast(Index, read_index(str(root_path / POINT_DESCRIPTOR_INDEX_FILE)))
+
+
+# Trades recall for speed: ef_search is the HNSW candidate list size, nprobe the number of IVF lists visited (the
+# lists closest to the query first)
+def configure_point_descriptor_index(index: Index, hnsw_ef_search: int, ivf_nprobe: int):
+    index = downcast_index(index)
+    if isinstance(index, IndexHNSWFlat):
+        index.hnsw.efSearch = hnsw_ef_search
+        return
+
+    ivf_index = cast(IndexIVF, extract_index_ivf(index))
+    ivf_index.nprobe = min(ivf_nprobe, ivf_index.nlist)
+
+
+# Matches each query descriptor to its nearest 3D point, keeping the matches that pass Lowe's ratio test against the
+# second nearest point. Returns the matched query descriptor indices and point rows.
+def match_point_descriptors(
+    index: Index, query_descriptors: NDArray[float32], ratio: float
+) -> tuple[NDArray[int64], NDArray[int64]]:
+    squared_distances, point_rows = cast(
+        tuple[NDArray[float32], NDArray[int64]],
+        index.search(ascontiguousarray(query_descriptors, dtype=float32), 2),  # type: ignore
+    )
+    distances = element_sqrt(squared_distances.clip(min=0))
+
+    # Fewer than two results are padded with -1
+    accepted = (point_rows[:, 0] >= 0) & ((point_rows[:, 1] < 0) | (distances[:, 0] < ratio * distances[:, 1]))
+    return arange(query_descriptors.shape[0], dtype=int64)[accepted], point_rows[accepted, 0]
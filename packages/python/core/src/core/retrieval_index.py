@@ -0,0 +1,88 @@
+from math import sqrt
+from pathlib import Path
+from typing import cast
+
+from faiss import (  # type: ignore
+    METRIC_INNER_PRODUCT,  # type: ignore
+    Index,
+    IndexFlatIP,
+    IndexHNSWFlat,
+    IndexIDMap2,
+    IndexIVFFlat,
+    downcast_index,  # type: ignore
+    read_index,  # type: ignore
+    write_index,  # type: ignore
+)
+from numpy import ascontiguousarray, float32, int64
+from numpy.typing import NDArray
+
+RETRIEVAL_INDEX_FILE = "retrieval_index.faiss"
+
+# Below this many images, exhaustive retrieval is cheap enough that no index is built
+RETRIEVAL_INDEX_MIN_IMAGES = 5_000
+
+# Maps with more images than this use an IVF index (cheaper to build and smaller) instead of HNSW
+HNSW_MAX_IMAGES = 100_000
+HNSW_NEIGHBORS = 32
+HNSW_EF_CONSTRUCTION = 200
+# IVF lists per square root of the number of images (the usual 4 * sqrt(N) rule of thumb)
+IVF_LISTS_PER_SQRT_IMAGES = 4
+
+
+# Builds an approximate nearest-neighbour index over L2-normalised global descriptors (so inner product is cosine
+# similarity), returning the given image ids as search results
+def build_retrieval_index(image_ids: NDArray[int64], global_descriptors: NDArray[float32]):
+    count, dimension = global_descriptors.shape
+    global_descriptors = ascontiguousarray(global_descriptors, dtype=float32)
+
+    if count <= HNSW_MAX_IMAGES:
+        print(f"Building HNSW retrieval index over {count} images")
+        index = IndexHNSWFlat(dimension, HNSW_NEIGHBORS, METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+    else:
+        number_of_lists = int(IVF_LISTS_PER_SQRT_IMAGES * sqrt(count))
+        print(f"Building IVF retrieval index over {count} images with {number_of_lists} lists")
+        index = IndexIVFFlat(IndexFlatIP(dimension), dimension, number_of_lists, METRIC_INNER_PRODUCT)
+        index.train(global_descriptors)  # type: ignore
+
+    # faiss's python wrappers keep the wrapped index (and the IVF coarse quantizer) alive for as long as the outer index
+    id_map = IndexIDMap2(index)
+    id_map.add_with_ids(global_descriptors, ascontiguousarray(image_ids, dtype=int64))  # type: ignore
+    return id_map
+
+
+def write_retrieval_index(index: Index, root_path: Path):
+    path = root_path / RETRIEVAL_INDEX_FILE
+    write_index(index, str(path))
+    return RETRIEVAL_INDEX_FILE, path.read_bytes()
+
+
+def read_retrieval_index(root_path: Path):
+    return cast(Index, read_index(str(root_path / RETRIEVAL_INDEX_FILE)))
+
+
+# Trades recall for speed: ef_search is the HNSW candidate list size, nprobe the number of IVF lists visited
+def configure_retrieval_index(index: Index, hnsw_ef_search: int, ivf_nprobe: int):
+    inner_index = downcast_index(cast(IndexIDMap2, downcast_index(index)).index)
+    if isinstance(inner_index, IndexHNSWFlat):
+        inner_index.hnsw.efSearch = hnsw_ef_search
+    elif isinstance(inner_index, IndexIVFFlat):
+        inner_index.nprobe = min(ivf_nprobe, inner_index.nlist)
+
+
+def search_retrieval_index(index: Index, query_global_descriptor: NDArray[float32], k: int) -> list[int]:
+    return [image_id for image_id, _ in search_retrieval_index_with_scores(index, query_global_descriptor, k)]
+
+
+# Image ids with their cosine similarity to the query, most similar first
+def search_retrieval_index_with_scores(
+    index: Index, query_global_descriptor: NDArray[float32], k: int
+) -> list[tuple[int, float]]:
+    query = ascontiguousarray(query_global_descriptor.reshape(1, -1), dtype=float32)
+    scores, image_ids = index.search(query, k)  # type: ignore
+    # Fewer than k results are padded with -1
+    return [
+        (int(image_id), float(score))
+        for image_id, score in zip(cast(NDArray[int64], image_ids)[0], cast(NDArray[float32], scores)[0])
+        if image_id >= 0
+    ]
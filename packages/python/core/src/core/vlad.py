@@ -0,0 +1,74 @@
+from dataclasses import dataclass
+
+from faiss import Kmeans  # type: ignore
+from numpy import add, ascontiguousarray, bincount, float32, random, sign, sqrt, stack, zeros
+from numpy.linalg import norm, svd
+from numpy.typing import NDArray
+
+# Visual words in the vocabulary (each contributes a residual as long as a local descriptor to the VLAD vector)
+VLAD_WORDS = 16
+# Dimensions kept by the PCA projection (fewer for maps with fewer images)
+VLAD_DIMENSIONS = 512
+VLAD_KMEANS_ITERATIONS = 20
+VLAD_VOCABULARY_TRAINING_DESCRIPTORS = 100_000
+VLAD_PCA_TRAINING_IMAGES = 4_096
+
+
+# Aggregates an image's local (SuperPoint) descriptors into a global descriptor for retrieval: a VLAD vector (the
+# intra-normalised sums of residuals to each descriptor's nearest visual word, power-normalised), PCA projected and L2
+# normalised, so inner product is cosine similarity. The vocabulary and projection are trained per map.
+@dataclass(frozen=True)
+class VladAggregator:
+    # (words, descriptor dimensions)
+    vocabulary: NDArray[float32]
+    mean: NDArray[float32]
+    # (words * descriptor dimensions, dimensions)
+    projection: NDArray[float32]
+
+    def aggregate(self, descriptors: NDArray[float32]) -> NDArray[float32]:
+        return _l2_normalize((_vlad(self.vocabulary, descriptors) - self.mean) @ self.projection)
+
+
+# Trains the vocabulary on a sample of training_descriptors, and the projection on (a sample of) the images'
+# descriptors. Returns the aggregator and each image's aggregated descriptor.
+def train_vlad_aggregator(training_descriptors: NDArray[float32], image_descriptors: list[NDArray[float32]]):
+    rng = random.default_rng(0)
+    if training_descriptors.shape[0] > VLAD_VOCABULARY_TRAINING_DESCRIPTORS:
+        training_descriptors = training_descriptors[
+            rng.choice(training_descriptors.shape[0], VLAD_VOCABULARY_TRAINING_DESCRIPTORS, replace=False)
+        ]
+    print(f"Training VLAD vocabulary of {VLAD_WORDS} words on {training_descriptors.shape[0]} descriptors")
+    kmeans = Kmeans(training_descriptors.shape[1], VLAD_WORDS, niter=VLAD_KMEANS_ITERATIONS, seed=0)
+    kmeans.train(ascontiguousarray(training_descriptors, dtype=float32))  # type: ignore
+    vocabulary = kmeans.centroids.astype(float32)  # type: ignore
+
+    vlads = stack([_vlad(vocabulary, descriptors) for descriptors in image_descriptors])
+    training_vlads = vlads
+    if vlads.shape[0] > VLAD_PCA_TRAINING_IMAGES:
+        training_vlads = vlads[rng.choice(vlads.shape[0], VLAD_PCA_TRAINING_IMAGES, replace=False)]
+    mean = training_vlads.mean(axis=0)
+    _, _, components = svd(training_vlads - mean, full_matrices=False)
+    projection = ascontiguousarray(components[:VLAD_DIMENSIONS].T, dtype=float32)
+    print(f"Projecting VLAD vectors from {vlads.shape[1]} to {projection.shape[1]} dimensions")
+
+    aggregator = VladAggregator(vocabulary, mean.astype(float32), projection)
+    return aggregator, _l2_normalize((vlads - aggregator.mean) @ projection)
+
+
+def _vlad(vocabulary: NDArray[float32], descriptors: NDArray[float32]) -> NDArray[float32]:
+    words, dimensions = vocabulary.shape
+    residuals = zeros((words, dimensions), dtype=float32)
+    if descriptors.shape[0] > 0:
+        # Nearest word by L2 distance, without computing the distances themselves
+        assignments = (descriptors @ vocabulary.T - 0.5 * (vocabulary * vocabulary).sum(axis=1)).argmax(axis=1)
+        add.at(residuals, assignments, descriptors)
+        residuals -= bincount(assignments, minlength=words)[:, None].astype(float32) * vocabulary
+
+    residuals = _l2_normalize(residuals)
+    vlad = residuals.reshape(-1)
+    return _l2_normalize(sign(vlad) * sqrt(abs(vlad)))
+
+
+def _l2_normalize(vectors: NDArray[float32]) -> NDArray[float32]:
+    lengths = norm(vectors, axis=-1, keepdims=True)
+    return (vectors / (lengths + float32(1e-12))).astype(float32, copy=False)
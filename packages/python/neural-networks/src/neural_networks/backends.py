@@ -0,0 +1,53 @@
+from typing import Any, Literal
+
+import torch
+from torch import Tensor
+from torch.ao.quantization import quantize_dynamic
+from torch.nn import Linear, Module
+
+# How a model runs inference:
+#   eager: as loaded
+#   channels_last: convolutions in NHWC layout (weights and inputs), which oneDNN's CPU convolutions are fastest with
+#   compiled: torch.compile, with dynamic shapes (image sizes and keypoint counts vary between calls)
+#   int8: linear layers dynamically quantised to int8 (weights ahead of time, activations per call, CPU only), so only
+#         transformers like LightGlue benefit; the model loaders run convolutional models eagerly instead
+InferenceBackend = Literal["eager", "channels_last", "compiled", "int8"]
+INFERENCE_BACKENDS: tuple[InferenceBackend, ...] = ("eager", "channels_last", "compiled", "int8")
+
+
+# Modifies the module in place. compiled_modules are the submodules to compile (default: the whole module), for models
+# whose outer forward must stay eager.
+def apply_backend[M: Module](module: M, backend: InferenceBackend, compiled_modules: list[Module] | None = None) -> M:
+    if backend == "eager":
+        return module
+
+    if backend == "channels_last":
+        module.to(memory_format=torch.channels_last)  # type: ignore
+        module.register_forward_pre_hook(_channels_last_inputs)
+        return module
+
+    if backend == "compiled":
+        for compiled_module in compiled_modules if compiled_modules is not None else [module]:
+            compiled_module.compile(dynamic=True)
+        return module
+
+    if backend == "int8":
+        if any(parameter.device.type != "cpu" for parameter in module.parameters()):
+            raise ValueError("The int8 backend is only supported on the CPU")
+        quantize_dynamic(module, {Linear}, dtype=torch.qint8, inplace=True)
+        return module
+
+    raise ValueError(f"Unknown inference backend {backend}")
+
+
+def _channels_last_inputs(_module: Module, args: tuple[Any, ...]):
+    return tuple(_to_channels_last(arg) for arg in args)
+
+
+# Models take either image tensors or dicts of them
+def _to_channels_last(value: Any) -> Any:
+    if isinstance(value, Tensor) and value.dim() == 4:
+        return value.contiguous(memory_format=torch.channels_last)
+    if isinstance(value, dict):
+        return {key: _to_channels_last(item) for key, item in value.items()}  # type: ignore
+    return value
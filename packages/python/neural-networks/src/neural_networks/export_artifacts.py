@@ -0,0 +1,6 @@
+from pathlib import Path
+from sys import argv
+
+from .models import save_model_artifacts
+
+save_model_artifacts(Path(argv[1]))
@@ -5,16 +5,17 @@ from typing import Any, Mapping, Protocol, cast
 
 import torch
 from lightglue import LightGlue, SuperPoint  # type: ignore
-from numpy import float32
-from numpy.typing import NDArray
+from numpy import asarray, float32, float64, power, zeros
 from sklearn.decomposition import _pca  # type: ignore
-from torch import Tensor, from_numpy  # type: ignore
+from torch import Tensor, from_numpy, tensor  # type: ignore
 from torch.hub import get_dir
 from torch.nn import Module
+from torch.nn.functional import normalize
 
 environ["DB_ROOT"] = ""  # required by dirtorch
 from dirtorch.extract_features import load_model  # type: ignore
-from dirtorch.utils.common import whiten_features  # type: ignore
+
+from .backends import InferenceBackend, apply_backend
 
 # From Hierarchical-Localization:
 #
@@ -32,6 +33,13 @@ WHITENV = None
 WHITENM = 1.0
 
 
+# Ready-to-run models serialised by save_model_artifacts, which load much faster than building them from their
+# checkpoints
+DIR_ARTIFACT = "dir.pt"
+SUPERPOINT_ARTIFACT = "superpoint.pt"
+LIGHTGLUE_ARTIFACT = "lightglue.pt"
+
+
 class _DIRNet(Protocol):
     preprocess: Mapping[str, Any]
     pca: Mapping[str, Any]
@@ -49,44 +57,55 @@ class DIR(Module):
             print(f"Downloading DIR model from {MODEL_URL}")
             torch.hub.download_url_to_file(MODEL_URL, str(checkpoint))
 
-        self.net = cast(_DIRNet, load_model(checkpoint, False))  # first load on CPU
-        assert WHITEN_NAME in self.net.pca
+        net = cast(_DIRNet, load_model(checkpoint, False))  # first load on CPU
+        assert WHITEN_NAME in net.pca
+
+        # Preprocessing and whitening (dirtorch's whiten_features) as plain tensors, so they run on the model's device,
+        # and the model can be serialised without the checkpoint's sklearn PCA
+        pca = net.pca[WHITEN_NAME]
+        projection = asarray(pca.components_[:WHITENV], dtype=float64).T
+        if pca.whiten:
+            projection = projection / (
+                WHITENM * power(asarray(pca.explained_variance_[:WHITENV], dtype=float64), WHITENP)
+            )
+        whitening_mean = zeros(projection.shape[0]) if pca.mean_ is None else asarray(pca.mean_, dtype=float64)
+
+        self.register_buffer("preprocess_mean", tensor(net.preprocess["mean"], dtype=torch.float32))
+        self.register_buffer("preprocess_std", tensor(net.preprocess["std"], dtype=torch.float32))
+        self.register_buffer("whitening_mean", from_numpy(whitening_mean.astype(float32)))
+        self.register_buffer("whitening_projection", from_numpy(projection.astype(float32)))
+
+        del net.pca
+        self.net = cast(Module, net)
 
     def forward(self, data: Mapping[str, Any]) -> Mapping[str, Any]:
         image = data["image"]
         assert image.shape[1] == 3
-        image = image - image.new_tensor(self.net.preprocess["mean"])[:, None, None]
-        image = image / image.new_tensor(self.net.preprocess["std"])[:, None, None]
-
-        return {
-            "global_descriptor": from_numpy(
-                cast(
-                    NDArray[float32],
-                    whiten_features(
-                        self.net(image).unsqueeze(0).detach().cpu().numpy(),
-                        self.net.pca[WHITEN_NAME],
-                        whitenp=WHITENP,
-                        whitenv=WHITENV,
-                        whitenm=WHITENM,
-                    ),
-                )
-            ).to(image.device)
-        }
-
-
-def load_DIR(device: str = "cpu"):
-    _orig_load = torch.load  # type: ignore
-
-    # PyTorch 2.6 flips torch.load default to weights_only=True, so we temporarily force legacy loading to read DIR’s pickled checkpoint;
-    # see: https://dev-discuss.pytorch.org/t/bc-breaking-change-torch-load-is-being-flipped-to-use-weights-only-true-by-default-in-the-nightlies-after-137602/2573
-    def _load_legacy(*args, **kwargs):  # type: ignore
-        kwargs.setdefault("weights_only", False)  # type: ignore
-        return _orig_load(*args, **kwargs)  # type: ignore
-
-    torch.load = _load_legacy
-    dir: DIR = DIR().to(device).eval()
-    torch.load = _orig_load
+        image = (image - self.preprocess_mean[:, None, None]) / self.preprocess_std[:, None, None]
+
+        # The network squeezes its output, so restore the batch dimension (also for batches of one)
+        features = self.net(image).reshape(image.shape[0], -1)
+        return {"global_descriptor": normalize((features - self.whitening_mean) @ self.whitening_projection, dim=1)}
+
+
+def load_DIR(device: str = "cpu", backend: InferenceBackend = "eager", artifacts_path: Path | None = None):
+    dir = cast(DIR | None, _load_artifact(artifacts_path, DIR_ARTIFACT))
+    if dir is None:
+        _orig_load = torch.load  # type: ignore
+
+        # PyTorch 2.6 flips torch.load default to weights_only=True, so we temporarily force legacy loading to read DIR’s pickled checkpoint;
+        # see: https://dev-discuss.pytorch.org/t/bc-breaking-change-torch-load-is-being-flipped-to-use-weights-only-true-by-default-in-the-nightlies-after-137602/2573
+        def _load_legacy(*args, **kwargs):  # type: ignore
+            kwargs.setdefault("weights_only", False)  # type: ignore
+            return _orig_load(*args, **kwargs)  # type: ignore
+
+        torch.load = _load_legacy
+        dir = DIR()
+        torch.load = _orig_load
 
+    dir = dir.to(device).eval()
+    # Only the network; whitening is a single matrix product
+    apply_backend(dir.net, _without_int8(backend, "DIR"))
     return dir
 
 
@@ -96,6 +115,8 @@ def load_superpoint(
     max_num_keypoints: int | None = None,
     remove_borders: int | None = None,
     device: str = "cpu",
+    backend: InferenceBackend = "eager",
+    artifacts_path: Path | None = None,
 ):
     conf: dict[str, Any] = {}
     if nms_radius is not None:
@@ -107,9 +128,56 @@ def load_superpoint(
     if remove_borders is not None:
         conf["remove_borders"] = remove_borders
 
-    return SuperPoint(**conf).eval().to(device)
+    superpoint = _load_artifact(artifacts_path, SUPERPOINT_ARTIFACT)
+    if superpoint is None:
+        superpoint = SuperPoint(**conf)
+    else:
+        # SuperPoint reads its configuration on every forward pass, so it can be set after loading
+        for key, value in conf.items():
+            setattr(superpoint.conf, key, value)
+
+    return apply_backend(superpoint.eval().to(device), _without_int8(backend, "SuperPoint"))
+
+
+def load_lightglue(device: str = "cpu", backend: InferenceBackend = "eager", artifacts_path: Path | None = None):
+    lightglue = _load_artifact(artifacts_path, LIGHTGLUE_ARTIFACT)
+    if lightglue is None:
+        # Loaded with adaptive depth and width disabled, because they only work for one pair per forward pass, and
+        # batched matching has to run every layer for every keypoint. Callers enable them per forward pass (see
+        # core.lightglue_profile).
+        lightglue = LightGlue(features="superpoint", width_confidence=-1, depth_confidence=-1)
+
+    lightglue = lightglue.eval().to(device)
+    # Only the transformer layers are compiled, so the early-exit loop (and configuration read by it) stays in Python
+    return apply_backend(lightglue, backend, compiled_modules=list(lightglue.transformers))
+
+
+# int8 only quantises linear layers, which convolutional models (DIR's ResNet, SuperPoint) have at most as a final
+# projection, so they run eagerly instead of paying for quantisation that barely changes them
+def _without_int8(backend: InferenceBackend, model_name: str) -> InferenceBackend:
+    if backend != "int8":
+        return backend
+
+    print(f"The int8 backend only quantises linear layers, running {model_name} (convolutional) eagerly")
+    return "eager"
+
+
+# Serialises the models as built (before any inference backend is applied), so loading them is only unpickling
+def save_model_artifacts(artifacts_path: Path):
+    artifacts_path.mkdir(parents=True, exist_ok=True)
+    torch.save(load_DIR(), artifacts_path / DIR_ARTIFACT)
+    torch.save(load_superpoint(), artifacts_path / SUPERPOINT_ARTIFACT)
+    torch.save(load_lightglue(), artifacts_path / LIGHTGLUE_ARTIFACT)
+
+
+def _load_artifact(artifacts_path: Path | None, name: str) -> Any:
+    if artifacts_path is None:
+        return None
 
+    path = artifacts_path / name
+    if not path.exists():
+        print(f"No model artifact at {path}, building the model from its checkpoint")
+        return None
 
-def load_lightglue(device: str = "cpu"):
-    # TODO: add comment about why width_confidence and depth_confidence are set to -1
-    return LightGlue(features="superpoint", width_confidence=-1, depth_confidence=-1).eval().to(device)
+    # Whole modules are pickled, so this can't be weights only
+    return torch.load(path, map_location="cpu", weights_only=False)
@@ -0,0 +1,120 @@
+# Checks an inference backend against eager inference on the same images, before switching a service to it:
+#
+#   python -m neural_networks.parity --backend int8 image1.jpg image2.jpg [...]
+#
+# SuperPoint keypoints must be repeated (within a pixel) with similar descriptors, DIR global descriptors must be
+# similar, and LightGlue must find mostly the same matches between consecutive images (given the same features). Exits
+# with status 1 if any check is outside its tolerance.
+
+from argparse import ArgumentParser
+from pathlib import Path
+from typing import Any
+
+import torch
+from lightglue.utils import load_image  # type: ignore
+from torch import Tensor, cdist, tensor
+from torch.nn.functional import cosine_similarity
+
+from .backends import INFERENCE_BACKENDS, InferenceBackend
+from .models import load_DIR, load_lightglue, load_superpoint
+
+
+def main():
+    parser = ArgumentParser(description="Compare an inference backend against eager inference")
+    parser.add_argument("images", nargs="+", type=Path)
+    parser.add_argument("--backend", required=True, choices=[b for b in INFERENCE_BACKENDS if b != "eager"])
+    parser.add_argument("--models", nargs="+", default=["superpoint", "dir", "lightglue"])
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--max-keypoints", type=int, default=2048)
+    parser.add_argument("--min-keypoint-repeatability", type=float, default=0.95)
+    parser.add_argument("--min-descriptor-similarity", type=float, default=0.99)
+    parser.add_argument("--min-global-descriptor-similarity", type=float, default=0.99)
+    parser.add_argument("--min-match-agreement", type=float, default=0.9)
+    args = parser.parse_args()
+
+    torch.set_grad_enabled(False)
+    images = [load_image(path).to(args.device) for path in args.images]
+    backend: InferenceBackend = args.backend
+    failures: list[str] = []
+
+    def check(name: str, value: float, minimum: float):
+        print(f"{name}: {value:.4f} (minimum {minimum})")
+        if value < minimum:
+            failures.append(name)
+
+    eager_superpoint = load_superpoint(max_num_keypoints=args.max_keypoints, device=args.device)
+    features = [_superpoint(eager_superpoint, image) for image in images]
+
+    if "superpoint" in args.models:
+        superpoint = load_superpoint(max_num_keypoints=args.max_keypoints, device=args.device, backend=backend)
+        for path, image, (keypoints, descriptors) in zip(args.images, images, features):
+            backend_keypoints, backend_descriptors = _superpoint(superpoint, image)
+            distances, nearest = cdist(keypoints, backend_keypoints).min(dim=1)
+            repeated = distances <= 1.0
+            check(
+                f"{path.name} SuperPoint keypoint repeatability",
+                repeated.float().mean().item(),
+                args.min_keypoint_repeatability,
+            )
+            similarity = cosine_similarity(descriptors[repeated], backend_descriptors[nearest[repeated]])
+            check(
+                f"{path.name} SuperPoint descriptor similarity",
+                similarity.mean().item() if repeated.any() else 0.0,
+                args.min_descriptor_similarity,
+            )
+
+    if "dir" in args.models:
+        eager_dir = load_DIR(args.device)
+        dir = load_DIR(args.device, backend)
+        for path, image in zip(args.images, images):
+            check(
+                f"{path.name} DIR global descriptor similarity",
+                cosine_similarity(_dir(eager_dir, image), _dir(dir, image), dim=0).item(),
+                args.min_global_descriptor_similarity,
+            )
+
+    if "lightglue" in args.models:
+        eager_lightglue = load_lightglue(args.device)
+        lightglue = load_lightglue(args.device, backend)
+        for index in range(len(images) - 1):
+            pair = (images[index], features[index]), (images[index + 1], features[index + 1])
+            eager_matches = _lightglue(eager_lightglue, *pair)
+            backend_matches = _lightglue(lightglue, *pair)
+            check(
+                f"{args.images[index].name}-{args.images[index + 1].name} LightGlue match agreement",
+                len(eager_matches & backend_matches) / max(len(eager_matches), 1),
+                args.min_match_agreement,
+            )
+
+    if failures:
+        print(f"{backend} backend is outside tolerance on {len(failures)} checks")
+        raise SystemExit(1)
+    print(f"{backend} backend is within tolerance")
+
+
+def _superpoint(superpoint: Any, image: Tensor) -> tuple[Tensor, Tensor]:
+    output = superpoint({"image": image.unsqueeze(0)})
+    return output["keypoints"][0], output["descriptors"][0]
+
+
+def _dir(dir: Any, image: Tensor) -> Tensor:
+    return dir({"image": image.unsqueeze(0)})["global_descriptor"][0]
+
+
+def _lightglue(
+    lightglue: Any, image0: tuple[Tensor, tuple[Tensor, Tensor]], image1: tuple[Tensor, tuple[Tensor, Tensor]]
+):
+    data = {
+        name: {
+            "keypoints": keypoints.unsqueeze(0),
+            "descriptors": descriptors.unsqueeze(0),
+            "image_size": tensor([[image.shape[-1], image.shape[-2]]], device=image.device),
+        }
+        for name, (image, (keypoints, descriptors)) in (("image0", image0), ("image1", image1))
+    }
+    matches = lightglue(data)["matches0"][0]
+    return {(index, int(match)) for index, match in enumerate(matches.tolist()) if match >= 0}
+
+
+if __name__ == "__main__":
+    main()